@@ -5,10 +5,12 @@ Provides intelligent responses and analytics about fraud detection data
 """
 import os
 import json
+import time
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List
 import psycopg2
 import psycopg2.extras
+import redis
 
 try:
     from groq import Groq
@@ -17,6 +19,38 @@ except ImportError:
     GROQ_AVAILABLE = False
     print("Warning: Groq not available. Install with: pip install groq")
 
+SCHEMA_CACHE_TTL = 3600  # seconds
+
+REDIS_RETRY_BACKOFF = 30  # seconds to wait before retrying an unreachable Redis
+
+_redis_client = None
+_redis_failed_at = None
+
+
+def _get_redis():
+    """Shared Redis client for the schema cache, or None if Redis is unreachable
+    
+    A failed connect is remembered for REDIS_RETRY_BACKOFF seconds so requests
+    don't each wait out the connect timeout while Redis is down.
+    """
+    global _redis_client, _redis_failed_at
+    if _redis_client is not None:
+        return _redis_client
+    if _redis_failed_at is not None and time.monotonic() - _redis_failed_at < REDIS_RETRY_BACKOFF:
+        return None
+    try:
+        client = redis.from_url(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True,
+            socket_connect_timeout=2, socket_timeout=2,
+        )
+        client.ping()
+        _redis_client = client
+        _redis_failed_at = None
+        return _redis_client
+    except Exception:
+        _redis_failed_at = time.monotonic()
+        return None
+
 
 class FraudDetectionChatbot:
     def __init__(self, db_url: str, groq_api_key: str = None):
@@ -119,67 +153,62 @@ class FraudDetectionChatbot:
             else:
                 interval = "24 hours"
             
-            # Get overall stats
-            cur.execute(f"""
-                SELECT
-                    COUNT(*) AS total,
-                    COUNT(*) FILTER (WHERE action = 'BLOCK') AS blocked,
-                    COUNT(*) FILTER (WHERE action = 'DELAY') AS delayed,
-                    COUNT(*) FILTER (WHERE action = 'ALLOW') AS allowed,
-                    COALESCE(AVG(risk_score), 0) AS avg_risk_score,
-                    COALESCE(MAX(risk_score), 0) AS max_risk_score,
-                    COALESCE(SUM(amount), 0) AS total_amount,
-                    COALESCE(AVG(amount), 0) AS avg_amount
-                FROM transactions
-                WHERE created_at >= NOW() - INTERVAL '{interval}';
-            """)
-            stats = cur.fetchone()
-            
-            # Get high-risk transactions
-            cur.execute(f"""
-                SELECT tx_id, user_id, amount, risk_score, action, created_at
-                FROM transactions
-                WHERE created_at >= NOW() - INTERVAL '{interval}'
-                    AND risk_score >= 0.7
-                ORDER BY risk_score DESC
-                LIMIT 10;
-            """)
-            high_risk_txs = cur.fetchall()
-            
-            # Get top users by transaction count
-            cur.execute(f"""
-                SELECT user_id, COUNT(*) as tx_count, AVG(risk_score) as avg_risk
-                FROM transactions
-                WHERE created_at >= NOW() - INTERVAL '{interval}'
-                GROUP BY user_id
-                ORDER BY tx_count DESC
-                LIMIT 5;
-            """)
-            top_users = cur.fetchall()
-            
-            # Get trend data (hourly)
+            # All four context queries go out as one statement (one round
+            # trip); each sub-select is aggregated to JSON server-side.
             cur.execute(f"""
+                WITH window_tx AS (
+                    SELECT tx_id, user_id, amount, risk_score, action, created_at
+                    FROM transactions
+                    WHERE created_at >= NOW() - INTERVAL '{interval}'
+                )
                 SELECT
-                    DATE_TRUNC('hour', created_at) as hour,
-                    COUNT(*) as total,
-                    COUNT(*) FILTER (WHERE action = 'BLOCK') as blocked,
-                    COUNT(*) FILTER (WHERE action = 'DELAY') as delayed,
-                    COUNT(*) FILTER (WHERE action = 'ALLOW') as allowed
-                FROM transactions
-                WHERE created_at >= NOW() - INTERVAL '{interval}'
-                GROUP BY hour
-                ORDER BY hour DESC
-                LIMIT 24;
+                    (SELECT row_to_json(s) FROM (
+                        SELECT
+                            COUNT(*) AS total,
+                            COUNT(*) FILTER (WHERE action = 'BLOCK') AS blocked,
+                            COUNT(*) FILTER (WHERE action = 'DELAY') AS delayed,
+                            COUNT(*) FILTER (WHERE action = 'ALLOW') AS allowed,
+                            COALESCE(AVG(risk_score), 0) AS avg_risk_score,
+                            COALESCE(MAX(risk_score), 0) AS max_risk_score,
+                            COALESCE(SUM(amount), 0) AS total_amount,
+                            COALESCE(AVG(amount), 0) AS avg_amount
+                        FROM window_tx
+                    ) s) AS stats,
+                    (SELECT COALESCE(json_agg(h), '[]'::json) FROM (
+                        SELECT tx_id, user_id, amount, risk_score, action, created_at
+                        FROM window_tx
+                        WHERE risk_score >= 0.7
+                        ORDER BY risk_score DESC
+                        LIMIT 10
+                    ) h) AS high_risk_transactions,
+                    (SELECT COALESCE(json_agg(u), '[]'::json) FROM (
+                        SELECT user_id, COUNT(*) as tx_count, AVG(risk_score) as avg_risk
+                        FROM window_tx
+                        GROUP BY user_id
+                        ORDER BY tx_count DESC
+                        LIMIT 5
+                    ) u) AS top_users,
+                    (SELECT COALESCE(json_agg(t), '[]'::json) FROM (
+                        SELECT
+                            DATE_TRUNC('hour', created_at) as hour,
+                            COUNT(*) as total,
+                            COUNT(*) FILTER (WHERE action = 'BLOCK') as blocked,
+                            COUNT(*) FILTER (WHERE action = 'DELAY') as delayed,
+                            COUNT(*) FILTER (WHERE action = 'ALLOW') as allowed
+                        FROM window_tx
+                        GROUP BY hour
+                        ORDER BY hour DESC
+                        LIMIT 24
+                    ) t) AS trends;
             """)
-            trends = cur.fetchall()
-            
+            row = cur.fetchone()
             cur.close()
             
             return {
-                "stats": dict(stats) if stats else {},
-                "high_risk_transactions": [dict(tx) for tx in high_risk_txs],
-                "top_users": [dict(u) for u in top_users],
-                "trends": [dict(t) for t in trends],
+                "stats": row["stats"] or {},
+                "high_risk_transactions": row["high_risk_transactions"],
+                "top_users": row["top_users"],
+                "trends": row["trends"],
                 "time_range": time_range
             }
         finally:
@@ -212,39 +241,57 @@ class FraudDetectionChatbot:
         try:
             cur = conn.cursor()
             
-            # Get all tables
+            # Fingerprint the public schema: any DDL on its tables rewrites
+            # their pg_class rows and so changes xmin
+            cur.execute("""
+                SELECT md5(string_agg(c.oid::text || ':' || c.xmin::text, ',' ORDER BY c.oid)) AS version
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'public' AND c.relkind IN ('r', 'v')
+            """)
+            cache_key = f"chatbot:schema:{cur.fetchone()['version']}"
+            
+            r = _get_redis()
+            if r is not None:
+                try:
+                    cached = r.get(cache_key)
+                    if cached:
+                        cur.close()
+                        self._schema_cache = json.loads(cached)
+                        return self._schema_cache
+                except Exception as e:
+                    print(f"Schema cache read failed (non-critical): {e}")
+            
+            # All tables and their columns in one catalog query
             cur.execute("""
-                SELECT table_name 
-                FROM information_schema.tables 
-                WHERE table_schema = 'public'
+                SELECT c.relname AS table_name,
+                       a.attname AS column_name,
+                       format_type(a.atttypid, a.atttypmod) AS data_type,
+                       CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END AS is_nullable
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                JOIN pg_attribute a ON a.attrelid = c.oid
+                WHERE n.nspname = 'public' AND c.relkind IN ('r', 'v')
+                  AND a.attnum > 0 AND NOT a.attisdropped
+                ORDER BY c.relname, a.attnum
             """)
-            tables = cur.fetchall()
             
             schema_info = {}
-            for table in tables:
-                table_name = table['table_name']
-                
-                # Get columns for each table
-                cur.execute("""
-                    SELECT column_name, data_type, is_nullable
-                    FROM information_schema.columns
-                    WHERE table_schema = 'public' AND table_name = %s
-                    ORDER BY ordinal_position
-                """, (table_name,))
-                columns = cur.fetchall()
-                
-                schema_info[table_name] = [
-                    {
-                        'name': col['column_name'],
-                        'type': col['data_type'],
-                        'nullable': col['is_nullable']
-                    }
-                    for col in columns
-                ]
+            for col in cur.fetchall():
+                schema_info.setdefault(col['table_name'], []).append({
+                    'name': col['column_name'],
+                    'type': col['data_type'],
+                    'nullable': col['is_nullable']
+                })
             
             cur.close()
             # Cache the schema for future use
             self._schema_cache = schema_info
+            if r is not None:
+                try:
+                    r.setex(cache_key, SCHEMA_CACHE_TTL, json.dumps(schema_info))
+                except Exception as e:
+                    print(f"Schema cache write failed (non-critical): {e}")
             return schema_info
         finally:
             conn.close()
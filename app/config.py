@@ -0,0 +1,12 @@
+"""
+Runtime configuration read from the environment once, at import.
+
+Import this after load_dotenv() has run. Tests that change the
+environment can importlib.reload() this module.
+"""
+
+import os
+
+# Fraud decision thresholds on the risk score (0-1)
+DELAY_THRESHOLD = float(os.getenv("DELAY_THRESHOLD", "0.35"))
+BLOCK_THRESHOLD = float(os.getenv("BLOCK_THRESHOLD", "0.70"))
@@ -143,8 +143,7 @@ def store_baseline(feature_distributions: Dict[str, List[float]]) -> None:
                 "created_at": time.time(),
             }
 
-            pipe.set(_key_baseline(feature_name), json.dumps(baseline_data))
-            pipe.expire(_key_baseline(feature_name), BASELINE_TTL)
+            pipe.set(_key_baseline(feature_name), json.dumps(baseline_data), ex=BASELINE_TTL)
 
         pipe.execute()
         print(f"[drift_detector] Stored baselines for {len(feature_distributions)} features")
@@ -1,5 +1,6 @@
 import os
 import redis
+import functools
 from datetime import datetime, timezone, timedelta
 import math
 import statistics
@@ -219,9 +220,10 @@ def extract_features(tx):
     return features
 
 
+@functools.lru_cache(maxsize=1)
 def get_feature_names():
-    """Return ordered list of feature names for model training."""
-    return [
+    """Return ordered tuple of feature names for model training (built once)."""
+    return (
         # Basic (3)
         "amount", "log_amount", "is_round_amount",
         # Temporal (6)
@@ -234,7 +236,7 @@ def get_feature_names():
         "amount_mean", "amount_std", "amount_max", "amount_deviation",
         # Risk (3)
         "merchant_risk_score", "is_qr_channel", "is_web_channel"
-    ]
+    )
 
 
 def features_to_vector(feature_dict):
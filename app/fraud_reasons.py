@@ -5,25 +5,35 @@ based on transaction features and ML model outputs.
 This is pure logic for explaining fraud risk decisions.
 """
 
-from typing import List, Dict, Tuple
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple, Union
 import math
 
+import numpy as np
 
+try:
+    from .config import DELAY_THRESHOLD, BLOCK_THRESHOLD
+    from .score_index import ScoreIdx, scores_from_dict
+except (ImportError, SystemError):
+    from config import DELAY_THRESHOLD, BLOCK_THRESHOLD
+    from score_index import ScoreIdx, scores_from_dict
+
+
+@dataclass(slots=True, frozen=True, repr=False)
 class FraudReason:
-    """Represents a single fraud reason with severity and feature data."""
+    """Represents a single fraud reason with severity and feature data.
     
-    def __init__(self, reason: str, severity: str, feature_name: str = None, feature_value: float = None):
-        """
-        Args:
-            reason: Human-readable fraud reason
-            severity: "critical", "high", "medium", "low"
-            feature_name: Name of the feature contributing to this reason
-            feature_value: Value of the feature
-        """
-        self.reason = reason
-        self.severity = severity
-        self.feature_name = feature_name
-        self.feature_value = feature_value
+    Attributes:
+        reason: Human-readable fraud reason
+        severity: "critical", "high", "medium", "low"
+        feature_name: Name of the feature contributing to this reason
+        feature_value: Value of the feature
+    """
+    
+    reason: str
+    severity: str
+    feature_name: Optional[str] = None
+    feature_value: Optional[float] = None
     
     def to_dict(self) -> dict:
         """Convert to dictionary for API response."""
@@ -38,9 +48,24 @@ class FraudReason:
         return f"FraudReason({self.reason!r}, {self.severity})"
 
 
+# Features read by the reason rules, as columns of the batch feature matrix
+_REASON_FEATURES = (
+    "amount", "amount_std", "amount_deviation",
+    "is_new_recipient", "recipient_tx_count",
+    "tx_count_1min", "tx_count_5min", "tx_count_1h", "tx_count_6h",
+    "is_night", "is_weekend", "hour_of_day",
+    "merchant_risk_score", "is_qr_channel", "is_web_channel", "is_p2m",
+)
+_FEATURE_INDEX = {name: i for i, name in enumerate(_REASON_FEATURES)}
+_FEATURE_DEFAULTS = {"recipient_tx_count": 1.0}
+
+# Must match calculate_composite_risk_score
+_SEVERITY_WEIGHTS = {"critical": 0.25, "high": 0.15, "medium": 0.08, "low": 0.03}
+
+
 def generate_fraud_reasons(
     features: dict,
-    scores: dict,
+    scores: Union[dict, np.ndarray],
     thresholds: dict = None
 ) -> Tuple[List[FraudReason], float]:
     """
@@ -53,94 +78,129 @@ def generate_fraud_reasons(
                 - random_forest: float (0-1)
                 - xgboost: float (0-1)
                 - ensemble: float (0-1)
+                or the same four scores as an array in ScoreIdx order.
         thresholds: Dict with "delay" and "block" thresholds. If not provided,
                     uses defaults.
     
     Returns:
         Tuple of (fraud_reasons_list, composite_risk_score)
     """
+    return generate_fraud_reasons_batch([features], [scores], thresholds)[0]
+
+
+def generate_fraud_reasons_batch(
+    features_list: List[dict],
+    scores_list: Union[List[Union[dict, np.ndarray]], np.ndarray],
+    thresholds: dict = None
+) -> List[Tuple[List[FraudReason], float]]:
+    """
+    Vectorized generate_fraud_reasons over many transactions.
+    
+    Features and scores are packed into (N x F) and (N x 4) arrays and every
+    rule is evaluated as a boolean column mask; FraudReason objects are only
+    built for the rows a rule actually fires on.
+    
+    Args:
+        features_list: Feature dictionaries, one per transaction
+        scores_list: Score dicts or ScoreIdx-ordered arrays aligned with
+                     features_list, or one (N x 4) array
+        thresholds: Dict with "delay" and "block" thresholds
+    
+    Returns:
+        List of (fraud_reasons_list, composite_risk_score), one per transaction
+    """
     
     if thresholds is None:
-        thresholds = {"delay": 0.35, "block": 0.70}
+        thresholds = {"delay": DELAY_THRESHOLD, "block": BLOCK_THRESHOLD}
+    
+    n = len(features_list)
+    if n == 0:
+        return []
+    
+    X = np.array(
+        [[float(f.get(name, _FEATURE_DEFAULTS.get(name, 0))) for name in _REASON_FEATURES]
+         for f in features_list],
+        dtype=np.float64
+    ).reshape(n, len(_REASON_FEATURES))
+    if isinstance(scores_list, np.ndarray):
+        S = scores_list.astype(np.float64, copy=False).reshape(n, ScoreIdx.SIZE)
+    else:
+        S = np.array(
+            [scores_from_dict(sc) if isinstance(sc, dict) else sc for sc in scores_list],
+            dtype=np.float64
+        ).reshape(n, ScoreIdx.SIZE)
     
-    reasons = []
+    def col(name):
+        return X[:, _FEATURE_INDEX[name]]
+    
+    reasons = [[] for _ in range(n)]
+    reason_weight = np.zeros(n)
+    
+    def emit(mask, severity, feature_name, values, text):
+        """Attach one rule's reason to every row where mask is set.
+        
+        text is a string, or a callable taking the row index for
+        messages that embed the row's feature values.
+        """
+        rows = np.nonzero(mask)[0]
+        if rows.size == 0:
+            return
+        reason_weight[rows] += _SEVERITY_WEIGHTS[severity]
+        for i in rows.tolist():
+            value = values if np.isscalar(values) else float(values[i])
+            reasons[i].append(FraudReason(
+                text(i) if callable(text) else text,
+                severity,
+                feature_name,
+                value
+            ))
     
     # =========================================================================
     # 1. ML MODEL CONFIDENCE
     # =========================================================================
-    ensemble_score = scores.get("ensemble", 0.0)
-    iforest_score = scores.get("iforest", 0.0)
-    rf_score = scores.get("random_forest", 0.0)
-    xgb_score = scores.get("xgboost", 0.0)
+    iforest_score = S[:, ScoreIdx.IFOREST]
+    rf_score = S[:, ScoreIdx.RF]
+    xgb_score = S[:, ScoreIdx.XGB]
+    ensemble_score = S[:, ScoreIdx.ENSEMBLE]
     
     # Check for model consensus (all models agree this is suspicious)
-    model_scores = [s for s in [iforest_score, rf_score, xgb_score] if s > 0]
-    if model_scores and len(model_scores) >= 2:
-        avg_model_score = sum(model_scores) / len(model_scores)
-        
-        if avg_model_score > 0.8:
-            reasons.append(FraudReason(
-                "Multiple ML models flagged as high-risk anomaly",
-                "critical",
-                "ml_consensus",
-                avg_model_score
-            ))
-        elif avg_model_score > 0.6:
-            reasons.append(FraudReason(
-                "Anomalous behaviour detected by Isolation Forest",
-                "high",
-                "iforest_anomaly",
-                iforest_score
-            ))
-        elif avg_model_score > 0.4:
-            reasons.append(FraudReason(
-                "Transaction exhibits unusual patterns",
-                "medium",
-                "anomaly_score",
-                avg_model_score
-            ))
+    model_scores = S[:, [ScoreIdx.IFOREST, ScoreIdx.RF, ScoreIdx.XGB]]
+    positive = model_scores > 0
+    n_positive = positive.sum(axis=1)
+    positive_scores = np.where(positive, model_scores, 0.0)
+    score_sum = (positive_scores[:, 0] + positive_scores[:, 1]) + positive_scores[:, 2]
+    avg_model_score = np.divide(score_sum, n_positive, out=np.zeros(n), where=n_positive > 0)
+    consensus = n_positive >= 2
+    
+    critical_consensus = consensus & (avg_model_score > 0.8)
+    high_consensus = consensus & ~critical_consensus & (avg_model_score > 0.6)
+    medium_consensus = consensus & ~critical_consensus & ~high_consensus & (avg_model_score > 0.4)
+    emit(critical_consensus, "critical", "ml_consensus", avg_model_score,
+         "Multiple ML models flagged as high-risk anomaly")
+    emit(high_consensus, "high", "iforest_anomaly", iforest_score,
+         "Anomalous behaviour detected by Isolation Forest")
+    emit(medium_consensus, "medium", "anomaly_score", avg_model_score,
+         "Transaction exhibits unusual patterns")
     
     # =========================================================================
     # 2. TRANSACTION AMOUNT ANALYSIS
     # =========================================================================
-    amount = float(features.get("amount", 0))
-    amount_mean = float(features.get("amount_mean", amount))
-    amount_std = float(features.get("amount_std", 0))
-    amount_max = float(features.get("amount_max", amount))
+    amount = col("amount")
+    amount_std = col("amount_std")
     
     # High transaction amount (absolute) - lenient thresholds
-    if amount > 100000:
-        reasons.append(FraudReason(
-            "Very high transaction amount (100000+)",
-            "critical",
-            "amount",
-            amount
-        ))
-    elif amount > 50000:
-        reasons.append(FraudReason(
-            "High transaction amount (50000+)",
-            "high",
-            "amount",
-            amount
-        ))
-    elif amount > 25000:
-        reasons.append(FraudReason(
-            "Transaction amount exceeds 25000",
-            "medium",
-            "amount",
-            amount
-        ))
+    emit(amount > 100000, "critical", "amount", amount,
+         "Very high transaction amount (100000+)")
+    emit((amount > 50000) & (amount <= 100000), "high", "amount", amount,
+         "High transaction amount (50000+)")
+    emit((amount > 25000) & (amount <= 50000), "medium", "amount", amount,
+         "Transaction amount exceeds 25000")
     
     # Amount deviation from user's pattern - disabled to avoid blocking normal transactions
     # Only flag extreme deviations (>5x) as informational, not blocking
-    amount_deviation = float(features.get("amount_deviation", 0))
-    if amount_deviation > 5.0 and amount_std > 0:
-        reasons.append(FraudReason(
-            f"Amount is {amount_deviation:.1f}x above user's normal pattern",
-            "low",
-            "amount_deviation",
-            amount_deviation
-        ))
+    amount_deviation = col("amount_deviation")
+    emit((amount_deviation > 5.0) & (amount_std > 0), "low", "amount_deviation", amount_deviation,
+         lambda i: f"Amount is {amount_deviation[i]:.1f}x above user's normal pattern")
     
     # =========================================================================
     # 3. DEVICE CHECK - DISABLED (same device used for testing)
@@ -150,177 +210,96 @@ def generate_fraud_reasons(
     # =========================================================================
     # 4. NEW RECIPIENT / BENEFICIARY
     # =========================================================================
-    is_new_recipient = float(features.get("is_new_recipient", 0))
-    recipient_tx_count = float(features.get("recipient_tx_count", 1))
-    
-    if is_new_recipient > 0:
-        reasons.append(FraudReason(
-            "Payment to new recipient",
-            "low",
-            "is_new_recipient",
-            is_new_recipient
-        ))
-    elif recipient_tx_count == 1:
-        reasons.append(FraudReason(
-            "First transaction to this recipient",
-            "low",
-            "recipient_tx_count",
-            recipient_tx_count
-        ))
+    is_new_recipient = col("is_new_recipient")
+    recipient_tx_count = col("recipient_tx_count")
+    
+    emit(is_new_recipient > 0, "low", "is_new_recipient", is_new_recipient,
+         "Payment to new recipient")
+    emit(~(is_new_recipient > 0) & (recipient_tx_count == 1), "low", "recipient_tx_count",
+         recipient_tx_count, "First transaction to this recipient")
     
     # =========================================================================
     # 5. VELOCITY FRAUD (too many transactions in short time)
     # =========================================================================
-    tx_count_1min = float(features.get("tx_count_1min", 0))
-    tx_count_5min = float(features.get("tx_count_5min", 0))
-    tx_count_1h = float(features.get("tx_count_1h", 0))
-    tx_count_6h = float(features.get("tx_count_6h", 0))
-    tx_count_24h = float(features.get("tx_count_24h", 0))
+    tx_count_1min = col("tx_count_1min")
+    tx_count_5min = col("tx_count_5min")
+    tx_count_1h = col("tx_count_1h")
+    tx_count_6h = col("tx_count_6h")
     
     # Per-minute velocity
-    if tx_count_1min > 3:
-        reasons.append(FraudReason(
-            f"{int(tx_count_1min)} transactions in last 1 minute - potential card testing",
-            "critical",
-            "tx_count_1min",
-            tx_count_1min
-        ))
+    emit(tx_count_1min > 3, "critical", "tx_count_1min", tx_count_1min,
+         lambda i: f"{int(tx_count_1min[i])} transactions in last 1 minute - potential card testing")
     
     # Per-5-minute velocity
-    if tx_count_5min > 10:
-        reasons.append(FraudReason(
-            f"{int(tx_count_5min)} transactions in last 5 minutes - extremely high velocity",
-            "critical",
-            "tx_count_5min",
-            tx_count_5min
-        ))
-    elif tx_count_5min > 5:
-        reasons.append(FraudReason(
-            "Too many transactions in short time (5 minutes)",
-            "high",
-            "tx_count_5min",
-            tx_count_5min
-        ))
+    emit(tx_count_5min > 10, "critical", "tx_count_5min", tx_count_5min,
+         lambda i: f"{int(tx_count_5min[i])} transactions in last 5 minutes - extremely high velocity")
+    emit((tx_count_5min > 5) & (tx_count_5min <= 10), "high", "tx_count_5min", tx_count_5min,
+         "Too many transactions in short time (5 minutes)")
     
     # Hourly velocity
-    if tx_count_1h > 30:
-        reasons.append(FraudReason(
-            f"{int(tx_count_1h)} transactions in last hour",
-            "high",
-            "tx_count_1h",
-            tx_count_1h
-        ))
-    elif tx_count_1h > 15:
-        reasons.append(FraudReason(
-            "Unusually high transaction volume in the last hour",
-            "medium",
-            "tx_count_1h",
-            tx_count_1h
-        ))
+    emit(tx_count_1h > 30, "high", "tx_count_1h", tx_count_1h,
+         lambda i: f"{int(tx_count_1h[i])} transactions in last hour")
+    emit((tx_count_1h > 15) & (tx_count_1h <= 30), "medium", "tx_count_1h", tx_count_1h,
+         "Unusually high transaction volume in the last hour")
     
     # 6-hour velocity
-    if tx_count_6h > 50:
-        reasons.append(FraudReason(
-            f"{int(tx_count_6h)} transactions in last 6 hours",
-            "medium",
-            "tx_count_6h",
-            tx_count_6h
-        ))
+    emit(tx_count_6h > 50, "medium", "tx_count_6h", tx_count_6h,
+         lambda i: f"{int(tx_count_6h[i])} transactions in last 6 hours")
     
     # =========================================================================
     # 6. TEMPORAL RISK (time-based patterns)
     # =========================================================================
-    is_night = float(features.get("is_night", 0))
-    is_weekend = float(features.get("is_weekend", 0))
-    is_business_hours = float(features.get("is_business_hours", 0))
-    hour_of_day = float(features.get("hour_of_day", 0))
-    
-    if is_night > 0:
-        reasons.append(FraudReason(
-            f"Transaction at unusual hour ({int(hour_of_day)}:00) - late night activity",
-            "medium",
-            "is_night",
-            is_night
-        ))
-    
-    if is_weekend > 0 and is_night > 0:
-        reasons.append(FraudReason(
-            "Weekend late-night transaction - atypical user behavior",
-            "medium",
-            "weekend_night",
-            1.0
-        ))
+    is_night = col("is_night")
+    is_weekend = col("is_weekend")
+    hour_of_day = col("hour_of_day")
+    
+    emit(is_night > 0, "medium", "is_night", is_night,
+         lambda i: f"Transaction at unusual hour ({int(hour_of_day[i])}:00) - late night activity")
+    emit((is_weekend > 0) & (is_night > 0), "medium", "weekend_night", 1.0,
+         "Weekend late-night transaction - atypical user behavior")
     
     # =========================================================================
     # 7. MERCHANT / RECIPIENT RISK
     # =========================================================================
-    merchant_risk_score = float(features.get("merchant_risk_score", 0))
-    
-    if merchant_risk_score > 0.7:
-        reasons.append(FraudReason(
-            "Recipient profile indicates potential risk (suspicious merchant ID format)",
-            "medium",
-            "merchant_risk_score",
-            merchant_risk_score
-        ))
-    elif merchant_risk_score > 0.4:
-        reasons.append(FraudReason(
-            "Recipient has characteristics of high-risk merchant",
-            "low",
-            "merchant_risk_score",
-            merchant_risk_score
-        ))
+    merchant_risk_score = col("merchant_risk_score")
+    
+    emit(merchant_risk_score > 0.7, "medium", "merchant_risk_score", merchant_risk_score,
+         "Recipient profile indicates potential risk (suspicious merchant ID format)")
+    emit((merchant_risk_score > 0.4) & (merchant_risk_score <= 0.7), "low", "merchant_risk_score",
+         merchant_risk_score, "Recipient has characteristics of high-risk merchant")
     
     # =========================================================================
     # 8. CHANNEL RISK
     # =========================================================================
-    is_qr_channel = float(features.get("is_qr_channel", 0))
-    is_web_channel = float(features.get("is_web_channel", 0))
-    
-    if is_qr_channel > 0:
-        reasons.append(FraudReason(
-            "QR code transaction - higher risk channel",
-            "low",
-            "is_qr_channel",
-            is_qr_channel
-        ))
-    
-    if is_web_channel > 0:
-        reasons.append(FraudReason(
-            "Web-based transaction - requires additional verification",
-            "low",
-            "is_web_channel",
-            is_web_channel
-        ))
+    is_qr_channel = col("is_qr_channel")
+    is_web_channel = col("is_web_channel")
+    
+    emit(is_qr_channel > 0, "low", "is_qr_channel", is_qr_channel,
+         "QR code transaction - higher risk channel")
+    emit(is_web_channel > 0, "low", "is_web_channel", is_web_channel,
+         "Web-based transaction - requires additional verification")
     
     # =========================================================================
     # 9. P2M RISK (Peer-to-Merchant)
     # =========================================================================
-    is_p2m = float(features.get("is_p2m", 0))
+    is_p2m = col("is_p2m")
     
-    if is_p2m > 0 and amount > 10000:
-        reasons.append(FraudReason(
-            "Large P2M (Peer-to-Merchant) transaction - higher fraud risk category",
-            "medium",
-            "is_p2m",
-            is_p2m
-        ))
+    emit((is_p2m > 0) & (amount > 10000), "medium", "is_p2m", is_p2m,
+         "Large P2M (Peer-to-Merchant) transaction - higher fraud risk category")
     
     # =========================================================================
     # 10. FALLBACK: Normal transaction
     # =========================================================================
-    if not reasons:
-        reasons.append(FraudReason(
-            "No suspicious patterns detected - normal transaction profile",
-            "low",
-            "normal_pattern",
-            0.0
-        ))
+    normal = np.array([not r for r in reasons], dtype=bool)
+    emit(normal, "low", "normal_pattern", 0.0,
+         "No suspicious patterns detected - normal transaction profile")
     
-    # Calculate composite risk score based on reasons
-    composite_score = calculate_composite_risk_score(reasons, ensemble_score)
+    # Composite risk score, same blend as calculate_composite_risk_score
+    reason_score = np.minimum(reason_weight / 2.0, 1.0)
+    composite = np.minimum(0.7 * reason_score + 0.3 * ensemble_score, 1.0)
+    composite[normal] = 0.0  # No fraud indicators
     
-    return reasons, composite_score
+    return [(reasons[i], float(composite[i])) for i in range(n)]
 
 
 def calculate_composite_risk_score(reasons: List[FraudReason], ml_score: float) -> float:
@@ -385,10 +364,10 @@ def categorize_fraud_risk(
     """
     
     if thresholds is None:
-        thresholds = {"delay": 0.35, "block": 0.70}
+        thresholds = {"delay": DELAY_THRESHOLD, "block": BLOCK_THRESHOLD}
     
-    delay_threshold = thresholds.get("delay", 0.35)
-    block_threshold = thresholds.get("block", 0.70)
+    delay_threshold = thresholds.get("delay", DELAY_THRESHOLD)
+    block_threshold = thresholds.get("block", BLOCK_THRESHOLD)
     
     # Determine risk level
     if ensemble_score >= block_threshold:
@@ -450,6 +450,85 @@ def db_insert_transaction(tx: Dict[str, Any]):
     finally:
         conn.close()
 
+def db_insert_transactions_batch(txs: List[Dict[str, Any]]):
+    """Insert many transactions with one multi-row INSERT (psycopg2 execute_values)."""
+    if not txs:
+        return []
+    conn = get_conn()
+    try:
+        cur = conn.cursor()
+        has_expl = _ensure_explainability_column(conn)
+        cols = "tx_id, user_id, device_id, ts, amount, recipient_vpa, tx_type, channel, db_status, action, risk_score, created_at"
+        base_rows = [
+            (
+                tx.get("tx_id"),
+                tx.get("user_id"),
+                tx.get("device_id"),
+                tx.get("ts"),
+                tx.get("amount"),
+                tx.get("recipient_vpa"),
+                tx.get("tx_type"),
+                tx.get("channel"),
+                tx.get("risk_score"),
+                tx.get("action"),
+                tx.get("db_status", "inserted"),
+            )
+            for tx in txs
+        ]
+
+        if has_expl:
+            try:
+                rows = psycopg2.extras.execute_values(
+                    cur,
+                    f"""
+                    INSERT INTO public.transactions
+                    (tx_id, user_id, device_id, ts, amount, recipient_vpa, tx_type, channel, risk_score, action, db_status, explainability, created_at)
+                    VALUES %s
+                    ON CONFLICT (tx_id) DO UPDATE
+                      SET risk_score = EXCLUDED.risk_score,
+                          action = EXCLUDED.action,
+                          db_status = EXCLUDED.db_status,
+                          explainability = EXCLUDED.explainability,
+                          created_at = now()
+                    RETURNING {cols}, explainability;
+                    """,
+                    [row + (psycopg2.extras.Json(tx.get("explainability")),) for row, tx in zip(base_rows, txs)],
+                    template="(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s, now())",
+                    page_size=len(base_rows),
+                    fetch=True,
+                )
+                conn.commit()
+                cur.close()
+                return rows
+            except Exception as e:
+                conn.rollback()
+                print("Explainability column batch write failed, falling back without explainability:", e)
+
+        # Fallback without explainability
+        rows = psycopg2.extras.execute_values(
+            cur,
+            f"""
+            INSERT INTO public.transactions
+            (tx_id, user_id, device_id, ts, amount, recipient_vpa, tx_type, channel, risk_score, action, db_status, created_at)
+            VALUES %s
+            ON CONFLICT (tx_id) DO UPDATE
+              SET risk_score = EXCLUDED.risk_score,
+                  action = EXCLUDED.action,
+                  db_status = EXCLUDED.db_status,
+                  created_at = now()
+            RETURNING {cols};
+            """,
+            base_rows,
+            template="(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s, now())",
+            page_size=len(base_rows),
+            fetch=True,
+        )
+        conn.commit()
+        cur.close()
+        return rows
+    finally:
+        conn.close()
+
 def db_recent_transactions(limit=50, range_clause=None):
     conn = get_conn()
     try:
@@ -700,6 +779,9 @@ def db_update_action(tx_id, action, risk_score=None, explainability=None):
         conn.close()
 
 # --- analytics helpers ---
+# Risk-distribution labels by width_bucket(risk_score, ARRAY[0.3, 0.6, 0.8]) index
+RISK_BUCKET_LABELS = ("low", "medium", "high", "critical")
+
 def db_dashboard_analytics(time_range: str):
     since = parse_time_range(time_range)
     bucket_unit = 'hour'
@@ -718,32 +800,32 @@ def db_dashboard_analytics(time_range: str):
     try:
         cur = conn.cursor()
 
-        # Risk distribution
+        # Risk distribution: width_bucket assigns each row its bucket once
+        # (0 = low, 1 = medium, 2 = high, 3 = critical; NULL scores drop out)
         if since:
             cur.execute(
                 """
-                SELECT
-                  SUM(CASE WHEN risk_score < 0.3 THEN 1 ELSE 0 END) AS low,
-                  SUM(CASE WHEN risk_score >= 0.3 AND risk_score < 0.6 THEN 1 ELSE 0 END) AS medium,
-                  SUM(CASE WHEN risk_score >= 0.6 AND risk_score < 0.8 THEN 1 ELSE 0 END) AS high,
-                  SUM(CASE WHEN risk_score >= 0.8 THEN 1 ELSE 0 END) AS critical
+                SELECT width_bucket(risk_score::numeric, ARRAY[0.3, 0.6, 0.8]) AS bucket,
+                       COUNT(*) AS n
                 FROM public.transactions
-                WHERE created_at >= %s;
+                WHERE created_at >= %s AND risk_score IS NOT NULL
+                GROUP BY bucket;
                 """,
                 (since,)
             )
         else:
             cur.execute(
                 """
-                SELECT
-                  SUM(CASE WHEN risk_score < 0.3 THEN 1 ELSE 0 END) AS low,
-                  SUM(CASE WHEN risk_score >= 0.3 AND risk_score < 0.6 THEN 1 ELSE 0 END) AS medium,
-                  SUM(CASE WHEN risk_score >= 0.6 AND risk_score < 0.8 THEN 1 ELSE 0 END) AS high,
-                  SUM(CASE WHEN risk_score >= 0.8 THEN 1 ELSE 0 END) AS critical
-                FROM public.transactions;
+                SELECT width_bucket(risk_score::numeric, ARRAY[0.3, 0.6, 0.8]) AS bucket,
+                       COUNT(*) AS n
+                FROM public.transactions
+                WHERE risk_score IS NOT NULL
+                GROUP BY bucket;
                 """
             )
-        risk_row = cur.fetchone() or {"low": 0, "medium": 0, "high": 0, "critical": 0}
+        risk_row = dict.fromkeys(RISK_BUCKET_LABELS, 0)
+        for r in cur.fetchall() or []:
+            risk_row[RISK_BUCKET_LABELS[r["bucket"]]] = r["n"]
 
         # Timeline buckets
         dt_expr = f"date_trunc('{bucket_unit}', created_at)"
@@ -949,11 +1031,8 @@ async def recent_transactions(limit: int = 300, time_range: str = "24h"):
     result = await run_in_threadpool(query)
     return {"transactions": result}
 
-@app.post("/transactions")
-async def new_transaction(request: Request):
-    body = await request.json()
-    tx = dict(body)
-
+def _score_and_annotate(tx: Dict[str, Any]) -> str:
+    """Score a transaction in place (risk_score, explainability, action); returns confidence level."""
     # Enhanced scoring with ensemble models
     scoring_details = None
     risk_score = None
@@ -1037,6 +1116,15 @@ async def new_transaction(request: Request):
         else:
             tx["action"] = "ALLOW"
 
+    return confidence_level
+
+@app.post("/transactions")
+async def new_transaction(request: Request):
+    body = await request.json()
+    tx = dict(body)
+
+    confidence_level = _score_and_annotate(tx)
+
     inserted = await run_in_threadpool(db_insert_transaction, tx)
     if isinstance(inserted, dict):
         inserted["confidence_level"] = confidence_level
@@ -1048,6 +1136,39 @@ async def new_transaction(request: Request):
 
     return {"status": "ok", "inserted": inserted}
 
+@app.post("/transactions/batch")
+async def new_transactions_batch(request: Request):
+    """Score and insert a JSON array of transactions with a single multi-row INSERT."""
+    body = await request.json()
+    if not isinstance(body, list):
+        return JSONResponse({"status": "error", "detail": "Expected a JSON array of transactions"}, status_code=400)
+
+    txs = [dict(item) for item in body]
+    # ON CONFLICT DO UPDATE cannot touch the same row twice in one INSERT
+    seen, duplicates = set(), set()
+    for tx in txs:
+        tx_id = tx.get("tx_id")
+        if tx_id in seen:
+            duplicates.add(tx_id)
+        seen.add(tx_id)
+    if duplicates:
+        return JSONResponse(
+            {"status": "error", "detail": f"Duplicate tx_id in batch: {', '.join(sorted(map(str, duplicates)))}"},
+            status_code=400
+        )
+
+    for tx in txs:
+        _score_and_annotate(tx)
+
+    inserted_rows = await run_in_threadpool(db_insert_transactions_batch, txs)
+    confidence_by_id = {tx.get("tx_id"): tx.get("confidence_level", "HIGH") for tx in txs}
+    inserted_rows = [attach_confidence_level(row, confidence_by_id.get(row["tx_id"], "HIGH")) for row in inserted_rows]
+
+    for row in inserted_rows:
+        asyncio.create_task(ws_manager.broadcast({"type": "tx_inserted", "data": row}))
+
+    return {"status": "ok", "inserted": inserted_rows}
+
 # --- admin pages & actions ---
 @app.get("/admin/login", response_class=HTMLResponse)
 def admin_login_page(request: Request):
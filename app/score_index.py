@@ -0,0 +1,30 @@
+"""
+Fixed-length model score array layout shared by scoring and fraud_reasons.
+
+Depends only on numpy so fraud_reasons can use it without pulling in the
+model-loading machinery in scoring.
+"""
+
+import numpy as np
+
+
+class ScoreIdx:
+    """Column order of the fixed-length model score array (see scores_from_dict)."""
+    ENSEMBLE = 0
+    IFOREST = 1
+    RF = 2
+    XGB = 3
+    SIZE = 4
+
+
+def scores_from_dict(scores: dict) -> np.ndarray:
+    """Pack a score_with_ensemble() dict into a float64 array in ScoreIdx order.
+    
+    Missing or None model scores (model not loaded) become 0.0.
+    """
+    out = np.empty(ScoreIdx.SIZE, dtype=np.float64)
+    out[ScoreIdx.ENSEMBLE] = scores.get("ensemble") or 0.0
+    out[ScoreIdx.IFOREST] = scores.get("iforest") or 0.0
+    out[ScoreIdx.RF] = scores.get("random_forest") or 0.0
+    out[ScoreIdx.XGB] = scores.get("xgboost") or 0.0
+    return out
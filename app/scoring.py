@@ -6,7 +6,7 @@ Uses multiple trained models with proper feature extraction and ensemble voting
 import os
 import math
 from datetime import datetime, timezone
-from typing import Dict, Optional, Union, Any
+from typing import Dict, List, Optional, Union, Any
 import numpy as np
 
 try:
@@ -21,6 +21,10 @@ _RANDOM_FOREST = None
 _XGBOOST = None
 _MODEL_METADATA = None
 
+# Memory-map the ndarray payloads (tree node arrays) of uncompressed joblib
+# files instead of copying them into the heap; repeat loads hit the page cache.
+MODEL_MMAP_MODE = "r"
+
 def load_models():
     """Load all trained models (cached after first load)."""
     global _MODELS_LOADED, _IFOREST, _RANDOM_FOREST, _XGBOOST, _MODEL_METADATA
@@ -38,19 +42,19 @@ def load_models():
         print(f"[INFO] Looking for models in: {model_dir}")
         
         try:
-            _IFOREST = joblib.load(os.path.join(model_dir, "iforest.joblib"))
+            _IFOREST = joblib.load(os.path.join(model_dir, "iforest.joblib"), mmap_mode=MODEL_MMAP_MODE)
             print("[OK] Loaded Isolation Forest model")
         except Exception as e:
             print(f"[WARN] Could not load Isolation Forest: {e}")
         
         try:
-            _RANDOM_FOREST = joblib.load(os.path.join(model_dir, "random_forest.joblib"))
+            _RANDOM_FOREST = joblib.load(os.path.join(model_dir, "random_forest.joblib"), mmap_mode=MODEL_MMAP_MODE)
             print("[OK] Loaded Random Forest model")
         except Exception as e:
             print(f"[WARN] Could not load Random Forest: {e}")
         
         try:
-            _XGBOOST = joblib.load(os.path.join(model_dir, "xgboost.joblib"))
+            _XGBOOST = joblib.load(os.path.join(model_dir, "xgboost.joblib"), mmap_mode=MODEL_MMAP_MODE)
             print("[OK] Loaded XGBoost model")
         except Exception as e:
             print(f"[WARN] Could not load XGBoost: {e}")
@@ -178,56 +182,106 @@ def score_with_ensemble(features_dict: dict) -> Dict[str, float]:
     Returns:
         dict with scores from each model and ensemble score
     """
+    return score_with_ensemble_batch([features_dict])[0]
+
+
+def score_with_ensemble_batch(features_list: List[dict]) -> List[Dict[str, float]]:
+    """
+    Score many feature dicts with one predict call per model.
+    
+    Rows are stacked into an (N, F) matrix so sklearn/XGBoost run their
+    vectorized predict paths once instead of N times with 1-row inputs.
+    
+    Returns:
+        list of score dicts, in the same order as features_list
+    """
+    if not features_list:
+        return []
+    
     # Lazy load models
     if not _MODELS_LOADED:
         load_models()
     
-    # Convert features to vector
-    try:
-        feature_vec = features_to_vector(features_dict)
-        feature_vec = feature_vec.reshape(1, -1)  # Shape for prediction
-    except Exception as e:
-        print(f"Error converting features: {e}")
-        fallback_score = fallback_rule_based_score(features_dict)
-        return {
-            "ensemble": fallback_score,
-            "final_risk_score": fallback_score,
-            "disagreement": 0.0,
-            "confidence_level": "LOW",
-            "iforest": None,
-            "random_forest": None,
-            "xgboost": None
-        }
+    # Convert features to matrix; a row that fails to convert gets the
+    # rule-based fallback without taking the rest of the batch with it
+    vectors = []
+    good = []
+    results = [None] * len(features_list)
+    for i, features_dict in enumerate(features_list):
+        try:
+            vectors.append(features_to_vector(features_dict))
+            good.append(i)
+        except Exception as e:
+            print(f"Error converting features (row {i}): {e}")
+            try:
+                fallback_score = fallback_rule_based_score(features_dict)
+            except Exception:
+                # Same neutral score as the emergency fallback in score_transactions
+                fallback_score = 0.5
+            results[i] = {
+                "ensemble": fallback_score,
+                "final_risk_score": fallback_score,
+                "disagreement": 0.0,
+                "confidence_level": "LOW",
+                "iforest": None,
+                "random_forest": None,
+                "xgboost": None
+            }
+    if not good:
+        return results
+    X = np.vstack(vectors)
     
-    scores = {}
+    model_columns = {}
     
     # Isolation Forest (unsupervised)
     if _IFOREST:
         try:
-            # Anomaly score: higher = more anomalous
-            anomaly_score = -_IFOREST.decision_function(feature_vec)[0]
-            # Normalize to 0-1
-            iforest_score = 1 / (1 + math.exp(-anomaly_score))
-            scores["iforest"] = float(max(0.0, min(1.0, iforest_score)))
+            # Anomaly score: higher = more anomalous; normalize to 0-1
+            anomaly_scores = -_IFOREST.decision_function(X)
+            model_columns["iforest"] = np.clip(1 / (1 + np.exp(-anomaly_scores)), 0.0, 1.0)
         except Exception as e:
             print(f"Isolation Forest scoring error: {e}")
     
     # Random Forest (supervised)
     if _RANDOM_FOREST:
         try:
-            rf_proba = _RANDOM_FOREST.predict_proba(feature_vec)[0, 1]  # Probability of fraud
-            scores["random_forest"] = float(rf_proba)
+            model_columns["random_forest"] = _RANDOM_FOREST.predict_proba(X)[:, 1]  # Probability of fraud
         except Exception as e:
             print(f"Random Forest scoring error: {e}")
     
     # XGBoost (supervised)
     if _XGBOOST:
         try:
-            xgb_proba = _XGBOOST.predict_proba(feature_vec)[0, 1]  # Probability of fraud
-            scores["xgboost"] = float(xgb_proba)
+            model_columns["xgboost"] = _XGBOOST.predict_proba(X)[:, 1]  # Probability of fraud
         except Exception as e:
             print(f"XGBoost scoring error: {e}")
     
+    for row, i in enumerate(good):
+        results[i] = _combine_model_scores(
+            {model: float(col[row]) for model, col in model_columns.items()}, features_list[i]
+        )
+    return results
+
+
+_WARMED = False
+
+def _warm():
+    """Load the models and push one dummy row through every predict path.
+    
+    The first predict on a freshly unpickled model pays one-off setup
+    (feature_engine import, thread pools, XGBoost booster configuration);
+    call this before timing or serving so real requests don't. Idempotent.
+    """
+    global _WARMED
+    if _WARMED:
+        return
+    load_models()
+    score_with_ensemble_batch([{}])
+    _WARMED = True
+
+
+def _combine_model_scores(scores: Dict[str, float], features_dict: dict) -> Dict[str, float]:
+    """Add ensemble, final_risk_score, disagreement and confidence_level to per-model scores."""
     # Ensemble: weighted average
     if scores:
         # Weight supervised models higher than unsupervised
@@ -334,45 +388,46 @@ def score_transaction(tx: dict, return_details: bool = False) -> Union[float, Di
         float risk score (default) OR
         dict {"risk_score", "final_risk_score", "model_scores", "disagreement", "confidence_level", "reasons", "features"}
     """
-    try:
-        # Extract features
-        features = extract_features(tx)
-
-        # Score with ensemble
-        model_scores = score_with_ensemble(features)
-        risk_score = model_scores.get("ensemble", 0.0)
-        final_risk_score = model_scores.get("final_risk_score", risk_score)
-        disagreement = model_scores.get("disagreement", 0.0)
-        confidence_level = model_scores.get("confidence_level", "HIGH")
-
-        if not return_details:
-            return risk_score
-
-        # Build explainability reasons using the dedicated module (no scoring done here)
-        reasons = explain_transaction(
-            features,
-            {
-                "iforest_score": model_scores.get("iforest"),
-                "rf_proba": model_scores.get("random_forest"),
-                "xgb_proba": model_scores.get("xgboost"),
-            },
-        )
+    return score_transactions([tx], return_details=return_details)[0]
 
-        return {
-            "risk_score": risk_score,
-            "final_risk_score": final_risk_score,
-            "model_scores": model_scores,
-            "disagreement": disagreement,
-            "confidence_level": confidence_level,
-            "reasons": reasons,
-            "features": features,
-        }
 
+def score_transactions(txs: List[dict], return_details: bool = False) -> List[Union[float, Dict[str, Any]]]:
+    """
+    Batch variant of score_transaction: features for every transaction are
+    stacked and each model predicts once for the whole batch.
+
+    Returns:
+        list of float risk scores OR detail dicts (see score_transaction), in input order
+    """
+    try:
+        return _score_batch(txs, return_details)
     except Exception as e:
         print(f"Scoring error: {e}")
-        # Emergency fallback
-        if return_details:
-            return {
+        if len(txs) <= 1:
+            return _fallback_results(len(txs), return_details)
+    # Re-score row by row so only the rows that raise get the fallback
+    return [score_transaction(tx, return_details=return_details) for tx in txs]
+
+
+def _score_batch(txs: List[dict], return_details: bool) -> List[Union[float, Dict[str, Any]]]:
+    """score_transactions without the error fallback."""
+    # Extract features
+    features_list = [extract_features(tx) for tx in txs]
+
+    # Score with ensemble
+    model_scores_list = score_with_ensemble_batch(features_list)
+
+    return [
+        _build_score_result(features, model_scores, return_details)
+        for features, model_scores in zip(features_list, model_scores_list)
+    ]
+
+
+def _fallback_results(n: int, return_details: bool) -> List[Union[float, Dict[str, Any]]]:
+    """Emergency fallback scores used when scoring raises."""
+    if return_details:
+        return [
+            {
                 "risk_score": 0.5,
                 "final_risk_score": 0.5,
                 "model_scores": {},
@@ -381,7 +436,40 @@ def score_transaction(tx: dict, return_details: bool = False) -> Union[float, Di
                 "reasons": ["Scoring fallback due to error"],
                 "features": {},
             }
-        return 0.5
+            for _ in range(n)
+        ]
+    return [0.5] * n
+
+
+def _build_score_result(features: dict, model_scores: Dict[str, float], return_details: bool) -> Union[float, Dict[str, Any]]:
+    """Shape one transaction's scores into the score_transaction return value."""
+    risk_score = model_scores.get("ensemble", 0.0)
+    final_risk_score = model_scores.get("final_risk_score", risk_score)
+    disagreement = model_scores.get("disagreement", 0.0)
+    confidence_level = model_scores.get("confidence_level", "HIGH")
+
+    if not return_details:
+        return risk_score
+
+    # Build explainability reasons using the dedicated module (no scoring done here)
+    reasons = explain_transaction(
+        features,
+        {
+            "iforest_score": model_scores.get("iforest"),
+            "rf_proba": model_scores.get("random_forest"),
+            "xgb_proba": model_scores.get("xgboost"),
+        },
+    )
+
+    return {
+        "risk_score": risk_score,
+        "final_risk_score": final_risk_score,
+        "model_scores": model_scores,
+        "disagreement": disagreement,
+        "confidence_level": confidence_level,
+        "reasons": reasons,
+        "features": features,
+    }
 
 
 # Legacy compatibility functions
@@ -85,6 +85,36 @@ def generate_upi_transaction_id(timestamp: Optional[datetime] = None, db_cursor=
     
     return tx_id
 
+def generate_upi_transaction_ids(count: int, timestamp: Optional[datetime] = None) -> list:
+    """
+    Generate `count` 12-digit UPI transaction IDs in one call.
+    
+    The date prefix is formatted once and a block of consecutive sequence
+    numbers is reserved from the in-memory counter, so the IDs are unique
+    without per-ID collision checks. For bulk work such as migrations.
+    
+    Args:
+        count: Number of IDs to generate
+        timestamp: Optional datetime object. If None, uses current UTC time.
+    
+    Returns:
+        List of 12-digit transaction IDs as strings
+    
+    Raises:
+        ValueError: If count exceeds the 999999 sequence numbers left in a day
+    """
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc)
+    
+    date_component = timestamp.strftime("%y%m%d")
+    
+    first = _sequence_counter.get(date_component, 0) + 1
+    if first + count - 1 > 999999:
+        raise ValueError(f"Cannot generate {count} IDs for {date_component}: sequence would exceed 999999")
+    _sequence_counter[date_component] = first + count - 1
+    
+    return [f"{date_component}{sequence:06d}" for sequence in range(first, first + count)]
+
 def parse_upi_transaction_id(tx_id: str) -> dict:
     """
     Parse a UPI transaction ID to extract components.
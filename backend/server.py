@@ -5,6 +5,7 @@ FastAPI server with user authentication, transaction processing, and ML-based fr
 import os
 import sys
 import uuid
+import logging
 import json
 import asyncio
 from contextlib import asynccontextmanager
@@ -100,6 +101,15 @@ ROOT_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(ROOT_DIR / ".env")
 load_dotenv(ROOT_DIR / ".env.local", override=True)
 
+# Root log level (set LOG_LEVEL=DEBUG to see per-connection WebSocket/WebAuthn events)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+
+# Thresholds are parsed once from the (now loaded) environment
+from app.config import DELAY_THRESHOLD, BLOCK_THRESHOLD
+
 # Configuration
 DEFAULT_DB_URL = ""
 CFG_PATH = Path(__file__).resolve().parent.parent / "config" / "config.yaml"
@@ -1735,8 +1745,8 @@ async def create_transaction(tx_data: TransactionCreate, user_id: str = Depends(
             risk_score = 0.0
             buffer_action = "NONE"
             risk_buffer_value = 0.0
-            delay_threshold = float(os.getenv("DELAY_THRESHOLD", "0.30"))
-            block_threshold = float(os.getenv("BLOCK_THRESHOLD", "0.60"))
+            delay_threshold = DELAY_THRESHOLD
+            block_threshold = BLOCK_THRESHOLD
             scoring_details = {}
             fraud_reasons_list = []
             features = {}
@@ -1855,8 +1865,8 @@ async def create_transaction(tx_data: TransactionCreate, user_id: str = Depends(
                     print(f"  Dynamic thresholds: delay={delay_threshold:.3f}, block={block_threshold:.3f}")
                 except Exception as e:
                     print(f"Dynamic thresholds error: {e} - using static defaults")
-                    delay_threshold = float(os.getenv("DELAY_THRESHOLD", "0.30"))
-                    block_threshold = float(os.getenv("BLOCK_THRESHOLD", "0.60"))
+                    delay_threshold = DELAY_THRESHOLD
+                    block_threshold = BLOCK_THRESHOLD
                 
                 # --- Step 5: Record features for Drift Monitoring ---
                 try:
@@ -5,6 +5,7 @@ Handles WebAuthn credential registration and authentication flows
 
 import os
 import json
+import logging
 import secrets
 import base64
 from typing import Optional, Tuple
@@ -23,6 +24,8 @@ from webauthn.helpers.structs import (
 )
 from webauthn.helpers import base64url_to_bytes, bytes_to_base64url
 
+logger = logging.getLogger(__name__)
+
 
 # Redis configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -37,7 +40,7 @@ def get_redis_client():
         client.ping()
         return client
     except Exception as e:
-        print(f"⚠ Redis connection failed: {e}")
+        logger.warning("Redis connection failed: %s", e)
         return None
 
 
@@ -70,7 +73,7 @@ def store_challenge(user_id: str, challenge: str, challenge_type: str) -> bool:
         )
         return True
     except Exception as e:
-        print(f"⚠ Failed to store challenge: {e}")
+        logger.warning("Failed to store challenge: %s", e)
         return False
 
 
@@ -101,7 +104,7 @@ def retrieve_challenge(user_id: str, challenge_type: str) -> Optional[str]:
         
         return None
     except Exception as e:
-        print(f"⚠ Failed to retrieve challenge: {e}")
+        logger.warning("Failed to retrieve challenge: %s", e)
         return None
 
 
@@ -176,7 +179,7 @@ def generate_registration_challenge(
             }
         }
     except Exception as e:
-        print(f"⚠ Failed to generate registration challenge: {e}")
+        logger.warning("Failed to generate registration challenge: %s", e)
         raise
 
 
@@ -235,7 +238,7 @@ def verify_registration(
         }
     
     except Exception as e:
-        print(f"⚠ Registration verification failed: {e}")
+        logger.warning("Registration verification failed: %s", e)
         return False, {"error": str(e)}
 
 
@@ -271,7 +274,7 @@ def generate_authentication_challenge(
             "userVerification": "preferred",
         }
     except Exception as e:
-        print(f"⚠ Failed to generate authentication challenge: {e}")
+        logger.warning("Failed to generate authentication challenge: %s", e)
         raise
 
 
@@ -336,5 +339,5 @@ def verify_authentication(
         }
     
     except Exception as e:
-        print(f"⚠ Authentication verification failed: {e}")
+        logger.warning("Authentication verification failed: %s", e)
         return False, {"error": str(e)}
@@ -4,9 +4,12 @@ Handles real-time WebSocket connections for Send Money feature
 """
 
 import json
-from typing import Dict, List
+import logging
+from typing import Dict, List, Optional, Union
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 class WebSocketManager:
     def __init__(self):
         """Initialize the WebSocket manager"""
@@ -27,7 +30,7 @@ class WebSocketManager:
             "connected_at": datetime.now()
         }
         
-        print(f"✓ WebSocket connected: user {user_id} (total: {len(self.active_connections)})")
+        logger.debug("WebSocket connected: user %s (total: %d)", user_id, len(self.active_connections))
 
     def disconnect(self, websocket):
         """Remove a WebSocket connection"""
@@ -46,14 +49,30 @@ class WebSocketManager:
             # Remove connection info
             del self.connection_info[websocket]
             
-            print(f"✗ WebSocket disconnected: user {user_id}")
+            logger.debug("WebSocket disconnected: user %s", user_id)
 
     async def send_personal_message(self, websocket, message: dict):
         """Send a message to a specific WebSocket connection"""
         try:
             await websocket.send_text(json.dumps(message))
         except Exception as e:
-            print(f"Error sending personal message: {e}")
+            logger.warning("Error sending personal message: %s", e)
+
+    async def send_personal_bytes(self, websocket, payload: Union[str, bytes]):
+        """Send an already-serialized JSON payload to a specific WebSocket connection
+
+        Lets bulk senders hoist serialization out of their loop:
+
+            payload = json.dumps(msg)
+            for ws in targets:
+                await ws_manager.send_personal_bytes(ws, payload)
+        """
+        try:
+            if isinstance(payload, bytes):
+                payload = payload.decode("utf-8")
+            await websocket.send_text(payload)
+        except Exception as e:
+            logger.warning("Error sending personal message: %s", e)
 
     async def send_to_user(self, user_id: str, message: dict):
         """Send a message to all connections for a specific user"""
@@ -65,16 +84,25 @@ class WebSocketManager:
                 try:
                     await connection.send_text(message_str)
                 except Exception as e:
-                    print(f"Error sending to user {user_id}: {e}")
+                    logger.warning("Error sending to user %s: %s", user_id, e)
                     disconnected_connections.append(connection)
             
             # Clean up dead connections
             for connection in disconnected_connections:
                 self.disconnect(connection)
 
-    async def broadcast_to_all(self, message: dict):
-        """Broadcast a message to all connected users"""
-        message_str = json.dumps(message)
+    async def broadcast_to_all(self, message: Optional[dict] = None, precomputed: Optional[Union[str, bytes]] = None):
+        """Broadcast a message to all connected users
+
+        Callers that broadcast the same payload repeatedly (heartbeats, counters)
+        can serialize it once and pass it as ``precomputed`` to skip json.dumps.
+        """
+        if precomputed is None:
+            message_str = json.dumps(message)
+        elif isinstance(precomputed, bytes):
+            message_str = precomputed.decode("utf-8")
+        else:
+            message_str = precomputed
         all_disconnected = []
         
         for user_id, connections in self.active_connections.items():
@@ -84,7 +112,7 @@ class WebSocketManager:
                 try:
                     await connection.send_text(message_str)
                 except Exception as e:
-                    print(f"Error broadcasting to user {user_id}: {e}")
+                    logger.warning("Error broadcasting to user %s: %s", user_id, e)
                     disconnected_for_user.append(connection)
             
             all_disconnected.extend(disconnected_for_user)
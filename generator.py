@@ -16,6 +16,11 @@ load_dotenv()
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 URL = "https://fdt-admin-backend.onrender.com/transactions"
+URL_BATCH = f"{URL}/batch"
+BATCH_SIZE = int(os.getenv("SIM_BATCH_SIZE", "32"))
+
+# Keep-alive session so batches reuse one connection
+SESSION = requests.Session()
 DB_URL = os.getenv("DB_URL", "").strip()
 
 # Load thresholds from config
@@ -160,26 +165,40 @@ def gen_tx():
 if __name__ == "__main__":
     print("=" * 80)
     print("🚀 UPI Fraud Detection Simulator Started")
-    print(f"📡 Posting to: {URL}")
+    print(f"📡 Posting to: {URL_BATCH} (batches of {BATCH_SIZE})")
     print(f"⚙️  Thresholds: DELAY={DELAY_THRESHOLD}, BLOCK={BLOCK_THRESHOLD}")
     print("=" * 80)
     
     while True:
-        tx = gen_tx()
+        batch = [gen_tx() for _ in range(BATCH_SIZE)]
         
         # Extract metadata for display
-        pattern = tx.pop("_pattern")
-        is_new_device = tx.pop("_is_new_device")
-        is_new_recipient = tx.pop("_is_new_recipient")
+        meta = [(tx.pop("_pattern"), tx.pop("_is_new_device"), tx.pop("_is_new_recipient")) for tx in batch]
         
         try:
-            r = requests.post(URL, json=tx, timeout=5)
+            r = SESSION.post(URL_BATCH, json=batch, timeout=30)
             response = r.json() if r.status_code == 200 else {"error": r.text}
-
+            inserted_rows = response.get("inserted", []) if isinstance(response.get("inserted"), list) else []
+            inserted_by_id = {row.get("tx_id"): row for row in inserted_rows if isinstance(row, dict)}
+            if "error" in response:
+                print(f"\n❌ Batch rejected: {response['error']}")
+        except Exception as e:
+            print(f"\n❌ Error: {e}")
+            inserted_by_id = {}
+        
+        # Pattern display
+        pattern_display = {
+            "normal": "✅ Normal",
+            "suspicious": "⚠️  Suspicious",
+            "high_risk": "🚨 High Risk",
+            "burst": "⚡ Burst"
+        }
+        
+        for tx, (pattern, is_new_device, is_new_recipient) in zip(batch, meta):
             # Extract response data
-            inserted = response.get("inserted", {}) if isinstance(response.get("inserted"), dict) else {}
-            risk_score = inserted.get("risk_score", 0) if isinstance(inserted, dict) else 0
-            action = inserted.get("action", "UNKNOWN") if isinstance(inserted, dict) else "UNKNOWN"
+            inserted = inserted_by_id.get(tx["tx_id"], {})
+            risk_score = inserted.get("risk_score", 0) or 0
+            action = inserted.get("action", "UNKNOWN")
             
             # Color codes for actions
             if action == "ALLOW":
@@ -191,14 +210,6 @@ if __name__ == "__main__":
             else:
                 action_icon = "❓"
             
-            # Pattern display
-            pattern_display = {
-                "normal": "✅ Normal",
-                "suspicious": "⚠️  Suspicious",
-                "high_risk": "🚨 High Risk",
-                "burst": "⚡ Burst"
-            }
-            
             # Print formatted output
             print(f"\n{'─' * 80}")
             print(f"Pattern:    {pattern_display.get(pattern, pattern)}")
@@ -206,10 +217,8 @@ if __name__ == "__main__":
             print(f"User:       {tx['user_id']:<15} Device: {tx['device_id'][:20]} {'🆕 NEW' if is_new_device else '✓ Known'}")
             print(f"Amount:     ₹{tx['amount']:<10.2f} Type: {tx['tx_type']:<5} Channel: {tx['channel']}")
             print(f"Recipient:  {tx['recipient_vpa']:<30} {'🆕 NEW' if is_new_recipient else '✓ Known'}")
-            print(f"Risk Score: {risk_score:.4f}")
+            print(f"Risk Score: {float(risk_score):.4f}")
             print(f"Action:     {action_icon} {action}")
-            
-        except Exception as e:
-            print(f"\n❌ Error: {e}")
         
-        time.sleep(0.2)
+        # Keep the same average rate as one transaction every 0.2s
+        time.sleep(0.2 * BATCH_SIZE)
@@ -2,7 +2,9 @@
 """Initialize database schema"""
 
 import psycopg2
+import psycopg2.pool
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -14,154 +16,196 @@ if not DB_URL:
     print("Set it with: set DB_URL=postgresql://...")
     exit(1)
 
+# All tables in dependency order; sent as one multi-statement query so the
+# tables are created in a single round-trip.
+SCHEMA_SQL = """
+-- users
+CREATE TABLE IF NOT EXISTS users (
+    user_id VARCHAR(100) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    phone VARCHAR(20) UNIQUE NOT NULL,
+    email VARCHAR(255),
+    password_hash TEXT NOT NULL,
+    balance DECIMAL(15, 2) DEFAULT 10000.00,
+    is_active BOOLEAN DEFAULT TRUE,
+    fingerprint_enabled BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- transactions
+CREATE TABLE IF NOT EXISTS transactions (
+    tx_id VARCHAR(100) PRIMARY KEY,
+    user_id VARCHAR(100) REFERENCES users(user_id),
+    device_id VARCHAR(100),
+    ts TIMESTAMP NOT NULL,
+    amount DECIMAL(15, 2) NOT NULL,
+    recipient_vpa VARCHAR(255) NOT NULL,
+    tx_type VARCHAR(50),
+    channel VARCHAR(50),
+    risk_score DECIMAL(5, 4) DEFAULT 0.0,
+    action VARCHAR(50),
+    db_status VARCHAR(50) DEFAULT 'pending',
+    remarks TEXT,
+    receiver_user_id VARCHAR(100) REFERENCES users(user_id),
+    status_history TEXT[] DEFAULT '{}',
+    amount_deducted_at TIMESTAMP,
+    amount_credited_at TIMESTAMP,
+    explainability JSONB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- fraud_alerts
+CREATE TABLE IF NOT EXISTS fraud_alerts (
+    alert_id SERIAL PRIMARY KEY,
+    tx_id VARCHAR(100) REFERENCES transactions(tx_id),
+    user_id VARCHAR(100) REFERENCES users(user_id),
+    alert_type VARCHAR(50),
+    risk_score DECIMAL(5, 4),
+    reason TEXT,
+    user_decision VARCHAR(50),
+    resolved_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- user_credentials
+CREATE TABLE IF NOT EXISTS user_credentials (
+    credential_id VARCHAR(255) PRIMARY KEY,
+    user_id VARCHAR(100) REFERENCES users(user_id),
+    public_key TEXT NOT NULL,
+    device_name VARCHAR(255),
+    transports TEXT[],
+    counter INTEGER DEFAULT 0,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- push_tokens
+CREATE TABLE IF NOT EXISTS push_tokens (
+    token_id SERIAL PRIMARY KEY,
+    user_id VARCHAR(100) REFERENCES users(user_id),
+    fcm_token TEXT NOT NULL,
+    device_id VARCHAR(100),
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- transaction_ledger
+CREATE TABLE IF NOT EXISTS transaction_ledger (
+    ledger_id SERIAL PRIMARY KEY,
+    tx_id VARCHAR(100) REFERENCES transactions(tx_id),
+    operation VARCHAR(50) NOT NULL,
+    user_id VARCHAR(100) REFERENCES users(user_id),
+    amount DECIMAL(15, 2) NOT NULL,
+    operation_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    remarks TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- user_daily_transactions
+CREATE TABLE IF NOT EXISTS user_daily_transactions (
+    record_id SERIAL PRIMARY KEY,
+    user_id VARCHAR(100) REFERENCES users(user_id),
+    transaction_date DATE NOT NULL,
+    total_amount DECIMAL(15, 2) DEFAULT 0.00,
+    transaction_count INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id, transaction_date)
+);
+"""
+
+# (name, table, columns[, partial-index predicate])
+indexes = [
+    ("idx_users_phone", "users", "phone"),
+    ("idx_tx_user_created", "transactions", "user_id, created_at DESC"),
+    ("idx_transactions_created_at", "transactions", "created_at"),
+    ("idx_tx_blocked", "transactions", "created_at DESC", "action = 'BLOCK'"),
+    ("idx_tx_highrisk", "transactions", "created_at DESC", "risk_score >= 0.6"),
+    ("idx_tx_missing_expl", "transactions", "created_at DESC", "explainability IS NULL"),
+    ("idx_transactions_receiver_user_id", "transactions", "receiver_user_id"),
+    ("idx_transaction_ledger_tx_id", "transaction_ledger", "tx_id"),
+    ("idx_transaction_ledger_user_id", "transaction_ledger", "user_id"),
+    ("idx_user_daily_transactions_user_date", "user_daily_transactions", "user_id, transaction_date")
+]
+
+# Superseded indexes: user_id is covered by idx_tx_user_created, and the
+# primary keys already index users.user_id and transactions.tx_id.
+dropped_indexes = [
+    "idx_users_user_id",
+    "idx_transactions_user_id",
+    "idx_transactions_tx_id",
+]
+
+INDEX_WORKERS = 8
+
+
+def create_table_indexes(pool, table_name, table_indexes):
+    """Build one table's indexes on its own pooled connection (autocommit)."""
+    sql = "\n".join(
+        f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})"
+        + (f" WHERE {where[0]}" if where else "") + ";"
+        for index_name, columns, *where in table_indexes
+    )
+    conn = pool.getconn()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(sql)
+    finally:
+        conn.autocommit = False
+        pool.putconn(conn)
+
+
 print(f"Connecting to database: {DB_URL[:50]}...")
 
+pool = None
 try:
-    conn = psycopg2.connect(DB_URL)
-    cur = conn.cursor()
+    pool = psycopg2.pool.ThreadedConnectionPool(1, INDEX_WORKERS, DB_URL)
     
     print("✓ Connected to database")
     
-    # Create users table
-    print("Creating users table...")
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            user_id VARCHAR(100) PRIMARY KEY,
-            name VARCHAR(255) NOT NULL,
-            phone VARCHAR(20) UNIQUE NOT NULL,
-            email VARCHAR(255),
-            password_hash TEXT NOT NULL,
-            balance DECIMAL(15, 2) DEFAULT 10000.00,
-            is_active BOOLEAN DEFAULT TRUE,
-            fingerprint_enabled BOOLEAN DEFAULT FALSE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Create transactions table
-    print("Creating transactions table...")
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS transactions (
-            tx_id VARCHAR(100) PRIMARY KEY,
-            user_id VARCHAR(100) REFERENCES users(user_id),
-            device_id VARCHAR(100),
-            ts TIMESTAMP NOT NULL,
-            amount DECIMAL(15, 2) NOT NULL,
-            recipient_vpa VARCHAR(255) NOT NULL,
-            tx_type VARCHAR(50),
-            channel VARCHAR(50),
-            risk_score DECIMAL(5, 4) DEFAULT 0.0,
-            action VARCHAR(50),
-            db_status VARCHAR(50) DEFAULT 'pending',
-            remarks TEXT,
-            receiver_user_id VARCHAR(100) REFERENCES users(user_id),
-            status_history TEXT[] DEFAULT '{}',
-            amount_deducted_at TIMESTAMP,
-            amount_credited_at TIMESTAMP,
-            explainability JSONB,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Create fraud_alerts table
-    print("Creating fraud_alerts table...")
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS fraud_alerts (
-            alert_id SERIAL PRIMARY KEY,
-            tx_id VARCHAR(100) REFERENCES transactions(tx_id),
-            user_id VARCHAR(100) REFERENCES users(user_id),
-            alert_type VARCHAR(50),
-            risk_score DECIMAL(5, 4),
-            reason TEXT,
-            user_decision VARCHAR(50),
-            resolved_at TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Create user_credentials table
-    print("Creating user_credentials table...")
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS user_credentials (
-            credential_id VARCHAR(255) PRIMARY KEY,
-            user_id VARCHAR(100) REFERENCES users(user_id),
-            public_key TEXT NOT NULL,
-            device_name VARCHAR(255),
-            transports TEXT[],
-            counter INTEGER DEFAULT 0,
-            is_active BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Create push_tokens table
-    print("Creating push_tokens table...")
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS push_tokens (
-            token_id SERIAL PRIMARY KEY,
-            user_id VARCHAR(100) REFERENCES users(user_id),
-            fcm_token TEXT NOT NULL,
-            device_id VARCHAR(100),
-            is_active BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Create transaction_ledger table
-    print("Creating transaction_ledger table...")
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS transaction_ledger (
-            ledger_id SERIAL PRIMARY KEY,
-            tx_id VARCHAR(100) REFERENCES transactions(tx_id),
-            operation VARCHAR(50) NOT NULL,
-            user_id VARCHAR(100) REFERENCES users(user_id),
-            amount DECIMAL(15, 2) NOT NULL,
-            operation_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            remarks TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+    # Phase 1: tables, in dependency order, as one script/transaction
+    conn = pool.getconn()
+    try:
+        print(f"Creating {SCHEMA_SQL.count('CREATE TABLE')} tables...")
+        with conn.cursor() as cur:
+            cur.execute(SCHEMA_SQL)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
     
-    # Create user_daily_transactions table
-    print("Creating user_daily_transactions table...")
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS user_daily_transactions (
-            record_id SERIAL PRIMARY KEY,
-            user_id VARCHAR(100) REFERENCES users(user_id),
-            transaction_date DATE NOT NULL,
-            total_amount DECIMAL(15, 2) DEFAULT 0.00,
-            transaction_count INTEGER DEFAULT 0,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(user_id, transaction_date)
-        )
-    """)
+    # Phase 2: indexes have no ordering constraint once the tables exist, so
+    # tables are indexed concurrently (bounded by the pool size). A table's own
+    # indexes stay sequential: parallel builds on one table race on its pg_class row.
+    by_table = {}
+    for index_name, table_name, *definition in indexes:
+        by_table.setdefault(table_name, []).append((index_name, *definition))
     
-    # Create indexes
-    print("Creating indexes...")
-    indexes = [
-        ("idx_users_phone", "users", "phone"),
-        ("idx_users_user_id", "users", "user_id"),
-        ("idx_transactions_user_id", "transactions", "user_id"),
-        ("idx_transactions_tx_id", "transactions", "tx_id"),
-        ("idx_transactions_created_at", "transactions", "created_at"),
-        ("idx_transactions_receiver_user_id", "transactions", "receiver_user_id"),
-        ("idx_transaction_ledger_tx_id", "transaction_ledger", "tx_id"),
-        ("idx_transaction_ledger_user_id", "transaction_ledger", "user_id"),
-        ("idx_user_daily_transactions_user_date", "user_daily_transactions", "user_id, transaction_date")
-    ]
+    print(f"Creating {len(indexes)} indexes...")
+    with ThreadPoolExecutor(max_workers=INDEX_WORKERS) as executor:
+        futures = [executor.submit(create_table_indexes, pool, table_name, table_indexes)
+                   for table_name, table_indexes in by_table.items()]
+        for future in futures:
+            future.result()
     
-    for index_name, table_name, columns in indexes:
-        cur.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})")
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DROP INDEX IF EXISTS " + ", ".join(dropped_indexes) + ";")
+        conn.commit()
+    finally:
+        pool.putconn(conn)
     
-    conn.commit()
     print("✅ Database initialized successfully!")
     
 except Exception as e:
     print(f"❌ Initialization failed: {e}")
-    conn.rollback()
 finally:
-    conn.close()
\ No newline at end of file
+    if pool:
+        pool.closeall()
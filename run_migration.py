@@ -12,6 +12,7 @@ DB_URL = os.getenv("DB_URL", "").strip()
 
 print(f"Connecting to database: {DB_URL[:50]}..." if DB_URL else "No DB_URL configured")
 
+conn = None
 try:
     if not DB_URL:
         raise ValueError("DB_URL environment variable is not set")
@@ -20,21 +21,33 @@ try:
     
     print("✓ Connected to database")
     
-    # Read and execute migration
-    migration_sql = """
-    ALTER TABLE public.transactions
-    ADD COLUMN IF NOT EXISTS explainability JSONB;
-    """
-    
-    print("Executing migration: Adding explainability column...")
-    cur.execute(migration_sql)
-    conn.commit()
-    
-    print("✅ Migration successful!")
-    print("✓ Column 'explainability' added to transactions table")
+    # init_database.py already creates the column; check the catalog first so
+    # the usual case skips the ALTER (and its ACCESS EXCLUSIVE lock) entirely
+    cur.execute("""
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = 'public.transactions'::regclass
+          AND attname = 'explainability' AND NOT attisdropped
+    """)
+    if cur.fetchone():
+        print("✓ Column 'explainability' already exists - nothing to do")
+    else:
+        # Read and execute migration
+        migration_sql = """
+        ALTER TABLE public.transactions
+        ADD COLUMN IF NOT EXISTS explainability JSONB;
+        """
+        
+        print("Executing migration: Adding explainability column...")
+        cur.execute(migration_sql)
+        conn.commit()
+        
+        print("✅ Migration successful!")
+        print("✓ Column 'explainability' added to transactions table")
     
 except Exception as e:
     print(f"❌ Migration failed: {e}")
-    conn.rollback()
+    if conn:
+        conn.rollback()
 finally:
-    conn.close()
+    if conn:
+        conn.close()
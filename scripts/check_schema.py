@@ -15,12 +15,15 @@ print("Using DB URL:", db)
 conn = psycopg2.connect(db)
 cur = conn.cursor()
 
-# list columns in transactions
+# list columns in transactions (pg_catalog directly; information_schema views are much slower)
 cur.execute("""
- SELECT column_name, data_type
- FROM information_schema.columns
- WHERE table_name = 'transactions'
- ORDER BY ordinal_position;
+ SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+ FROM pg_attribute a
+ JOIN pg_class c ON c.oid = a.attrelid
+ JOIN pg_namespace n ON n.oid = c.relnamespace
+ WHERE c.relname = 'transactions' AND n.nspname = 'public'
+   AND a.attnum > 0 AND NOT a.attisdropped
+ ORDER BY a.attnum;
 """)
 cols = cur.fetchall()
 print("transactions table columns:")
@@ -1,17 +1,53 @@
 #!/usr/bin/env python3
 """
 Seed test users with transaction history to make simulator more realistic
+
+Users and transactions are created through the backend API rather than
+bulk-loaded into Postgres (e.g. with COPY): /api/register hashes the
+password and /api/transaction scores each payment, moves balances and
+writes the ledger, none of which a raw load would reproduce.
 """
-import requests
+import asyncio
 import random
+import sys
 import time
 from datetime import datetime, timezone, timedelta
 
+import aiohttp
+import numpy as np
+
 BACKEND_URL = "http://localhost:8001"
 NUM_USERS = 50
 TRANSACTIONS_PER_USER = (3, 10)  # Random range
+MAX_CONNECTIONS = 50
+KEEPALIVE_SECONDS = 60
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=5)
+RATE_LIMIT = 50  # Max requests per second to the backend
+
+class TokenBucket:
+    """Async token bucket: waits only when requests outpace `rate` per second."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
 
-def create_user(user_num):
+limiter = TokenBucket(RATE_LIMIT)
+
+async def create_user(session, user_num):
     """Create a user account"""
     phone = f"99{str(user_num).zfill(8)}"
     user_data = {
@@ -23,31 +59,29 @@ def create_user(user_num):
     
     try:
         # Try to register
-        response = requests.post(
-            f"{BACKEND_URL}/api/register",
-            json=user_data,
-            timeout=5
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return result.get("token"), result.get("user", {}).get("user_id")
-        elif "already registered" in response.text:
+        await limiter.acquire()
+        async with session.post(f"{BACKEND_URL}/api/register", json=user_data) as response:
+            if response.status == 200:
+                result = await response.json()
+                return result.get("token"), result.get("user", {}).get("user_id")
+            text = await response.text()
+    
+        if "already registered" in text:
             # Login instead
-            login_response = requests.post(
+            await limiter.acquire()
+            async with session.post(
                 f"{BACKEND_URL}/api/login",
-                json={"phone": phone, "password": "sim123"},
-                timeout=5
-            )
-            if login_response.status_code == 200:
-                result = login_response.json()
-                return result.get("token"), result.get("user", {}).get("user_id")
+                json={"phone": phone, "password": "sim123"}
+            ) as login_response:
+                if login_response.status == 200:
+                    result = await login_response.json()
+                    return result.get("token"), result.get("user", {}).get("user_id")
     except Exception as e:
         print(f"❌ Error creating user {user_num}: {e}")
     
     return None, None
 
-def create_transaction(token, amount):
+async def create_transaction(session, token, amount):
     """Create a transaction for the user"""
     merchants = ["amazon", "flipkart", "swiggy", "zomato", "uber", "ola", "paytm", "phonepe", "gpay"]
     names = ["rajesh", "priya", "amit", "neha", "suresh", "divya"]
@@ -69,52 +103,72 @@ def create_transaction(token, amount):
     }
     
     try:
-        response = requests.post(
+        await limiter.acquire()
+        async with session.post(
             f"{BACKEND_URL}/api/transaction",
             json=payload,
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=5
-        )
-        return response.status_code == 200
-    except:
+            headers={"Authorization": f"Bearer {token}"}
+        ) as response:
+            return response.status == 200
+    except Exception:
         return False
 
-def main():
+def generate_amounts(rng, num_users):
+    """Draw every user's transaction amounts in one vectorized pass.
+    
+    Realistic amounts (mostly small): 70% in 50-1000, 27% in 1000-3000,
+    3% in 3000-8000. Returns one list of amounts per user.
+    """
+    counts = rng.integers(TRANSACTIONS_PER_USER[0], TRANSACTIONS_PER_USER[1] + 1, size=num_users)
+    total_tx = int(counts.sum())
+    u = rng.random(total_tx)
+    amounts = np.where(
+        u < 0.7, rng.uniform(50, 1000, total_tx),
+        np.where(u < 0.97, rng.uniform(1000, 3000, total_tx), rng.uniform(3000, 8000, total_tx))
+    )
+    amounts = np.round(amounts, 2).tolist()
+    offsets = np.concatenate(([0], np.cumsum(counts))).tolist()
+    return [amounts[start:end] for start, end in zip(offsets, offsets[1:])]
+
+async def seed_one_user(session, user_num, amounts):
+    """Register one user and create their transactions concurrently.
+    
+    Returns the number of transactions created.
+    """
+    token, user_id = await create_user(session, user_num)
+    
+    if not token:
+        return 0
+    
+    results = await asyncio.gather(*[create_transaction(session, token, amount) for amount in amounts])
+    return sum(results)
+
+async def main():
     print(f"🌱 Seeding {NUM_USERS} users with transaction history...")
     print(f"   Backend: {BACKEND_URL}")
     print(f"   Transactions per user: {TRANSACTIONS_PER_USER[0]}-{TRANSACTIONS_PER_USER[1]}\n")
     
-    success_count = 0
-    tx_count = 0
+    user_amounts = generate_amounts(np.random.default_rng(), NUM_USERS)
+    
+    # One connector for every request: sockets are kept alive and reused
+    # across register/login/transaction calls instead of reconnecting per call
+    connector = aiohttp.TCPConnector(
+        limit=MAX_CONNECTIONS,
+        limit_per_host=MAX_CONNECTIONS,
+        keepalive_timeout=KEEPALIVE_SECONDS,
+    )
+    async with aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT) as session:
+        per_user = await asyncio.gather(*[seed_one_user(session, i, amounts)
+                                         for i, amounts in enumerate(user_amounts, 1)])
+    
+    # One write for the per-user summary instead of a print per user
+    lines = [f"✓ user_{user_num:03d}: {n} transactions created"
+             for user_num, n in enumerate(per_user, 1) if n > 0]
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
     
-    for i in range(1, NUM_USERS + 1):
-        token, user_id = create_user(i)
-        
-        if not token:
-            continue
-        
-        # Create random number of transactions
-        num_tx = random.randint(*TRANSACTIONS_PER_USER)
-        user_tx_success = 0
-        
-        for _ in range(num_tx):
-            # Generate realistic amounts (mostly small)
-            if random.random() < 0.7:
-                amount = round(random.uniform(50, 1000), 2)
-            elif random.random() < 0.9:
-                amount = round(random.uniform(1000, 3000), 2)
-            else:
-                amount = round(random.uniform(3000, 8000), 2)
-            
-            if create_transaction(token, amount):
-                user_tx_success += 1
-                tx_count += 1
-            
-            time.sleep(0.05)  # Small delay to avoid overwhelming the server
-        
-        if user_tx_success > 0:
-            success_count += 1
-            print(f"✓ user_{str(i).zfill(3)}: {user_tx_success} transactions created")
+    success_count = sum(1 for n in per_user if n > 0)
+    tx_count = sum(per_user)
     
     print(f"\n✅ Seeding complete!")
     print(f"   Users created: {success_count}/{NUM_USERS}")
@@ -122,4 +176,4 @@ def main():
     print(f"\n💡 Now run: python simulator.py")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""
+Shared pytest fixtures for the FDT test suite
+"""
+import os
+from dataclasses import dataclass, field
+from typing import List
+
+import psycopg2
+import pytest
+from psycopg2.pool import ThreadedConnectionPool
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+DB_URL = os.getenv("DB_URL", "").strip()
+
+
+@pytest.fixture(scope="session")
+def pg_pool():
+    """One connection pool for the whole test session"""
+    if not DB_URL:
+        pytest.skip("DB_URL not set")
+    try:
+        pool = ThreadedConnectionPool(1, 4, DB_URL)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Database not available: {e}")
+    yield pool
+    pool.closeall()
+
+
+@pytest.fixture
+def db_conn(pg_pool):
+    """Borrow a pooled connection for a single test"""
+    conn = pg_pool.getconn()
+    try:
+        yield conn
+    finally:
+        # Leave no open transaction behind for the next borrower
+        conn.rollback()
+        pg_pool.putconn(conn)
+
+
+@dataclass
+class DbFacts:
+    """Database facts checked by TestDatabaseSetup"""
+    ping: int
+    users: int
+    tables: List[str] = field(default_factory=list)
+
+
+@pytest.fixture(scope="session")
+def db_facts(pg_pool):
+    """Ping, user count and public tables, fetched in a single round trip"""
+    conn = pg_pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT 1 AS ping,
+                       (SELECT COUNT(*) FROM users) AS users,
+                       (SELECT array_agg(tablename::text) FROM pg_tables
+                        WHERE schemaname = 'public') AS tables
+            """)
+            ping, users, tables = cur.fetchone()
+        return DbFacts(ping=ping, users=users, tables=tables or [])
+    finally:
+        conn.rollback()
+        pg_pool.putconn(conn)
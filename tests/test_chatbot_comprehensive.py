@@ -2,6 +2,7 @@
 """Test chatbot API with various scenarios"""
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 url = "http://localhost:8000/api/chatbot"
 headers = {"Content-Type": "application/json"}
@@ -18,29 +19,41 @@ test_cases = [
 print("Testing chatbot API with various queries...\n")
 print("=" * 80)
 
-for test in test_cases:
+def post_case(session, test):
+    """Send one chatbot query; returns the response or the exception raised"""
     payload = {
         "message": test["message"],
         "time_range": test["time_range"]
     }
-    
+    try:
+        return session.post(url, json=payload, headers=headers, timeout=10)
+    except Exception as e:
+        return e
+
+# One keep-alive session for every query, sent concurrently
+with requests.Session() as session:
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=len(test_cases))
+    session.mount("http://", adapter)
+    with ThreadPoolExecutor(max_workers=len(test_cases)) as pool:
+        results = list(pool.map(lambda t: post_case(session, t), test_cases))
+
+for test, response in zip(test_cases, results):
     print(f"\n[{test['name']}]")
     print(f"Query: {test['message']}")
     print("-" * 80)
     
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✓ Status: {response.status_code}")
-            print(f"Response Preview: {data['response'][:150]}...")
-            if "error" in data:
-                print(f"⚠ Error: {data['error']}")
-        else:
-            print(f"✗ Status: {response.status_code}")
-            print(f"Error: {response.text}")
-    except Exception as e:
-        print(f"✗ Exception: {type(e).__name__}: {e}")
+    if isinstance(response, Exception):
+        print(f"✗ Exception: {type(response).__name__}: {response}")
+        continue
+    if response.status_code == 200:
+        data = response.json()
+        print(f"✓ Status: {response.status_code}")
+        print(f"Response Preview: {data['response'][:150]}...")
+        if "error" in data:
+            print(f"⚠ Error: {data['error']}")
+    else:
+        print(f"✗ Status: {response.status_code}")
+        print(f"Error: {response.text}")
 
 print("\n" + "=" * 80)
 print("Test completed!")
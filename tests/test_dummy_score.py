@@ -0,0 +1,29 @@
+"""
+tools/file.py: scalar and vectorized dummy scorers must agree
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.file import action_from_score, action_from_score_batch, dummy_score, dummy_score_batch
+
+
+def test_scalar_and_batch_agree():
+    rng = np.random.default_rng(0)
+    features = np.column_stack([
+        rng.uniform(0, 10000, 500),      # amount
+        rng.integers(0, 24, 500),        # hour_of_day
+        rng.integers(0, 15, 500),        # tx_count_1h
+        rng.integers(0, 2, 500),         # new_recipient_flag
+    ])
+
+    batch_scores = dummy_score_batch(features)
+    scalar_scores = [dummy_score(row) for row in features.tolist()]
+    assert np.allclose(batch_scores, scalar_scores)
+
+    batch_actions = action_from_score_batch(batch_scores)
+    scalar_actions = [action_from_score(s) for s in scalar_scores]
+    assert list(batch_actions) == scalar_actions
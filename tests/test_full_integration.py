@@ -3,64 +3,87 @@
 import requests
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-print("Testing Dashboard and Chatbot Interface...")
-print("=" * 80)
+BASE_URL = "http://localhost:8000"
 
-# Test 1: Check if dashboard is accessible
-print("\n[1] Testing Dashboard Page...")
-try:
-    response = requests.get("http://localhost:8000/dashboard", timeout=5)
-    if response.status_code == 200:
-        print(f"✓ Dashboard page accessible (Status: {response.status_code})")
-        if "chatbot" in response.text.lower():
-            print("✓ Chatbot HTML found in dashboard")
-        else:
-            print("✗ Chatbot HTML NOT found in dashboard")
-    else:
-        print(f"✗ Dashboard returned status {response.status_code}")
-except Exception as e:
-    print(f"✗ Error accessing dashboard: {e}")
-
-# Test 2: Check if static assets load
-print("\n[2] Testing Static Assets...")
 assets = [
     ("CSS", "/static/dashboard.css"),
     ("JavaScript", "/static/dashboard.js")
 ]
 
-for asset_type, path in assets:
-    try:
-        response = requests.get(f"http://localhost:8000{path}", timeout=5)
-        if response.status_code == 200:
-            print(f"✓ {asset_type} loaded (Status: {response.status_code}, Size: {len(response.text)} bytes)")
-            if asset_type == "CSS" and "chatbot" in response.text.lower():
-                print(f"  ✓ Chatbot CSS found")
-            if asset_type == "JavaScript" and "chatbot" in response.text.lower():
-                print(f"  ✓ Chatbot JavaScript found")
-        else:
-            print(f"✗ {asset_type} returned status {response.status_code}")
-    except Exception as e:
-        print(f"✗ Error loading {asset_type}: {e}")
-
-# Test 3: Test the chatbot API endpoint
-print("\n[3] Testing Chatbot API Endpoint...")
 test_messages = [
     "Hello",
     "What is the fraud rate?",
     "Show high risk transactions"
 ]
 
-for msg in test_messages:
+
+def probe(session, method, path, **kwargs):
+    """Issue one request; returns the response or the exception raised"""
     try:
-        payload = {"message": msg, "time_range": "24h"}
-        response = requests.post(
-            "http://localhost:8000/api/chatbot",
-            json=payload,
+        return session.request(method, f"{BASE_URL}{path}", **kwargs)
+    except Exception as e:
+        return e
+
+
+print("Testing Dashboard and Chatbot Interface...")
+print("=" * 80)
+
+# Every probe is independent, so they all go out at once over one
+# keep-alive session; results are reported below in the usual order.
+num_probes = 1 + len(assets) + len(test_messages)
+with requests.Session() as session, ThreadPoolExecutor(max_workers=num_probes) as pool:
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=num_probes))
+    dashboard_future = pool.submit(probe, session, "GET", "/dashboard", timeout=5)
+    asset_futures = [pool.submit(probe, session, "GET", path, timeout=5) for _, path in assets]
+    chatbot_futures = [
+        pool.submit(
+            probe, session, "POST", "/api/chatbot",
+            json={"message": msg, "time_range": "24h"},
             headers={"Content-Type": "application/json"},
             timeout=10
         )
-        
+        for msg in test_messages
+    ]
+
+# Test 1: Check if dashboard is accessible
+print("\n[1] Testing Dashboard Page...")
+response = dashboard_future.result()
+if isinstance(response, Exception):
+    print(f"✗ Error accessing dashboard: {response}")
+elif response.status_code == 200:
+    print(f"✓ Dashboard page accessible (Status: {response.status_code})")
+    if "chatbot" in response.text.lower():
+        print("✓ Chatbot HTML found in dashboard")
+    else:
+        print("✗ Chatbot HTML NOT found in dashboard")
+else:
+    print(f"✗ Dashboard returned status {response.status_code}")
+
+# Test 2: Check if static assets load
+print("\n[2] Testing Static Assets...")
+for (asset_type, path), future in zip(assets, asset_futures):
+    response = future.result()
+    if isinstance(response, Exception):
+        print(f"✗ Error loading {asset_type}: {response}")
+    elif response.status_code == 200:
+        print(f"✓ {asset_type} loaded (Status: {response.status_code}, Size: {len(response.text)} bytes)")
+        if asset_type == "CSS" and "chatbot" in response.text.lower():
+            print(f"  ✓ Chatbot CSS found")
+        if asset_type == "JavaScript" and "chatbot" in response.text.lower():
+            print(f"  ✓ Chatbot JavaScript found")
+    else:
+        print(f"✗ {asset_type} returned status {response.status_code}")
+
+# Test 3: Test the chatbot API endpoint
+print("\n[3] Testing Chatbot API Endpoint...")
+for msg, future in zip(test_messages, chatbot_futures):
+    response = future.result()
+    if isinstance(response, Exception):
+        print(f"✗ Message '{msg}' - Error: {response}")
+        continue
+    try:
         if response.status_code == 200:
             data = response.json()
             if "response" in data and "error" not in data:
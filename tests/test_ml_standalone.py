@@ -19,7 +19,7 @@ print("="*60)
 # Test the scoring module directly
 print("\n[1] Loading ML models...")
 try:
-    from app.scoring import score_transaction, load_models
+    from app.scoring import score_transactions, load_models
     
     # Force load models
     load_models()
@@ -118,7 +118,14 @@ print("="*60)
 
 results = []
 
-for idx, test in enumerate(test_cases, 1):
+# Score every case in one batch so each model predicts once
+try:
+    batch_scores = score_transactions([test['tx'] for test in test_cases])
+except Exception as e:
+    print(f"❌ Batch scoring error: {e}")
+    batch_scores = [e] * len(test_cases)
+
+for idx, (test, batch_score) in enumerate(zip(test_cases, batch_scores), 1):
     print(f"\nTest {idx}: {test['name']}")
     print("-" * 60)
     
@@ -129,7 +136,9 @@ for idx, test in enumerate(test_cases, 1):
     print(f"Merchant: {tx['recipient_vpa']}")
     
     try:
-        risk_score = score_transaction(tx)
+        if isinstance(batch_score, Exception):
+            raise batch_score
+        risk_score = batch_score
         
         # Determine action based on thresholds
         if risk_score >= 0.60:
@@ -0,0 +1,44 @@
+"""
+Batch scoring tests - no API/Database required
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.scoring import score_transactions
+
+FALLBACK_REASON = "Scoring fallback due to error"
+
+
+def _tx(tx_id, **overrides):
+    tx = {
+        "tx_id": tx_id,
+        "user_id": "user_001",
+        "device_id": "device_001",
+        "ts": "2026-01-15T10:30:00+00:00",
+        "amount": 500.0,
+        "recipient_vpa": "amazon1@upi",
+        "tx_type": "P2M",
+        "channel": "app",
+    }
+    tx.update(overrides)
+    return tx
+
+
+class TestBatchScoring:
+    """One bad row must not push the rest of the batch onto the fallback"""
+
+    def test_bad_row_only_falls_back_itself(self):
+        txs = [_tx("tx_good_1"), _tx("tx_bad", channel=None), _tx("tx_good_2", amount=1200.0)]
+
+        results = score_transactions(txs, return_details=True)
+
+        assert len(results) == 3
+        assert FALLBACK_REASON not in results[0]["reasons"]
+        assert FALLBACK_REASON not in results[2]["reasons"]
+
+    def test_batch_matches_single_row_scores(self):
+        txs = [_tx("tx_1"), _tx("tx_2", amount=60000.0)]
+
+        assert score_transactions(txs) == [score_transactions([tx])[0] for tx in txs]
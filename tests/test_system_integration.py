@@ -7,7 +7,9 @@ import os
 import sys
 import pytest
 import psycopg2
+import numpy as np
 from datetime import datetime, timezone
+from types import MappingProxyType
 from unittest.mock import patch
 from dotenv import load_dotenv
 
@@ -17,9 +19,26 @@ load_dotenv()
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.fraud_reasons import generate_fraud_reasons, categorize_fraud_risk
-from app.scoring import score_transaction, extract_features
-from app.feature_engine import get_feature_names
+from app.config import DELAY_THRESHOLD, BLOCK_THRESHOLD
+
+
+def _check_db():
+    """One quick connection attempt, made once at import"""
+    db_url = os.getenv('DB_URL', '').strip()
+    if not db_url:
+        return False
+    try:
+        psycopg2.connect(db_url, connect_timeout=1).close()
+        return True
+    except Exception:
+        return False
+
+
+_DB_OK = _check_db()
+
+# Heavier app modules (ML scoring, Redis-backed feature engine) are imported in
+# setup_class of the classes that use them, so collecting the environment
+# and database tests doesn't pay for them.
 
 
 class TestEnvironmentSetup:
@@ -48,25 +67,15 @@ class TestEnvironmentSetup:
 class TestDatabaseSetup:
     """Test database initialization and connectivity"""
     
-    @pytest.fixture(autouse=True)
-    def db_connection(self):
-        """Create database connection for tests"""
-        try:
-            conn = psycopg2.connect(os.getenv('DB_URL'))
-            yield conn
-            conn.close()
-        except psycopg2.OperationalError as e:
-            pytest.skip(f"Database not available: {e}")
+    pytestmark = pytest.mark.skipif(not _DB_OK, reason="Postgres unreachable")
     
-    def test_database_connection(self, db_connection):
+    # db_facts is gathered once per session in conftest.py
+    
+    def test_database_connection(self, db_facts):
         """Verify database is accessible"""
-        assert db_connection is not None
-        cur = db_connection.cursor()
-        cur.execute("SELECT 1")
-        assert cur.fetchone()[0] == 1
-        cur.close()
+        assert db_facts.ping == 1
     
-    def test_tables_exist(self, db_connection):
+    def test_tables_exist(self, db_facts):
         """Verify all required tables exist"""
         required_tables = [
             'users', 'transactions', 'user_devices', 'fraud_alerts',
@@ -74,134 +83,97 @@ class TestDatabaseSetup:
             'user_daily_transactions'
         ]
         
-        cur = db_connection.cursor()
-        cur.execute("""
-            SELECT table_name FROM information_schema.tables 
-            WHERE table_schema='public'
-        """)
-        existing_tables = [t[0] for t in cur.fetchall()]
-        cur.close()
-        
         for table in required_tables:
-            assert table in existing_tables, f"Table {table} not found"
+            assert table in db_facts.tables, f"Table {table} not found"
     
-    def test_test_users_exist(self, db_connection):
+    def test_test_users_exist(self, db_facts):
         """Verify test users are in database"""
-        cur = db_connection.cursor()
-        cur.execute("SELECT COUNT(*) FROM users")
-        user_count = cur.fetchone()[0]
-        cur.close()
-        
-        assert user_count > 0, "No test users found in database"
+        assert db_facts.users > 0, "No test users found in database"
+
+
+# Baseline test features, overridden per scoring case (read-only template)
+BASELINE_FEATURES = MappingProxyType({
+    'amount': 100.0,
+    'is_new_recipient': 1.0,
+    'is_new_device': 0.0,
+    'is_night': 0.0,
+    'velocity_last_1h': 0.0,
+    'avg_amount': 500.0,
+    'user_age_days': 365.0,
+    'location_mismatch': 0.0,
+    'amount_deviation': -0.8,
+    'recipient_frequency': 0.1,
+    'hourly_transactions': 1.0,
+    'daily_transactions': 3.0,
+    'day_of_week': 3.0,
+    'time_of_day': 12.0,
+    'network_distance': 0.5,
+    'device_age_days': 180.0,
+    'recipient_risk_score': 0.1,
+    'weekday_avg': 450.0,
+    'similar_recipient_count': 0.0,
+    'payment_method': 1.0,
+    'tx_flow_rate': 0.5,
+    'seasonality_factor': 1.0,
+    'distance_from_home': 0.2,
+    'credit_limit_usage': 0.1,
+    'fraud_like_pattern': 0.0
+})
 
 
 class TestFraudDetectionEngine:
     """Test fraud detection scoring and decision making"""
     
-    def get_test_features(self):
-        """Get baseline test features"""
-        return {
-            'amount': 100.0,
-            'is_new_recipient': 1.0,
-            'is_new_device': 0.0,
-            'is_night': 0.0,
-            'velocity_last_1h': 0.0,
-            'avg_amount': 500.0,
-            'user_age_days': 365.0,
-            'location_mismatch': 0.0,
-            'amount_deviation': -0.8,
-            'recipient_frequency': 0.1,
-            'hourly_transactions': 1.0,
-            'daily_transactions': 3.0,
-            'day_of_week': 3.0,
-            'time_of_day': 12.0,
-            'network_distance': 0.5,
-            'device_age_days': 180.0,
-            'recipient_risk_score': 0.1,
-            'weekday_avg': 450.0,
-            'similar_recipient_count': 0.0,
-            'payment_method': 1.0,
-            'tx_flow_rate': 0.5,
-            'seasonality_factor': 1.0,
-            'distance_from_home': 0.2,
-            'credit_limit_usage': 0.1,
-            'fraud_like_pattern': 0.0
-        }
+    @classmethod
+    def setup_class(cls):
+        from app.fraud_reasons import generate_fraud_reasons, categorize_fraud_risk
+        cls.generate_fraud_reasons = staticmethod(generate_fraud_reasons)
+        cls.categorize_fraud_risk = staticmethod(categorize_fraud_risk)
     
-    def test_small_amount_approved(self):
-        """Test that small payments to new recipients are APPROVED"""
-        features = self.get_test_features()
-        features['amount'] = 100.0
+    # scores are in ScoreIdx order: ensemble, iforest, random_forest, xgboost
+    @pytest.mark.parametrize("overrides,scores,lo,hi,min_reasons,keywords", [
+        # Small payments to new recipients are APPROVED
+        (
+            {'amount': 100.0},
+            np.array([0.10, 0.08, 0.12, 0.10]),
+            0.0, 0.35, 1, None
+        ),
+        # Large payments with risk factors are DELAYED
+        (
+            {'amount': 75000.0, 'is_night': 1.0, 'velocity_last_1h': 2.0,
+             'user_age_days': 30.0, 'amount_deviation': 1.5},
+            np.array([0.62, 0.65, 0.58, 0.65]),
+            0.35, 0.70, 3, ['high', 'risk', 'amount']
+        ),
+        # Extremely fraudulent transactions are BLOCKED or at least DELAYED
+        (
+            {'amount': 150000.0, 'is_new_device': 1.0, 'is_night': 1.0, 'velocity_last_1h': 5.0,
+             'user_age_days': 5.0, 'location_mismatch': 1.0, 'amount_deviation': 3.0,
+             'fraud_like_pattern': 1.0},
+            np.array([0.85, 0.88, 0.82, 0.87]),
+            0.35, float('inf'), 3, None
+        ),
+    ], ids=["small_amount_approved", "large_amount_with_risk_delayed", "extreme_fraud_blocked"])
+    def test_scoring_case(self, overrides, scores, lo, hi, min_reasons, keywords):
+        """Composite score lands in the expected band with enough reasons"""
+        features = {**BASELINE_FEATURES, **overrides}
         
-        scores = {
-            'ensemble': 0.10,
-            'iforest': 0.08,
-            'random_forest': 0.12,
-            'xgboost': 0.10
-        }
+        reasons, composite = self.generate_fraud_reasons(features, scores)
         
-        reasons, composite = generate_fraud_reasons(features, scores)
+        assert lo <= composite < hi, f"Expected {lo} <= score < {hi}, got {composite}"
+        assert len(reasons) >= min_reasons, f"Should identify at least {min_reasons} fraud reasons"
         
-        assert composite < 0.35, f"Small payment should have score < 0.35, got {composite}"
-        assert len(reasons) > 0, "Should have fraud reasons identified"
-    
-    def test_large_amount_with_risk_delayed(self):
-        """Test that large payments with risk factors are DELAYED"""
-        features = self.get_test_features()
-        features['amount'] = 75000.0
-        features['is_night'] = 1.0
-        features['velocity_last_1h'] = 2.0
-        features['user_age_days'] = 30.0
-        features['amount_deviation'] = 1.5
-        
-        scores = {
-            'ensemble': 0.62,
-            'iforest': 0.65,
-            'random_forest': 0.58,
-            'xgboost': 0.65
-        }
-        
-        reasons, composite = generate_fraud_reasons(features, scores)
-        
-        assert 0.35 <= composite < 0.70, f"Risky transaction should have 0.35 <= score < 0.70, got {composite}"
-        assert len(reasons) >= 3, "Should identify multiple fraud reasons"
-        
-        # Verify critical reasons are identified
-        reason_texts = [r.reason for r in reasons]
-        critical_keywords = ['high', 'risk', 'amount']
-        assert any(keyword in ' '.join(reason_texts).lower() for keyword in critical_keywords)
-    
-    def test_extreme_fraud_blocked(self):
-        """Test that extremely fraudulent transactions are BLOCKED or at least DELAYED"""
-        features = self.get_test_features()
-        features['amount'] = 150000.0
-        features['is_new_device'] = 1.0
-        features['is_night'] = 1.0
-        features['velocity_last_1h'] = 5.0
-        features['user_age_days'] = 5.0
-        features['location_mismatch'] = 1.0
-        features['amount_deviation'] = 3.0
-        features['fraud_like_pattern'] = 1.0
-        
-        scores = {
-            'ensemble': 0.85,
-            'iforest': 0.88,
-            'random_forest': 0.82,
-            'xgboost': 0.87
-        }
-        
-        reasons, composite = generate_fraud_reasons(features, scores)
-        
-        # Should be either DELAYED or BLOCKED (>= 0.35)
-        assert composite >= 0.35, f"Extreme fraud should have high score, got {composite}"
-        assert len(reasons) >= 3, "Should identify multiple fraud reasons"
+        if keywords:
+            # Verify critical reasons are identified
+            reason_texts = ' '.join(r.reason for r in reasons).lower()
+            assert any(keyword in reason_texts for keyword in keywords)
     
     def test_fraud_reasons_generation(self):
         """Test that fraud reasons are properly generated"""
-        features = self.get_test_features()
+        features = dict(BASELINE_FEATURES)
         scores = {'ensemble': 0.50, 'iforest': 0.45, 'random_forest': 0.52, 'xgboost': 0.50}
         
-        reasons, composite = generate_fraud_reasons(features, scores)
+        reasons, composite = self.generate_fraud_reasons(features, scores)
         
         assert isinstance(reasons, list), "Reasons should be a list"
         assert len(reasons) >= 0, "Should return list of reasons"
@@ -215,15 +187,15 @@ class TestFraudDetectionEngine:
     def test_risk_categorization(self):
         """Test risk categorization logic"""
         # Low risk
-        result = categorize_fraud_risk(0.20, [])
+        result = self.categorize_fraud_risk(0.20, [])
         assert result['risk_level'] == 'APPROVED', "Score 0.20 should be APPROVED"
         
         # Medium risk - just below delay threshold
-        result = categorize_fraud_risk(0.30, [])
+        result = self.categorize_fraud_risk(0.30, [])
         assert result['risk_level'] == 'APPROVED', "Score 0.30 should be APPROVED"
         
         # Delay risk - at or just above threshold
-        result = categorize_fraud_risk(0.50, [])
+        result = self.categorize_fraud_risk(0.50, [])
         assert result['risk_level'] in ['DELAYED', 'BLOCKED'], "Score 0.50 should be DELAYED or BLOCKED"
 
 
@@ -232,34 +204,35 @@ class TestThresholdConfiguration:
     
     def test_delay_threshold_applied(self):
         """Test DELAY_THRESHOLD is properly loaded and used"""
-        delay_threshold = float(os.getenv('DELAY_THRESHOLD', '0.30'))
-        assert delay_threshold == 0.35, "DELAY_THRESHOLD should be 0.35 (optimized)"
+        assert DELAY_THRESHOLD == 0.35, "DELAY_THRESHOLD should be 0.35 (optimized)"
     
     def test_block_threshold_applied(self):
         """Test BLOCK_THRESHOLD is properly loaded and used"""
-        block_threshold = float(os.getenv('BLOCK_THRESHOLD', '0.60'))
-        assert block_threshold == 0.70, "BLOCK_THRESHOLD should be 0.70 (optimized)"
+        assert BLOCK_THRESHOLD == 0.70, "BLOCK_THRESHOLD should be 0.70 (optimized)"
     
     def test_threshold_ordering(self):
         """Test that DELAY < BLOCK threshold"""
-        delay = float(os.getenv('DELAY_THRESHOLD'))
-        block = float(os.getenv('BLOCK_THRESHOLD'))
-        assert delay < block, "DELAY threshold should be less than BLOCK threshold"
+        assert DELAY_THRESHOLD < BLOCK_THRESHOLD, "DELAY threshold should be less than BLOCK threshold"
 
 
 class TestFeatureExtraction:
     """Test feature extraction from transactions"""
     
+    @classmethod
+    def setup_class(cls):
+        from app.feature_engine import get_feature_names
+        cls.get_feature_names = staticmethod(get_feature_names)
+    
     def test_feature_names_exist(self):
         """Test that feature names can be retrieved"""
-        feature_names = get_feature_names()
-        assert isinstance(feature_names, list), "Feature names should be a list"
+        feature_names = self.get_feature_names()
+        assert isinstance(feature_names, tuple), "Feature names should be a tuple"
         assert len(feature_names) > 0, "Should have feature names defined"
         assert len(feature_names) >= 25, "Should have at least 25 features"
     
     def test_required_features(self):
         """Test that required features are in the feature set"""
-        feature_names = get_feature_names()
+        feature_names = self.get_feature_names()
         
         required = [
             'amount', 'is_new_recipient', 'is_new_device',
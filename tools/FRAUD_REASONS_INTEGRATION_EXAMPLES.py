@@ -5,6 +5,27 @@ This file demonstrates how to integrate the fraud_reasons module
 into your existing FastAPI scoring pipeline.
 """
 
+from collections import Counter, namedtuple
+
+ReasonSummary = namedtuple("ReasonSummary", ["severity_counts", "first_critical", "first_high"])
+
+
+def _summarize(reasons):
+    """
+    Single pass over a reason list: severity counts plus the first
+    critical/high reason, so decision helpers don't each re-scan it.
+    """
+    severity_counts = Counter()
+    first_critical = first_high = None
+    for r in reasons:
+        severity_counts[r.severity] += 1
+        if r.severity == "critical" and first_critical is None:
+            first_critical = r
+        elif r.severity == "high" and first_high is None:
+            first_high = r
+    return ReasonSummary(severity_counts, first_critical, first_high)
+
+
 # ============================================================================
 # EXAMPLE 1: Basic Integration with Scoring Pipeline
 # ============================================================================
@@ -62,7 +83,9 @@ def example_2_fastapi_integration():
     """
     Complete FastAPI endpoint with fraud reasoning
     """
+    import json
     from fastapi import FastAPI
+    from fastapi.responses import Response
     from app.scoring import extract_features, score_with_ensemble
     from app.fraud_reasons import generate_fraud_reasons, categorize_fraud_risk
     
@@ -89,8 +112,9 @@ def example_2_fastapi_integration():
                 reasons
             )
             
-            # Format response
-            return {
+            # Format response; serialized here with json.dumps and returned
+            # as a raw Response so FastAPI skips its jsonable_encoder pass
+            payload = {
                 "status": "success",
                 "transaction_id": transaction.get("id"),
                 "risk_level": categorization["risk_level"],
@@ -101,6 +125,7 @@ def example_2_fastapi_integration():
                 "critical_count": len(categorization["critical_reasons"]),
                 "high_count": len(categorization["high_reasons"])
             }
+            return Response(json.dumps(payload), media_type="application/json")
             
         except Exception as e:
             return {
@@ -125,14 +150,25 @@ def example_3_logging_with_audit():
         categorize_fraud_risk,
         format_fraud_reasons_text
     )
-    from datetime import datetime
+    from datetime import datetime, timezone
+    import atexit
     import json
+    import time
+    
+    # One buffered handle for the whole process instead of open/close per
+    # decision; flushed every LOG_FLUSH_EVERY records and at exit.
+    LOG_FLUSH_EVERY = 100
+    log_fh = open("fraud_decisions.log", "a", buffering=1 << 16)
+    atexit.register(log_fh.close)
+    pending = 0
     
     def log_fraud_decision(tx, features, scores, reasons, categorization):
         """Log transaction with full audit trail"""
+        nonlocal pending
         
         audit_log = {
-            "timestamp": datetime.utcnow().isoformat(),
+            # Integer epoch nanoseconds; format only when exporting (see below)
+            "timestamp_ns": time.time_ns(),
             "transaction": {
                 "id": tx.get("id"),
                 "amount": tx.get("amount"),
@@ -162,12 +198,20 @@ def example_3_logging_with_audit():
         }
         
         # Log to file
-        with open("fraud_decisions.log", "a") as f:
-            f.write(json.dumps(audit_log) + "\n")
+        log_fh.write(json.dumps(audit_log) + "\n")
+        pending += 1
+        if pending >= LOG_FLUSH_EVERY:
+            log_fh.flush()
+            pending = 0
         
         print(f"✓ Logged: {categorization['risk_level']} - {tx.get('id')}")
         return audit_log
     
+    def format_timestamp(audit_log):
+        """ISO-8601 UTC string for a record's timestamp_ns, for export/display"""
+        return datetime.fromtimestamp(audit_log["timestamp_ns"] / 1e9, tz=timezone.utc).isoformat()
+    
+    log_fraud_decision.format_timestamp = format_timestamp
     return log_fraud_decision
 
 
@@ -179,8 +223,10 @@ def example_4_batch_processing():
     """
     Process multiple transactions and generate summary report
     """
-    from app.scoring import extract_features, score_with_ensemble
-    from app.fraud_reasons import generate_fraud_reasons, categorize_fraud_risk
+    import numpy as np
+    from app.config import DELAY_THRESHOLD, BLOCK_THRESHOLD
+    from app.scoring import extract_features, score_with_ensemble_batch
+    from app.fraud_reasons import generate_fraud_reasons_batch
     
     transactions = [
         {"id": "tx1", "amount": 5000, "user_id": "u1"},
@@ -194,19 +240,26 @@ def example_4_batch_processing():
         "APPROVED": []
     }
     
-    for tx in transactions:
-        features = extract_features(tx)
-        scores = score_with_ensemble(features)
-        reasons, _ = generate_fraud_reasons(features, scores)
-        categorization = categorize_fraud_risk(scores["ensemble"], reasons)
-        
-        # Categorize result
-        level = categorization["risk_level"]
-        results[level].append({
-            "tx_id": tx["id"],
-            "reasons": [r.to_dict() for r in reasons],
-            "score": categorization["score"]
-        })
+    # Score and explain the whole batch at once
+    features_list = [extract_features(tx) for tx in transactions]
+    scores_list = score_with_ensemble_batch(features_list)
+    reasons_list = generate_fraud_reasons_batch(features_list, scores_list)
+    
+    # Categorize every transaction in one step: digitize against
+    # [delay, block] gives 0/1/2 exactly as categorize_fraud_risk's >= checks
+    ensemble = np.array([scores["ensemble"] for scores in scores_list], dtype=np.float64)
+    levels = np.array(["APPROVED", "DELAYED", "BLOCKED"])[
+        np.digitize(ensemble, [DELAY_THRESHOLD, BLOCK_THRESHOLD])
+    ]
+    
+    for level in results:
+        for i in np.nonzero(levels == level)[0].tolist():
+            reasons, _ = reasons_list[i]
+            results[level].append({
+                "tx_id": transactions[i]["id"],
+                "reasons": [r.to_dict() for r in reasons],
+                "score": float(ensemble[i])
+            })
     
     # Print summary
     print("\n=== BATCH PROCESSING SUMMARY ===")
@@ -226,33 +279,27 @@ def example_5_conditional_logic():
     """
     from app.fraud_reasons import FraudReason
     
-    def should_send_otp(reasons):
+    def should_send_otp(summary):
         """Send OTP if medium-severity reasons detected"""
-        return any(r.severity in ["high", "critical"] for r in reasons)
+        return summary.first_critical is not None or summary.first_high is not None
     
-    def should_contact_user(reasons):
+    def should_contact_user(summary):
         """Contact user if multiple high-severity reasons"""
-        high_reasons = [r for r in reasons if r.severity == "high"]
-        return len(high_reasons) >= 2
+        return summary.severity_counts["high"] >= 2
     
-    def should_auto_block(reasons):
+    def should_auto_block(summary):
         """Auto-block if critical reasons"""
-        return any(r.severity == "critical" for r in reasons)
+        return summary.first_critical is not None
     
-    def get_risk_summary(reasons):
+    def get_risk_summary(summary):
         """Get brief summary of fraud risks"""
-        by_severity = {
-            "critical": [r.reason for r in reasons if r.severity == "critical"],
-            "high": [r.reason for r in reasons if r.severity == "high"]
-        }
+        parts = []
+        if summary.first_critical is not None:
+            parts.append(f"CRITICAL: {summary.first_critical.reason}")
+        if summary.first_high is not None:
+            parts.append(f"HIGH: {summary.first_high.reason}")
         
-        summary = []
-        if by_severity["critical"]:
-            summary.append(f"CRITICAL: {by_severity['critical'][0]}")
-        if by_severity["high"]:
-            summary.append(f"HIGH: {by_severity['high'][0]}")
-        
-        return " | ".join(summary) if summary else "Normal transaction"
+        return " | ".join(parts) if parts else "Normal transaction"
     
     # Usage
     sample_reasons = [
@@ -260,10 +307,11 @@ def example_5_conditional_logic():
         FraudReason("New device", "high", "device", 1),
     ]
     
-    print(f"Send OTP? {should_send_otp(sample_reasons)}")
-    print(f"Contact User? {should_contact_user(sample_reasons)}")
-    print(f"Auto Block? {should_auto_block(sample_reasons)}")
-    print(f"Summary: {get_risk_summary(sample_reasons)}")
+    summary = _summarize(sample_reasons)
+    print(f"Send OTP? {should_send_otp(summary)}")
+    print(f"Contact User? {should_contact_user(summary)}")
+    print(f"Auto Block? {should_auto_block(summary)}")
+    print(f"Summary: {get_risk_summary(summary)}")
 
 
 # ============================================================================
@@ -310,29 +358,28 @@ def example_7_analytics():
     """
     Track and analyze fraud reasons for monitoring
     """
-    from collections import Counter
+    import pandas as pd
     from app.fraud_reasons import generate_fraud_reasons
     
     def analyze_reason_distribution(processed_transactions):
         """
         Analyze which fraud reasons are most common
         """
-        all_reasons = []
-        reason_severity = Counter()
-        reason_types = Counter()
-        
-        for tx_result in processed_transactions:
-            reasons = tx_result["reasons"]
-            for reason in reasons:
-                all_reasons.append(reason)
-                reason_severity[reason.severity] += 1
-                reason_types[reason.feature_name] += 1
+        # Flatten once, then count in pandas instead of per-reason Counter updates
+        reasons_df = pd.DataFrame(
+            [(reason.severity, reason.feature_name)
+             for tx_result in processed_transactions
+             for reason in tx_result["reasons"]],
+            columns=["severity", "feature"]
+        )
+        reason_severity = reasons_df["severity"].value_counts(dropna=False)
+        reason_types = reasons_df["feature"].value_counts(dropna=False)
         
         report = {
-            "total_reasons": len(all_reasons),
-            "by_severity": dict(reason_severity),
-            "by_feature": dict(reason_types),
-            "most_common": reason_types.most_common(5)
+            "total_reasons": len(reasons_df),
+            "by_severity": {k: int(v) for k, v in reason_severity.items()},
+            "by_feature": {k: int(v) for k, v in reason_types.items()},
+            "most_common": [(k, int(v)) for k, v in reason_types.head(5).items()]
         }
         
         print("\n=== FRAUD REASON ANALYTICS ===")
@@ -352,24 +399,17 @@ def example_7_analytics():
 def example_8_caching_optimization():
     """
     Cache results for frequently checked transactions
-    """
-    from functools import lru_cache
-    import hashlib
-    
-    @lru_cache(maxsize=1000)
-    def cached_fraud_scoring(tx_hash):
-        """Cache fraud reasons by transaction hash"""
-        # In production, deserialize tx_hash and process
-        pass
     
-    def get_tx_hash(tx):
-        """Generate cache key from transaction"""
-        cache_key = f"{tx['user_id']}_{tx['amount']}_{tx['device_id']}"
-        return hashlib.md5(cache_key.encode()).hexdigest()
+    Key by tx_id only: two identical payments seconds apart are separate
+    transactions, and scoring each one is what feeds the velocity features.
+    """
+    def get_tx_key(tx):
+        """Generate cache key from transaction (retries of one payment share it)"""
+        return tx['tx_id']
     
     # Usage
-    tx = {"user_id": "u1", "amount": 5000, "device_id": "d1"}
-    cache_key = get_tx_hash(tx)
+    tx = {"tx_id": "TX123", "user_id": "u1", "amount": 5000, "device_id": "d1"}
+    cache_key = get_tx_key(tx)
     print(f"Cache key: {cache_key}")
 
 
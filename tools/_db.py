@@ -0,0 +1,47 @@
+"""Shared psycopg2 connection pool for the diagnostic scripts in tools/."""
+import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+import os
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_URL = os.getenv("DB_URL", "").strip()
+
+_POOL = None
+
+
+def get_pool(db_url=None):
+    """Return the shared connection pool, creating it on first use.
+    
+    `db_url` overrides DB_URL for scripts that resolve their own URL
+    (config.yaml, DATABASE_URL); it only matters on the first call.
+    """
+    global _POOL
+    if _POOL is None:
+        _POOL = psycopg2.pool.ThreadedConnectionPool(
+            1, 8, db_url or DB_URL, cursor_factory=psycopg2.extras.RealDictCursor
+        )
+    return _POOL
+
+
+def close_pool():
+    """Close the pool, e.g. so forked worker processes don't inherit its sockets."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.closeall()
+        _POOL = None
+
+
+@contextmanager
+def pooled_conn(db_url=None):
+    """Borrow a connection from the pool; rolled back and returned on exit."""
+    pool = get_pool(db_url)
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        pool.putconn(conn)
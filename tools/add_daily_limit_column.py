@@ -11,6 +11,12 @@ load_dotenv()
 
 DB_URL = os.getenv("DB_URL", "").strip()
 
+# Idempotent DDL, sent together in one round-trip and one transaction.
+# Append further statements here rather than issuing them separately.
+MIGRATIONS = [
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_limit DECIMAL(15, 2) DEFAULT 10000.00",
+]
+
 def add_daily_limit_column():
     """Add daily_limit column to users table"""
     conn = psycopg2.connect(DB_URL)
@@ -18,12 +24,7 @@ def add_daily_limit_column():
         cur = conn.cursor()
         
         # Add column if it doesn't exist
-        cur.execute(
-            """
-            ALTER TABLE users 
-            ADD COLUMN IF NOT EXISTS daily_limit DECIMAL(15, 2) DEFAULT 10000.00
-            """
-        )
+        cur.execute(";\n".join(MIGRATIONS) + ";")
         
         conn.commit()
         print("✓ daily_limit column added successfully")
@@ -0,0 +1,57 @@
+-- Migration: Send Money feature tables, columns and test data
+-- Runs as one script in one transaction; safe to run repeatedly.
+-- Indexes are built afterwards with CREATE INDEX CONCURRENTLY by
+-- add_transaction_ledger.py (not allowed inside a transaction).
+
+-- Step 1: new columns on transactions, one ALTER so the table lock is taken once
+ALTER TABLE transactions
+    ADD COLUMN IF NOT EXISTS receiver_user_id VARCHAR(100) REFERENCES users(user_id),
+    ADD COLUMN IF NOT EXISTS status_history TEXT[] DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS amount_deducted_at TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS amount_credited_at TIMESTAMP;
+
+-- Leave free space in each page so updates of unindexed columns
+-- (status, timestamps) can stay HOT; only affects newly written pages
+ALTER TABLE transactions SET (fillfactor = 85);
+
+-- Step 2: transaction_ledger (audit trail)
+CREATE TABLE IF NOT EXISTS transaction_ledger (
+    ledger_id SERIAL PRIMARY KEY,
+    tx_id VARCHAR(100) REFERENCES transactions(tx_id),
+    operation VARCHAR(50) NOT NULL,
+    user_id VARCHAR(100) REFERENCES users(user_id),
+    amount DECIMAL(15, 2) NOT NULL,
+    operation_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    remarks TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Step 3: user_daily_transactions (daily limit tracking)
+CREATE TABLE IF NOT EXISTS user_daily_transactions (
+    record_id SERIAL PRIMARY KEY,
+    user_id VARCHAR(100) REFERENCES users(user_id),
+    transaction_date DATE NOT NULL,
+    total_amount DECIMAL(15, 2) DEFAULT 0.00,
+    transaction_count INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id, transaction_date)
+);
+
+-- Step 4: test users
+INSERT INTO users (user_id, name, phone, email, password_hash, balance, daily_limit)
+VALUES
+    ('user_004', 'Abishek Kumar', '+919876543219', 'abishek@example.com',
+     '$2b$12$sC4pqNPR0pxSK8.6E4aire4FCKHbWK988MYFODhurkjGs35TPj8i.', 20000.00, 10000.00),
+    ('user_005', 'Jerold Smith', '+919876543218', 'jerold@example.com',
+     '$2b$12$sC4pqNPR0pxSK8.6E4aire4FCKHbWK988MYFODhurkjGs35TPj8i.', 18000.00, 10000.00),
+    ('user_006', 'Gowtham Kumar', '+919876543217', 'gowtham@example.com',
+     '$2b$12$sC4pqNPR0pxSK8.6E4aire4FCKHbWK988MYFODhurkjGs35TPj8i.', 22000.00, 10000.00)
+ON CONFLICT (user_id) DO NOTHING;
+
+-- Step 5: devices for the test users
+INSERT INTO user_devices (device_id, user_id, device_name, device_type, is_trusted)
+VALUES
+    ('device_004', 'user_004', 'Abishek Pixel', 'Android', TRUE),
+    ('device_005', 'user_005', 'Jerold iPhone', 'iOS', TRUE),
+    ('device_006', 'user_006', 'Gowtham Samsung', 'Android', TRUE)
+ON CONFLICT (device_id) DO NOTHING;
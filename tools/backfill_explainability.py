@@ -5,9 +5,12 @@ fraud detection reasons and model scores for them.
 """
 import psycopg2
 import psycopg2.extras
+import csv
+import io
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 
 # Add parent directory to path for imports
@@ -17,6 +20,18 @@ load_dotenv()
 
 DB_URL = os.getenv("DB_URL", "").strip()
 
+# Explainability rows COPYed and applied (and committed) together
+UPDATE_BATCH_SIZE = 1000
+# Scoring is CPU-bound (IsolationForest/XGBoost), so it fans out over processes;
+# each task scores SCORING_BATCH_SIZE rows with one predict call per model
+SCORING_WORKERS = os.cpu_count() or 1
+SCORING_BATCH_SIZE = 256
+# Rows fetched per round-trip from the server-side cursor (one batch per worker)
+STREAM_ITERSIZE = SCORING_BATCH_SIZE * SCORING_WORKERS
+
+# Scoring module of a pool worker, loaded once by _init_worker
+_WORKER_SCORING = None
+
 
 def load_scoring_module():
     """Load scoring module with error handling."""
@@ -42,62 +57,205 @@ def generate_explainability_for_transaction(tx_dict, scoring_module):
     try:
         # Re-score the transaction to get all details
         scoring_details = scoring_module.score_transaction(tx_dict, return_details=True)
-        
-        if not scoring_details:
-            return None
-        
-        risk_score = scoring_details.get("risk_score")
-        confidence_level = scoring_details.get("confidence_level", "HIGH")
-        disagreement = scoring_details.get("disagreement", 0.0)
-        final_risk_score = scoring_details.get("final_risk_score")
-        
-        # Generate pattern analysis using the mapper
-        pattern_summary = None
-        pattern_reasons = []
-        try:
-            from app.pattern_mapper import PatternMapper
-            pattern_summary = PatternMapper.get_pattern_summary(
-                scoring_details.get("features", {}),
-                scoring_details.get("model_scores", {})
-            )
-            # Align explainability reasons with fraud pattern categories
-            for p in pattern_summary.get("detected_patterns", []):
-                name = p.get("name") or "Pattern"
-                expl = p.get("explanation") or "Detected"
-                pattern_reasons.append(f"{name}: {expl}")
-        except Exception as e:
-            print(f"  [WARN] Pattern mapping error: {e}")
-        
-        # Merge base reasons with pattern-driven reasons
-        merged_reasons = []
-        for reason in list(scoring_details.get("reasons", [])) + pattern_reasons:
-            if reason and reason not in merged_reasons:
-                merged_reasons.append(reason)
-        
-        explainability = {
-            "reasons": merged_reasons,
-            "pattern_reasons": pattern_reasons,
-            "model_scores": scoring_details.get("model_scores", {}),
-            "features": scoring_details.get("features", {}),
-            "patterns": pattern_summary,
-            "confidence_level": confidence_level,
-            "disagreement": disagreement,
-            "final_risk_score": final_risk_score if final_risk_score is not None else risk_score,
-        }
-        
-        return explainability
+        return build_explainability(scoring_details)
     except Exception as e:
         print(f"  [ERROR] Failed to generate explainability: {e}")
         return None
 
 
+def generate_explainability_batch(tx_dicts, scoring_module):
+    """
+    Batch variant of generate_explainability_for_transaction: every row is
+    scored with a single score_transactions() call (one predict per model).
+    
+    Returns:
+        list: Explainability dicts (or None) in input order
+    """
+    try:
+        details_list = scoring_module.score_transactions(tx_dicts, return_details=True)
+    except Exception as e:
+        print(f"  [ERROR] Failed to score batch: {e}")
+        return [None] * len(tx_dicts)
+    
+    results = []
+    for scoring_details in details_list:
+        try:
+            results.append(build_explainability(scoring_details))
+        except Exception as e:
+            print(f"  [ERROR] Failed to generate explainability: {e}")
+            results.append(None)
+    return results
+
+
+def build_explainability(scoring_details):
+    """Build the stored explainability dict from score_transaction details."""
+    if not scoring_details:
+        return None
+    
+    risk_score = scoring_details.get("risk_score")
+    confidence_level = scoring_details.get("confidence_level", "HIGH")
+    disagreement = scoring_details.get("disagreement", 0.0)
+    final_risk_score = scoring_details.get("final_risk_score")
+    
+    # Generate pattern analysis using the mapper
+    pattern_summary = None
+    pattern_reasons = []
+    try:
+        from app.pattern_mapper import PatternMapper
+        pattern_summary = PatternMapper.get_pattern_summary(
+            scoring_details.get("features", {}),
+            scoring_details.get("model_scores", {})
+        )
+        # Align explainability reasons with fraud pattern categories
+        for p in pattern_summary.get("detected_patterns", []):
+            name = p.get("name") or "Pattern"
+            expl = p.get("explanation") or "Detected"
+            pattern_reasons.append(f"{name}: {expl}")
+    except Exception as e:
+        print(f"  [WARN] Pattern mapping error: {e}")
+    
+    # Merge base reasons with pattern-driven reasons
+    merged_reasons = []
+    for reason in list(scoring_details.get("reasons", [])) + pattern_reasons:
+        if reason and reason not in merged_reasons:
+            merged_reasons.append(reason)
+    
+    explainability = {
+        "reasons": merged_reasons,
+        "pattern_reasons": pattern_reasons,
+        "model_scores": scoring_details.get("model_scores", {}),
+        "features": scoring_details.get("features", {}),
+        "patterns": pattern_summary,
+        "confidence_level": confidence_level,
+        "disagreement": disagreement,
+        "final_risk_score": final_risk_score if final_risk_score is not None else risk_score,
+    }
+    
+    return explainability
+
+
+def _init_worker():
+    """Pool initializer: import scoring and load the models once per worker."""
+    global _WORKER_SCORING
+    _WORKER_SCORING = load_scoring_module()
+    _WORKER_SCORING.load_models()
+
+
+def score_chunk(tx_dicts):
+    """Pool task: generate explainability for a chunk of transaction rows."""
+    explainabilities = generate_explainability_batch(tx_dicts, _WORKER_SCORING)
+    return [(tx_dict.get("tx_id"), expl) for tx_dict, expl in zip(tx_dicts, explainabilities)]
+
+
+def _json_default(obj):
+    """json.dumps fallback for numpy scalars emitted by the models."""
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_explainability(explainability):
+    """Serialize explainability compactly (no whitespace) for the COPY stream."""
+    return json.dumps(explainability, separators=(",", ":"), default=_json_default)
+
+
+def prepare_updates(conn):
+    """
+    Create the session's staging table and prepare the backfill UPDATE once.
+    
+    _bf is emptied at every commit (ON COMMIT DELETE ROWS) but lives for the
+    whole session, so bf_update is parsed and planned only once and each
+    batch just EXECUTEs it.
+    
+    Also applies session-only bulk-write settings (gone when the connection
+    closes): commits do not wait for the WAL flush, and the UPDATE join
+    gets more sort/hash memory. A crash can lose the last few batches, which
+    the next run simply picks up again.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SET synchronous_commit = OFF")
+        cur.execute("SET work_mem = '128MB'")
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS _bf (tx_id TEXT PRIMARY KEY, expl JSONB) ON COMMIT DELETE ROWS")
+        cur.execute("""
+            PREPARE bf_update AS
+            UPDATE public.transactions AS t
+            SET explainability = b.expl,
+                updated_at = NOW()
+            FROM _bf AS b
+            WHERE t.tx_id = b.tx_id
+        """)
+    conn.commit()
+
+
+def flush_updates(conn, batch):
+    """
+    Write a batch of (tx_id, explainability) pairs and commit.
+    
+    The batch is COPYed into the _bf temp table and applied with the
+    prepared UPDATE ... FROM join (see prepare_updates), avoiding per-row
+    parameter encoding.
+    
+    Returns:
+        bool: True if the batch was committed
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for tx_id, explainability in batch:
+        writer.writerow((tx_id, dumps_explainability(explainability)))
+    buf.seek(0)
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert("COPY _bf (tx_id, expl) FROM STDIN WITH (FORMAT csv)", buf)
+            cur.execute("EXECUTE bf_update")
+        conn.commit()
+        print(f"\n  ✓ Committed {len(batch)} updates")
+        return True
+    except Exception as e:
+        print(f"\n  FAILED batch of {len(batch)}: {e}")
+        conn.rollback()
+        return False
+
+
+def iter_scored(cur, pool):
+    """
+    Yield (tx_id, explainability) for every streamed row, in row order.
+    
+    Scoring runs one fetch ahead: the next rows are fetched and submitted to
+    the pool before the previous results are yielded, so the caller's DB
+    writes and the next fetch overlap with CPU-bound scoring.
+    """
+    pending = []
+    while True:
+        # RealDictCursor builds the row dicts in the driver
+        tx_dicts = cur.fetchmany(STREAM_ITERSIZE)
+        submitted = [pool.submit(score_chunk, tx_dicts[i:i + SCORING_BATCH_SIZE])
+                     for i in range(0, len(tx_dicts), SCORING_BATCH_SIZE)]
+        for future in pending:
+            yield from future.result()
+        if not submitted:
+            return
+        pending = submitted
+
+
 def backfill_explainability():
     """Main backfill function."""
     conn = psycopg2.connect(DB_URL)
     try:
-        cur = conn.cursor()
+        # Load scoring module (checked here; each pool worker loads its own copy)
+        try:
+            load_scoring_module()
+            print("✓ Scoring module loaded successfully")
+        except Exception as e:
+            print(f"✗ Failed to load scoring module: {e}")
+            return
+        
+        prepare_updates(conn)
         
-        # Get all transactions without explainability data
+        # Stream transactions without explainability data from a server-side
+        # cursor instead of fetchall(); WITH HOLD keeps it open across the
+        # batch commits below
+        cur = conn.cursor(name="backfill_stream", withhold=True,
+                          cursor_factory=psycopg2.extras.RealDictCursor)
         cur.execute("""
             SELECT tx_id, user_id, device_id, ts, amount, recipient_vpa, 
                    tx_type, channel, risk_score, action, db_status, 
@@ -107,54 +265,28 @@ def backfill_explainability():
             ORDER BY created_at DESC
         """)
         
-        rows = cur.fetchall()
-        print(f"Found {len(rows)} transactions without explainability data")
-        
-        if not rows:
-            print("✓ All transactions already have explainability data")
-            return
-        
-        # Load scoring module
-        try:
-            scoring = load_scoring_module()
-            print("✓ Scoring module loaded successfully")
-        except Exception as e:
-            print(f"✗ Failed to load scoring module: {e}")
-            return
-        
-        # Get column names
-        col_names = [desc[0] for desc in cur.description]
-        
         # Process each transaction
+        processed_count = 0
         updated_count = 0
         skipped_count = 0
+        batch = []
         
-        for idx, row in enumerate(rows, 1):
-            tx_dict = dict(zip(col_names, row))
-            tx_id = tx_dict.get("tx_id")
-            
-            print(f"\n[{idx}/{len(rows)}] Processing {tx_id}...", end=" ")
-            
-            # Generate explainability data
-            explainability = generate_explainability_for_transaction(tx_dict, scoring)
-            
-            if not explainability:
-                print("SKIPPED")
-                skipped_count += 1
-                continue
-            
-            # Update transaction with explainability data
-            try:
-                explainability_json = psycopg2.extras.Json(explainability)
-                cur.execute("""
-                    UPDATE public.transactions
-                    SET explainability = %s,
-                        updated_at = NOW()
-                    WHERE tx_id = %s
-                """, (explainability_json, tx_id))
-                conn.commit()
-                updated_count += 1
-                print("UPDATED")
+        idx = 0
+        with ProcessPoolExecutor(max_workers=SCORING_WORKERS, initializer=_init_worker) as pool:
+            # Generate explainability data across the worker pool (results in row order)
+            for tx_id, explainability in iter_scored(cur, pool):
+                idx += 1
+                processed_count = idx
+                
+                print(f"\n[{idx}] Processing {tx_id}...", end=" ")
+                
+                if not explainability:
+                    print("SKIPPED")
+                    skipped_count += 1
+                    continue
+                
+                batch.append((tx_id, explainability))
+                print("QUEUED")
                 
                 # Show sample reasons
                 reasons = explainability.get("reasons", [])
@@ -164,15 +296,29 @@ def backfill_explainability():
                 if model_scores:
                     risk_score = explainability.get("final_risk_score", 0)
                     print(f"  - Final Risk Score: {risk_score:.4f}")
-            except Exception as e:
-                print(f"FAILED: {e}")
-                conn.rollback()
-                skipped_count += 1
+                
+                if len(batch) >= UPDATE_BATCH_SIZE:
+                    if flush_updates(conn, batch):
+                        updated_count += len(batch)
+                    else:
+                        skipped_count += len(batch)
+                    batch = []
+        
+        if batch:
+            if flush_updates(conn, batch):
+                updated_count += len(batch)
+            else:
+                skipped_count += len(batch)
+        cur.close()
+        
+        if processed_count == 0:
+            print("✓ All transactions already have explainability data")
+            return
         
         # Final summary
         print(f"\n{'='*60}")
         print(f"Backfill Summary:")
-        print(f"  Total transactions processed: {len(rows)}")
+        print(f"  Total transactions processed: {processed_count}")
         print(f"  Successfully updated: {updated_count}")
         print(f"  Skipped/Failed: {skipped_count}")
         print(f"{'='*60}")
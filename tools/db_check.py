@@ -5,9 +5,12 @@ row count and 5 latest transactions. Run from workspace root:
   python tools\db_check.py
 """
 import os
+import sys
 import yaml
-import psycopg2
-import psycopg2.extras
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools._db import get_pool, pooled_conn
 
 CFG = os.path.join(os.getcwd(), 'config', 'config.yaml')
 
@@ -42,34 +45,36 @@ def main():
         print('No DB URL found in env or config/config.yaml')
         return
     try:
-        conn = psycopg2.connect(db, cursor_factory=psycopg2.extras.RealDictCursor)
+        get_pool(db)
     except Exception as e:
         print('Failed to connect to DB:', e)
         return
     try:
-        cur = conn.cursor()
-        cur.execute('SELECT COUNT(*) AS cnt FROM public.transactions;')
-        row = cur.fetchone()
-        cnt = row['cnt'] if row and 'cnt' in row else row[0] if row else None
-        print('transactions count =', cnt)
-        cur.execute('SELECT MAX(created_at) AS newest, MIN(created_at) AS oldest FROM public.transactions;')
-        range_row = cur.fetchone() or {}
-        newest = range_row.get('newest') if isinstance(range_row, dict) else (range_row[0] if range_row else None)
-        oldest = range_row.get('oldest') if isinstance(range_row, dict) else (range_row[1] if range_row else None)
-        print('created_at range: newest=', newest, ' oldest=', oldest)
-        cur.execute("SELECT tx_id, ts, created_at, amount, action FROM public.transactions ORDER BY COALESCE(ts, created_at) DESC LIMIT 5;")
-        sample = cur.fetchall()
+        with pooled_conn(db) as conn, conn.cursor() as cur:
+            # Count, created_at range and sample in one round-trip
+            cur.execute("""
+                SELECT json_build_object(
+                    'cnt', (SELECT COUNT(*) FROM public.transactions),
+                    'newest', (SELECT MAX(created_at) FROM public.transactions),
+                    'oldest', (SELECT MIN(created_at) FROM public.transactions),
+                    'sample', (
+                        SELECT COALESCE(json_agg(s), '[]'::json) FROM (
+                            SELECT tx_id, ts, created_at, amount, action
+                            FROM public.transactions
+                            ORDER BY COALESCE(ts, created_at) DESC
+                            LIMIT 5
+                        ) s
+                    )
+                ) AS result;
+            """)
+            result = cur.fetchone()['result']
+        print('transactions count =', result['cnt'])
+        print('created_at range: newest=', result['newest'], ' oldest=', result['oldest'])
         print('sample rows:')
-        for r in sample:
+        for r in result['sample']:
             print(r)
-        cur.close()
     except Exception as e:
         print('Query failed:', e)
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
 
 if __name__ == '__main__':
     main()
@@ -4,6 +4,11 @@ Debug script to diagnose why risk score is 0
 import sys
 from datetime import datetime, timezone
 
+# Import scoring and load the models once; every test below reuses the
+# cached model globals
+from app import scoring
+scoring.load_models()
+
 # Test transaction (typical "friend" transaction)
 test_tx = {
     "tx_id": "test-friend-123",
@@ -36,8 +41,7 @@ except Exception as e:
 # Test 2: Model loading
 print("\n[TEST 2] Model Loading")
 try:
-    from app import scoring
-    scoring.load_models()
+    assert scoring._MODELS_LOADED, "load_models() did not complete"
     
     if scoring._IFOREST:
         print("✅ Isolation Forest loaded")
@@ -60,7 +64,6 @@ except Exception as e:
 # Test 3: Feature extraction
 print("\n[TEST 3] Feature Extraction")
 try:
-    from app import scoring
     features = scoring.extract_features(test_tx)
     print(f"✅ Features extracted: {len(features)} features")
     print("\nKey features:")
@@ -74,7 +77,6 @@ except Exception as e:
 # Test 4: Scoring
 print("\n[TEST 4] Risk Scoring")
 try:
-    from app import scoring
     risk_score = scoring.score_transaction(test_tx)
     print(f"✅ Risk score calculated: {risk_score:.4f}")
     
@@ -98,8 +100,6 @@ except Exception as e:
 # Test 5: Multiple transactions to build history
 print("\n[TEST 5] Transaction with History")
 try:
-    from app import scoring
-    
     # First transaction (builds history)
     print("   Sending 1st transaction...")
     score1 = scoring.score_transaction(test_tx)
@@ -120,6 +120,20 @@ try:
 except Exception as e:
     print(f"❌ Test failed: {e}")
 
+# Test 6: Synthetic sweep, scored as one batch (one predict call per model)
+print("\n[TEST 6] Score Distribution (batch of 100)")
+try:
+    import numpy as np
+    
+    sweep = [dict(test_tx, tx_id=f"test-sweep-{i}", amount=500.0 + 100 * i) for i in range(100)]
+    scores = np.asarray(scoring.score_transactions(sweep), dtype=float)
+    print(f"   Min: {scores.min():.4f}  Max: {scores.max():.4f}  Mean: {scores.mean():.4f}")
+    p50, p90, p99 = np.percentile(scores, [50, 90, 99])
+    print(f"   P50: {p50:.4f}  P90: {p90:.4f}  P99: {p99:.4f}")
+    
+except Exception as e:
+    print(f"❌ Test failed: {e}")
+
 print("\n" + "=" * 80)
 print("DIAGNOSTIC COMPLETE")
 print("=" * 80)
@@ -6,30 +6,30 @@ Measures response times for all critical endpoints
 
 import time
 import json
-import psycopg2
-import psycopg2.extras
 import os
+import sys
 from datetime import datetime, timezone, timedelta
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools._db import close_pool, pooled_conn
+
 # Database connection
 DB_URL = os.getenv("DATABASE_URL", "").strip()
 
 def measure_query(name, query, params=None):
     """Measure query execution time"""
     try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
-        start = time.time()
-        if params:
-            cur.execute(query, params)
-        else:
-            cur.execute(query)
-        rows = cur.fetchall()
-        elapsed = (time.time() - start) * 1000
-        
-        cur.close()
-        conn.close()
+        # One pooled connection is reused by every measured query, so
+        # connection setup is paid once and not counted in the timings
+        with pooled_conn(DB_URL) as conn, conn.cursor() as cur:
+            start = time.time()
+            if params:
+                cur.execute(query, params)
+            else:
+                cur.execute(query)
+            rows = cur.fetchall()
+            elapsed = (time.time() - start) * 1000
         
         print(f"✓ {name:<40} {elapsed:>8.0f}ms   ({len(rows) if rows else 0} rows)")
         return elapsed
@@ -61,9 +61,9 @@ def main():
             f"Dashboard stats ({time_range})",
             """
             SELECT COUNT(*) as total,
-                   SUM(CASE WHEN action = 'ALLOW' THEN 1 ELSE 0 END) as allowed,
-                   SUM(CASE WHEN action = 'DELAY' THEN 1 ELSE 0 END) as delayed,
-                   SUM(CASE WHEN action = 'BLOCK' THEN 1 ELSE 0 END) as blocked,
+                   COUNT(*) FILTER (WHERE action = 'ALLOW') as allowed,
+                   COUNT(*) FILTER (WHERE action = 'DELAY') as delayed,
+                   COUNT(*) FILTER (WHERE action = 'BLOCK') as blocked,
                    AVG(risk_score) as avg_risk
             FROM public.transactions
             WHERE ts >= %s
@@ -81,9 +81,9 @@ def main():
             f"Timeline ({time_range}) - using ts",
             f"""
             SELECT date_trunc('{bucket_unit}', ts) AS bucket,
-                   SUM(CASE WHEN action = 'BLOCK' THEN 1 ELSE 0 END) AS block,
-                   SUM(CASE WHEN action = 'DELAY' THEN 1 ELSE 0 END) AS delay,
-                   SUM(CASE WHEN action = 'ALLOW' THEN 1 ELSE 0 END) AS allow
+                   COUNT(*) FILTER (WHERE action = 'BLOCK') AS block,
+                   COUNT(*) FILTER (WHERE action = 'DELAY') AS delay,
+                   COUNT(*) FILTER (WHERE action = 'ALLOW') AS allow
             FROM public.transactions
             WHERE ts >= %s
             GROUP BY bucket
@@ -101,10 +101,11 @@ def main():
         measure_query(
             f"Pattern analysis ({time_range}) with LIMIT {limits[time_range]}",
             """
-            SELECT COUNT(*) as count
+            SELECT explainability, risk_score, action
             FROM public.transactions
             WHERE ts >= %s
               AND explainability IS NOT NULL
+            ORDER BY ts DESC
             LIMIT %s
             """,
             (since, limits[time_range])
@@ -118,13 +119,84 @@ def main():
         measure_query(
             f"Risk distribution ({time_range}) - using ts",
             """
-            SELECT
-              SUM(CASE WHEN risk_score < 0.3 THEN 1 ELSE 0 END) AS low,
-              SUM(CASE WHEN risk_score >= 0.3 AND risk_score < 0.6 THEN 1 ELSE 0 END) AS medium,
-              SUM(CASE WHEN risk_score >= 0.6 AND risk_score < 0.8 THEN 1 ELSE 0 END) AS high,
-              SUM(CASE WHEN risk_score >= 0.8 THEN 1 ELSE 0 END) AS critical
+            SELECT width_bucket(risk_score::numeric, ARRAY[0.3, 0.6, 0.8]) AS bucket,
+                   COUNT(*) AS n
             FROM public.transactions
-            WHERE ts >= %s
+            WHERE ts >= %s AND risk_score IS NOT NULL
+            GROUP BY bucket
+            """,
+            (since,)
+        )
+    
+    print("\n" + "="*80)
+    print("COMBINED QUERIES (stats + timeline + risk distribution in one scan)")
+    print("-" * 80)
+    
+    for time_range, since in ranges.items():
+        bucket_unit = 'hour' if time_range == '24h' else ('minute' if time_range == '1h' else 'day')
+        # GROUPING SETS: the () set is the card totals (bucket IS NULL),
+        # the (bucket) set is the timeline, from the same scan of base
+        measure_query(
+            f"Combined ({time_range}) - one round-trip",
+            f"""
+            WITH base AS (
+                SELECT action, risk_score, date_trunc('{bucket_unit}', ts) AS bucket
+                FROM public.transactions
+                WHERE ts >= %s
+            )
+            SELECT bucket,
+                   COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE action = 'ALLOW') AS allowed,
+                   COUNT(*) FILTER (WHERE action = 'DELAY') AS delayed,
+                   COUNT(*) FILTER (WHERE action = 'BLOCK') AS blocked,
+                   AVG(risk_score) AS avg_risk,
+                   COUNT(*) FILTER (WHERE risk_score < 0.3) AS low,
+                   COUNT(*) FILTER (WHERE risk_score >= 0.3 AND risk_score < 0.6) AS medium,
+                   COUNT(*) FILTER (WHERE risk_score >= 0.6 AND risk_score < 0.8) AS high,
+                   COUNT(*) FILTER (WHERE risk_score >= 0.8) AS critical
+            FROM base
+            GROUP BY GROUPING SETS ((), (bucket))
+            ORDER BY bucket DESC NULLS FIRST
+            """,
+            (since,)
+        )
+    
+    print("\n" + "="*80)
+    print("MATERIALIZED VIEW QUERIES (mv_tx_minute_stats, see migrate_add_tx_minute_stats.py)")
+    print("-" * 80)
+    
+    for time_range, since in ranges.items():
+        measure_query(
+            f"Dashboard stats + risk ({time_range}) - MV",
+            """
+            SELECT SUM(total_n) AS total,
+                   SUM(allow_n) AS allowed,
+                   SUM(delay_n) AS delayed,
+                   SUM(block_n) AS blocked,
+                   SUM(risk_sum) / NULLIF(SUM(total_n), 0) AS avg_risk,
+                   SUM(low_n) AS low,
+                   SUM(medium_n) AS medium,
+                   SUM(high_n) AS high,
+                   SUM(critical_n) AS critical
+            FROM public.mv_tx_minute_stats
+            WHERE bucket >= date_trunc('minute', %s::timestamp)
+            """,
+            (since,)
+        )
+    
+    for time_range, since in ranges.items():
+        bucket_unit = 'hour' if time_range == '24h' else ('minute' if time_range == '1h' else 'day')
+        measure_query(
+            f"Timeline ({time_range}) - MV",
+            f"""
+            SELECT date_trunc('{bucket_unit}', bucket) AS bucket,
+                   SUM(block_n) AS block,
+                   SUM(delay_n) AS delay,
+                   SUM(allow_n) AS allow
+            FROM public.mv_tx_minute_stats
+            WHERE bucket >= date_trunc('minute', %s::timestamp)
+            GROUP BY 1
+            ORDER BY 1 DESC
             """,
             (since,)
         )
@@ -137,6 +209,9 @@ def main():
 ✓ Pattern analytics limited to 100-800 records (was unlimited)
 ✓ Timeline uses ts for date_trunc (faster date bucketing)
 ✓ Risk distribution uses ts (correct time filtering)
+✓ Risk distribution buckets rows once with width_bucket (0-3 = low..critical)
+✓ Combined query returns cards, timeline and risk buckets from one scan
+✓ MV queries re-aggregate per-minute rows (up to a refresh interval stale)
 
 EXPECTED PERFORMANCE:
 - Stats queries (cards):        50-150ms each
@@ -158,3 +233,5 @@ if __name__ == "__main__":
         print(f"\n\nError: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        close_pool()
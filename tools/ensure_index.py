@@ -0,0 +1,50 @@
+"""
+Ensure the partial index behind the explainability diagnostics exists.
+
+verify_pattern_mapper.py (and similar tools) read the newest transactions
+that have explainability:
+
+    ... WHERE explainability IS NOT NULL ORDER BY created_at DESC LIMIT N
+
+idx_tx_created_desc_expl covers exactly those rows in that order, so the
+query walks the index and stops after N tuples instead of sorting the table.
+Safe to run multiple times (IF NOT EXISTS).
+"""
+import os
+import sys
+
+import psycopg2.extensions
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools._db import pooled_conn
+from tools.migrate_add_performance_indexes import create_index_concurrently
+
+IDX_NAME = "idx_tx_created_desc_expl"
+IDX_SQL = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tx_created_desc_expl "
+    "ON transactions (created_at DESC) WHERE explainability IS NOT NULL"
+)
+
+_ENSURED = False
+
+
+def ensure_explainability_index():
+    """Create idx_tx_created_desc_expl if needed; checked once per process."""
+    global _ENSURED
+    if _ENSURED:
+        return
+    with pooled_conn() as conn:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        conn.autocommit = True
+        try:
+            with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+                create_index_concurrently(cur, IDX_NAME, IDX_SQL)
+        finally:
+            conn.autocommit = False
+    _ENSURED = True
+
+
+if __name__ == "__main__":
+    ensure_explainability_index()
+    print(f"✓ {IDX_NAME} ensured")
@@ -4,8 +4,12 @@ Generates visualizations and detailed metrics
 """
 
 import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import joblib
+import matplotlib
+matplotlib.use('Agg')  # Headless: files only, no GUI event loop
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.metrics import (
@@ -18,22 +22,59 @@ from sklearn.model_selection import train_test_split
 # Set style
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 8)
+plt.rcParams['figure.dpi'] = 100  # 300 dpi only when saving
 
+PLOT_WORKERS = 4  # One process per plot in main()
 
-def plot_roc_curves(models_dict, X_test, y_test):
-    """Plot ROC curves for all models."""
-    plt.figure(figsize=(10, 8))
+
+def _predict_fraud_proba(model, X_test):
+    """
+    Fraud probability for a supervised model.
+    
+    XGBoost models are scored with the booster's inplace_predict on a
+    contiguous float32 array, skipping the DMatrix the sklearn wrapper builds
+    on every predict_proba call; anything else uses predict_proba.
+    """
+    if hasattr(model, 'get_booster'):
+        try:
+            proba = model.get_booster().inplace_predict(np.ascontiguousarray(X_test, dtype=np.float32))
+            if proba.ndim == 1:
+                return proba
+        except Exception:
+            pass
+    return model.predict_proba(X_test)[:, 1]
+
+
+def compute_model_outputs(models_dict, X_test):
+    """
+    Run each model over the test set once.
     
+    Returns:
+        (scores, preds): dicts keyed by model name with the risk scores
+        (fraud probability, or negated anomaly score for Isolation Forest)
+        and the 0/1 fraud predictions
+    """
+    scores, preds = {}, {}
     for name, model_info in models_dict.items():
         model = model_info['model']
-        is_supervised = model_info['supervised']
         
-        if is_supervised:
-            y_proba = model.predict_proba(X_test)[:, 1]
+        if model_info['supervised']:
+            scores[name] = _predict_fraud_proba(model, X_test)
+            # Same as model.predict() for a binary classifier, without a second pass
+            preds[name] = (scores[name] > 0.5).astype(int)
         else:
-            # Isolation Forest: use anomaly scores
-            y_proba = -model.decision_function(X_test)
-        
+            # Isolation Forest: use anomaly scores; predict() flags
+            # decision_function < 0 as an outlier (-1)
+            scores[name] = -model.decision_function(X_test)
+            preds[name] = (scores[name] > 0).astype(int)
+    return scores, preds
+
+
+def plot_roc_curves(scores, y_test):
+    """Plot ROC curves for all models."""
+    plt.figure(figsize=(10, 8))
+    
+    for name, y_proba in scores.items():
         fpr, tpr, _ = roc_curve(y_test, y_proba)
         roc_auc = auc(fpr, tpr)
         
@@ -53,19 +94,11 @@ def plot_roc_curves(models_dict, X_test, y_test):
     plt.close()
 
 
-def plot_precision_recall_curves(models_dict, X_test, y_test):
+def plot_precision_recall_curves(scores, y_test):
     """Plot Precision-Recall curves for all models."""
     plt.figure(figsize=(10, 8))
     
-    for name, model_info in models_dict.items():
-        model = model_info['model']
-        is_supervised = model_info['supervised']
-        
-        if is_supervised:
-            y_proba = model.predict_proba(X_test)[:, 1]
-        else:
-            y_proba = -model.decision_function(X_test)
-        
+    for name, y_proba in scores.items():
         precision, recall, _ = precision_recall_curve(y_test, y_proba)
         pr_auc = auc(recall, precision)
         
@@ -84,30 +117,21 @@ def plot_precision_recall_curves(models_dict, X_test, y_test):
     plt.close()
 
 
-def plot_confusion_matrices(models_dict, X_test, y_test):
+def plot_confusion_matrices(preds, y_test):
     """Plot confusion matrices for all models."""
-    n_models = len(models_dict)
+    n_models = len(preds)
     fig, axes = plt.subplots(1, n_models, figsize=(6*n_models, 5))
     
     if n_models == 1:
         axes = [axes]
     
-    for idx, (name, model_info) in enumerate(models_dict.items()):
-        model = model_info['model']
-        is_supervised = model_info['supervised']
-        
-        if is_supervised:
-            y_pred = model.predict(X_test)
-        else:
-            y_pred_raw = model.predict(X_test)
-            y_pred = np.where(y_pred_raw == -1, 1, 0)
-        
+    for idx, (name, y_pred) in enumerate(preds.items()):
         cm = confusion_matrix(y_test, y_pred)
         
         sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', 
                    xticklabels=['Normal', 'Fraud'],
                    yticklabels=['Normal', 'Fraud'],
-                   ax=axes[idx], cbar=True)
+                   ax=axes[idx], cbar=True, rasterized=True)
         axes[idx].set_title(f'{name}\nConfusion Matrix', fontweight='bold')
         axes[idx].set_ylabel('True Label')
         axes[idx].set_xlabel('Predicted Label')
@@ -118,31 +142,23 @@ def plot_confusion_matrices(models_dict, X_test, y_test):
     plt.close()
 
 
-def plot_score_distributions(models_dict, X_test, y_test):
+def plot_score_distributions(scores, y_test):
     """Plot score distributions for fraud vs normal transactions."""
-    n_models = len(models_dict)
+    n_models = len(scores)
     fig, axes = plt.subplots(1, n_models, figsize=(6*n_models, 5))
     
     if n_models == 1:
         axes = [axes]
     
-    for idx, (name, model_info) in enumerate(models_dict.items()):
-        model = model_info['model']
-        is_supervised = model_info['supervised']
-        
-        if is_supervised:
-            scores = model.predict_proba(X_test)[:, 1]
-        else:
-            scores = -model.decision_function(X_test)
-        
+    for idx, (name, model_scores) in enumerate(scores.items()):
         # Normalize scores to 0-1
-        scores = (scores - scores.min()) / (scores.max() - scores.min() + 1e-10)
+        model_scores = (model_scores - model_scores.min()) / (model_scores.max() - model_scores.min() + 1e-10)
         
-        fraud_scores = scores[y_test == 1]
-        normal_scores = scores[y_test == 0]
+        fraud_scores = model_scores[y_test == 1]
+        normal_scores = model_scores[y_test == 0]
         
-        axes[idx].hist(normal_scores, bins=50, alpha=0.6, label='Normal', color='green')
-        axes[idx].hist(fraud_scores, bins=50, alpha=0.6, label='Fraud', color='red')
+        axes[idx].hist(normal_scores, bins=50, alpha=0.6, label='Normal', color='green', rasterized=True)
+        axes[idx].hist(fraud_scores, bins=50, alpha=0.6, label='Fraud', color='red', rasterized=True)
         axes[idx].set_xlabel('Risk Score', fontsize=11)
         axes[idx].set_ylabel('Frequency', fontsize=11)
         axes[idx].set_title(f'{name}\nScore Distribution', fontweight='bold')
@@ -155,7 +171,7 @@ def plot_score_distributions(models_dict, X_test, y_test):
     plt.close()
 
 
-def generate_detailed_report(models_dict, X_test, y_test, metadata):
+def generate_detailed_report(scores, preds, y_test, metadata):
     """Generate detailed text report."""
     report = []
     report.append("="*80)
@@ -168,22 +184,13 @@ def generate_detailed_report(models_dict, X_test, y_test, metadata):
     report.append(f"Fraud Rate: {metadata.get('fraud_rate', 0)*100:.2f}%")
     report.append("\n" + "="*80)
     
-    for name, model_info in models_dict.items():
-        model = model_info['model']
-        is_supervised = model_info['supervised']
+    for name, y_proba in scores.items():
+        y_pred = preds[name]
         
         report.append(f"\n\n{'='*80}")
         report.append(f"MODEL: {name.upper()}")
         report.append(f"{'='*80}")
         
-        if is_supervised:
-            y_pred = model.predict(X_test)
-            y_proba = model.predict_proba(X_test)[:, 1]
-        else:
-            y_pred_raw = model.predict(X_test)
-            y_pred = np.where(y_pred_raw == -1, 1, 0)
-            y_proba = -model.decision_function(X_test)
-        
         # Classification Report
         report.append("\nClassification Report:")
         report.append("-" * 80)
@@ -232,7 +239,7 @@ def generate_detailed_report(models_dict, X_test, y_test, metadata):
     return report_text
 
 
-def main():
+def main(rebuild=False):
     """Main evaluation pipeline."""
     print("="*80)
     print("MODEL EVALUATION - Loading models and generating analysis")
@@ -278,20 +285,32 @@ def main():
     
     # Generate test data
     print("\nGenerating test dataset...")
-    X, y, _ = create_training_dataset(n_normal=3000, n_fraud=300, use_redis=False)
+    # create_training_dataset caches the generated dataset on disk itself
+    X, y, _ = create_training_dataset(n_normal=3000, n_fraud=300, rebuild=rebuild)
     _, X_test, _, y_test = train_test_split(X, y, test_size=0.5, random_state=42, stratify=y)
     print(f"✓ Test set: {X_test.shape[0]} samples ({np.sum(y_test == 1)} fraud)")
     
+    # Score the test set once; every plot and the report reuse the outputs
+    print("\nScoring test set...")
+    scores, preds = compute_model_outputs(models_dict, X_test)
+    
     # Generate visualizations
+    # Each plot renders and saves its own figure; run them in separate
+    # processes (pyplot state isn't thread-safe) from the precomputed arrays
     print("\nGenerating visualizations...")
-    plot_roc_curves(models_dict, X_test, y_test)
-    plot_precision_recall_curves(models_dict, X_test, y_test)
-    plot_confusion_matrices(models_dict, X_test, y_test)
-    plot_score_distributions(models_dict, X_test, y_test)
+    with ProcessPoolExecutor(max_workers=PLOT_WORKERS) as executor:
+        futures = [
+            executor.submit(plot_roc_curves, scores, y_test),
+            executor.submit(plot_precision_recall_curves, scores, y_test),
+            executor.submit(plot_confusion_matrices, preds, y_test),
+            executor.submit(plot_score_distributions, scores, y_test),
+        ]
+        for future in futures:
+            future.result()
     
     # Generate detailed report
     print("\nGenerating detailed report...")
-    report = generate_detailed_report(models_dict, X_test, y_test, metadata)
+    report = generate_detailed_report(scores, preds, y_test, metadata)
     
     print("\n" + "="*80)
     print("EVALUATION COMPLETE")
@@ -306,4 +325,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(rebuild="--rebuild" in sys.argv[1:])
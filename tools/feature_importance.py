@@ -6,6 +6,8 @@ Analyzes which features are most important for fraud detection
 import json
 import numpy as np
 import joblib
+import matplotlib
+matplotlib.use('Agg')  # Headless: files only, no GUI event loop
 import matplotlib.pyplot as plt
 import seaborn as sns
 from app.feature_engine import get_feature_names
@@ -13,12 +15,19 @@ from app.feature_engine import get_feature_names
 # Set style
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (14, 8)
+plt.rcParams['figure.dpi'] = 100  # 300 dpi only when saving
+
+
+def _top_indices(importances, top_n):
+    """Indices of the top_n largest importances, highest first."""
+    idx = np.argpartition(importances, -top_n)[-top_n:]
+    return idx[np.argsort(importances[idx])[::-1]]
 
 
 def plot_feature_importance_rf(model, feature_names, top_n=20):
     """Plot feature importance for Random Forest."""
     importances = model.feature_importances_
-    indices = np.argsort(importances)[::-1][:top_n]
+    indices = _top_indices(importances, top_n)
     
     plt.figure(figsize=(12, 8))
     plt.title('Random Forest - Top Feature Importances', fontsize=16, fontweight='bold')
@@ -38,7 +47,7 @@ def plot_feature_importance_rf(model, feature_names, top_n=20):
 def plot_feature_importance_xgb(model, feature_names, top_n=20):
     """Plot feature importance for XGBoost."""
     importances = model.feature_importances_
-    indices = np.argsort(importances)[::-1][:top_n]
+    indices = _top_indices(importances, top_n)
     
     plt.figure(figsize=(12, 8))
     plt.title('XGBoost - Top Feature Importances', fontsize=16, fontweight='bold')
@@ -55,19 +64,19 @@ def plot_feature_importance_xgb(model, feature_names, top_n=20):
     return list(zip([feature_names[i] for i in indices], importances[indices]))
 
 
-def plot_feature_comparison(rf_importance, xgb_importance, feature_names, top_n=15):
+def plot_feature_comparison(rf_importances, xgb_importances, feature_names, top_n=15):
     """Compare feature importance between Random Forest and XGBoost."""
-    # Get common top features
-    rf_dict = dict(rf_importance)
-    xgb_dict = dict(xgb_importance)
+    rf_importances = np.asarray(rf_importances)
+    xgb_importances = np.asarray(xgb_importances)
     
-    all_features = set(list(rf_dict.keys())[:top_n] + list(xgb_dict.keys())[:top_n])
-    common_features = sorted(all_features, 
-                            key=lambda x: rf_dict.get(x, 0) + xgb_dict.get(x, 0), 
-                            reverse=True)[:top_n]
+    # Get common top features: union of each model's top_n, ranked by combined importance
+    candidates = np.union1d(_top_indices(rf_importances, top_n), _top_indices(xgb_importances, top_n))
+    combined = rf_importances[candidates] + xgb_importances[candidates]
+    order = candidates[np.argsort(combined)[::-1][:top_n]]
     
-    rf_scores = [rf_dict.get(f, 0) for f in common_features]
-    xgb_scores = [xgb_dict.get(f, 0) for f in common_features]
+    rf_scores = np.take(rf_importances, order)
+    xgb_scores = np.take(xgb_importances, order)
+    common_features = [feature_names[i] for i in order]
     
     x = np.arange(len(common_features))
     width = 0.35
@@ -205,7 +214,7 @@ def main():
         xgb_importance = plot_feature_importance_xgb(xgb_model, feature_names)
     
     if rf and xgb_model:
-        plot_feature_comparison(rf_importance, xgb_importance, feature_names)
+        plot_feature_comparison(rf.feature_importances_, xgb_model.feature_importances_, feature_names)
     
     # Generate report
     if rf_importance and xgb_importance:
@@ -1,4 +1,31 @@
-﻿def dummy_score(features):
+﻿import numpy as np
+
+
+def dummy_score_batch(features):
+    """
+    Vectorized dummy_score for many transactions at once:
+    features = (N, 4) array of [amount, hour_of_day, tx_count_1h, new_recipient_flag]
+    Returns an (N,) array of risk scores.
+    """
+    features = np.asarray(features, dtype=float).reshape(-1, 4)
+    amount, hour, count_1h, new_rec = features.T
+
+    score = np.zeros(len(features))
+
+    # Higher amount → higher risk
+    score += 0.5 * (amount > 2000)
+    score += 0.8 * (amount > 5000)
+
+    # New recipient → add risk
+    score += 0.3 * (new_rec == 1)
+
+    # Many transactions in 1 hour → add risk
+    score += 0.4 * (count_1h > 5)
+    score += 0.6 * (count_1h > 10)
+
+    return np.minimum(score, 1.0)  # normalize
+
+def dummy_score(features):
     """
     Very simple rule-based risk score:
     features = [amount, hour_of_day, tx_count_1h, new_recipient_flag]
@@ -25,6 +52,11 @@
 
     return min(score, 1.0)  # normalize
 
+def action_from_score_batch(scores):
+    """Vectorized action_from_score: (N,) scores → (N,) array of actions."""
+    s = np.asarray(scores, dtype=float)
+    return np.select([s >= 0.8, s >= 0.4], ["BLOCK", "DELAY"], default="ALLOW")
+
 def action_from_score(score):
     if score >= 0.8:
         return "BLOCK"
@@ -14,32 +14,84 @@ load_dotenv()
 
 DB_URL = os.getenv("DB_URL", "").strip()
 
+def index_is_valid(cur, idx_name):
+    """True if the index exists and is usable (a failed CONCURRENTLY build leaves it invalid)."""
+    cur.execute(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s",
+        (idx_name,)
+    )
+    row = cur.fetchone()
+    return bool(row and row[0])
+
+def create_index_concurrently(cur, idx_name, sql, retries=1):
+    """
+    Run a CREATE INDEX CONCURRENTLY IF NOT EXISTS statement and make sure the
+    result is valid. An interrupted concurrent build leaves an INVALID index
+    that IF NOT EXISTS would then skip, so drop it and build again.
+    """
+    for attempt in range(retries + 1):
+        cur.execute(sql)
+        if index_is_valid(cur, idx_name):
+            return
+        print(f"  ⚠️  {idx_name} is invalid, dropping and rebuilding...")
+        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {idx_name}")
+    raise RuntimeError(f"Index {idx_name} is still invalid after {retries + 1} attempts")
+
 def main():
     print("🔧 Adding performance indexes for transactions...")
     
     try:
         conn = psycopg2.connect(DB_URL)
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        conn.autocommit = True
         cur = conn.cursor()
         
         # Add composite indexes for better query performance
         indexes = [
             ("idx_transactions_user_created", 
-             "CREATE INDEX IF NOT EXISTS idx_transactions_user_created ON transactions(user_id, created_at DESC)"),
+             "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_created ON transactions(user_id, created_at DESC)"),
             
             ("idx_transactions_user_action_created", 
-             "CREATE INDEX IF NOT EXISTS idx_transactions_user_action_created ON transactions(user_id, action, created_at DESC)")
+             "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_transactions_user_action_created ON transactions(user_id, action, created_at DESC)"),
+            
+            # ts is append-only and time-ordered: a BRIN index is tiny, cheap to
+            # maintain, and lets dashboard range scans (ts >= ...) skip old pages
+            ("idx_tx_ts_brin", 
+             "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tx_ts_brin ON transactions USING brin (ts) WITH (pages_per_range = 32)"),
+            
+            # Pattern analytics reads the newest rows that have explainability;
+            # the scan walks this index in order and stops at the LIMIT
+            ("idx_tx_ts_explain", 
+             "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tx_ts_explain ON transactions (ts DESC) WHERE explainability IS NOT NULL")
         ]
         
         for idx_name, sql in indexes:
             print(f"  Creating index: {idx_name}...")
-            cur.execute(sql)
+            create_index_concurrently(cur, idx_name, sql)
             print(f"  ✓ {idx_name} created")
         
-        conn.commit()
+        # user_id and action are strongly correlated (per-user BLOCK rates
+        # vary widely); extended statistics give the planner their joint
+        # selectivity for "user_id = ... AND action = ..." filters
+        print("  Creating extended statistics: stx_tx_user_action...")
+        cur.execute(
+            "CREATE STATISTICS IF NOT EXISTS stx_tx_user_action (ndistinct, dependencies, mcv) "
+            "ON user_id, action FROM transactions"
+        )
+        print("  ✓ stx_tx_user_action created")
+        
+        # Refresh planner stats, including the extended statistics above
+        print("  Running ANALYZE transactions...")
+        cur.execute("ANALYZE transactions")
+        print("  ✓ transactions analyzed")
+        
         print("\n✅ Performance indexes added successfully!")
         print("\nIndexes created:")
         print("  - idx_transactions_user_created (user_id, created_at DESC)")
         print("  - idx_transactions_user_action_created (user_id, action, created_at DESC)")
+        print("  - idx_tx_ts_brin (BRIN on ts, pages_per_range=32)")
+        print("  - idx_tx_ts_explain (ts DESC) WHERE explainability IS NOT NULL")
+        print("  - stx_tx_user_action (extended statistics on user_id, action)")
         print("\nThese indexes will significantly speed up transaction history queries.")
         
         cur.close()
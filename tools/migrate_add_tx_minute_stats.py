@@ -0,0 +1,68 @@
+"""
+Migration: add the mv_tx_minute_stats materialized view.
+
+Per-minute action counts, risk-bucket counts and risk sums over
+public.transactions, so dashboard aggregates for any time range re-aggregate
+pre-bucketed rows instead of scanning every transaction.
+Safe to run multiple times (IF NOT EXISTS).
+
+Refresh it periodically (e.g. cron every 1-5 minutes) with:
+    python tools/migrate_add_tx_minute_stats.py --refresh
+"""
+import psycopg2
+import os
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_URL = os.getenv("DB_URL", "").strip()
+
+DDL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.mv_tx_minute_stats AS
+SELECT date_trunc('minute', ts) AS bucket,
+       COUNT(*) AS total_n,
+       COUNT(*) FILTER (WHERE action = 'ALLOW') AS allow_n,
+       COUNT(*) FILTER (WHERE action = 'DELAY') AS delay_n,
+       COUNT(*) FILTER (WHERE action = 'BLOCK') AS block_n,
+       SUM(risk_score) AS risk_sum,
+       COUNT(*) FILTER (WHERE risk_score < 0.3) AS low_n,
+       COUNT(*) FILTER (WHERE risk_score >= 0.3 AND risk_score < 0.6) AS medium_n,
+       COUNT(*) FILTER (WHERE risk_score >= 0.6 AND risk_score < 0.8) AS high_n,
+       COUNT(*) FILTER (WHERE risk_score >= 0.8) AS critical_n
+FROM public.transactions
+GROUP BY 1;
+
+-- Unique index required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_tx_minute_stats_bucket
+ON public.mv_tx_minute_stats (bucket);
+"""
+
+REFRESH = "REFRESH MATERIALIZED VIEW CONCURRENTLY public.mv_tx_minute_stats;"
+
+def run():
+    conn = psycopg2.connect(DB_URL)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(DDL)
+            conn.commit()
+            print("✓ mv_tx_minute_stats materialized view ensured")
+    finally:
+        conn.close()
+
+def refresh():
+    conn = psycopg2.connect(DB_URL)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(REFRESH)
+            conn.commit()
+            print("✓ mv_tx_minute_stats refreshed")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    if "--refresh" in sys.argv[1:]:
+        refresh()
+    else:
+        run()
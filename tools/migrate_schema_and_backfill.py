@@ -2,10 +2,15 @@
 import yaml
 import psycopg2
 import psycopg2.extras
+import multiprocessing as mp
 import os
 import sys
 from datetime import datetime, timezone
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools._db import close_pool, pooled_conn
+
 # load config.yaml (supports either JSON or YAML structure)
 import pathlib
 CONF_PATH = pathlib.Path(__file__).parent.parent / "config" / "config.yaml"
@@ -21,8 +26,8 @@ def load_config(path=CONF_PATH):
     data = yaml.safe_load(text)
     return data
 
-def get_conn(db_url):
-    return psycopg2.connect(db_url, cursor_factory=psycopg2.extras.RealDictCursor)
+# Backfill processes; each claims its own batches with FOR UPDATE SKIP LOCKED
+BACKFILL_WORKERS = os.cpu_count() or 1
 
 def ensure_columns(conn):
     cur = conn.cursor()
@@ -52,58 +57,132 @@ def import_scoring():
             raise ImportError(f"scoring.py missing required function: {fn}")
     return scoring
 
-def backfill(conn, scoring_module, batch=200):
+def _tx_data(r):
+    return {
+        "tx_id": r.get("tx_id"),
+        "user_id": r.get("user_id"),
+        "device_id": r.get("device_id"),
+        "timestamp": r.get("ts") or r.get("created_at"),
+        "amount": float(r.get("amount")) if r.get("amount") is not None else 0.0,
+        "recipient_vpa": r.get("recipient_vpa"),
+        "tx_type": r.get("tx_type"),
+        "channel": r.get("channel"),
+    }
+
+def _score_rows(scoring_module, rows, tx_batch):
+    # bind the scoring functions once per batch instead of resolving three
+    # module attributes per row
+    extract = scoring_module.extract_features
+    score = scoring_module.score_features
+    act = scoring_module.assign_action
+    results = []
+    for r, tx_data in zip(rows, tx_batch):
+        try:
+            risk = score(extract(tx_data))
+            action = act(risk)
+        except Exception as e:
+            print(f"[warn] scoring failed for tx_id={r.get('tx_id')}: {e}")
+            # fallback: mark risk 0 and ALLOW
+            risk = 0.0
+            action = "ALLOW"
+        results.append((risk, action))
+    return results
+
+def ensure_pending_index(conn):
+    # Partial index over only the rows still to backfill: each batch's
+    # keyset SELECT reads the next `batch` entries instead of scanning the
+    # table, and the index shrinks as rows are filled in
+    conn.autocommit = True  # CONCURRENTLY can't run inside a transaction
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tx_backfill_pending
+            ON transactions (tx_id) WHERE risk_score IS NULL OR action IS NULL;
+        """)
+        cur.close()
+    finally:
+        conn.autocommit = False
+    print("[ok] ensured idx_tx_backfill_pending index exists")
+
+def backfill(conn, scoring_module, batch=200, after_tx_id=None):
+    """Score and update one batch of rows missing risk_score/action.
+
+    Rows are read in tx_id order after `after_tx_id` (keyset pagination on
+    the primary key), so each call continues where the previous one stopped,
+    and are locked with FOR UPDATE SKIP LOCKED until the batch commits, so
+    concurrent workers never claim the same rows. Returns (rows updated, last tx_id in the batch).
+
+    If scoring.py defines score_batch(tx_list) -> (risks, actions), the whole
+    batch is scored in one call (one model predict); otherwise, or if it
+    raises, rows are scored one at a time.
+    """
     cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
     # select rows missing risk_score or action
     cur.execute("""
-      SELECT id, tx_id, user_id, device_id, ts, amount, recipient_vpa, tx_type, channel
+      SELECT tx_id, user_id, device_id, ts, amount, recipient_vpa, tx_type, channel
       FROM transactions
-      WHERE risk_score IS NULL OR action IS NULL
-      ORDER BY created_at NULLS FIRST, id
-      LIMIT %s;
-    """, (batch,))
+      WHERE (risk_score IS NULL OR action IS NULL)
+        AND (%s IS NULL OR tx_id > %s)
+      ORDER BY tx_id
+      LIMIT %s
+      FOR UPDATE SKIP LOCKED;
+    """, (after_tx_id, after_tx_id, batch))
     rows = cur.fetchall()
     if not rows:
+        conn.commit()
         print("[ok] no rows to backfill")
         cur.close()
-        return 0
-
-    updated = 0
-    for r in rows:
-        tx_data = {
-            "tx_id": r.get("tx_id"),
-            "user_id": r.get("user_id"),
-            "device_id": r.get("device_id"),
-            "timestamp": r.get("ts") or r.get("created_at"),
-            "amount": float(r.get("amount")) if r.get("amount") is not None else 0.0,
-            "recipient_vpa": r.get("recipient_vpa"),
-            "tx_type": r.get("tx_type"),
-            "channel": r.get("channel"),
-        }
+        return 0, after_tx_id
+
+    tx_batch = [_tx_data(r) for r in rows]
+    results = None
+    score_batch = getattr(scoring_module, "score_batch", None)
+    if score_batch is not None:
+        # one model call for the whole batch
         try:
-            feats = scoring_module.extract_features(tx_data)
-            risk = scoring_module.score_features(feats)
-            action = scoring_module.assign_action(risk)
+            risks, actions = score_batch(tx_batch)
+            results = list(zip(risks, actions))
+            if len(results) != len(rows):
+                raise ValueError(f"score_batch returned {len(results)} results for {len(rows)} rows")
         except Exception as e:
-            print(f"[warn] scoring failed for tx_id={r.get('tx_id')} id={r.get('id')}: {e}")
-            # fallback: mark risk 0 and ALLOW
-            risk = 0.0
-            action = "ALLOW"
-
-        # update row
-        cur2 = conn.cursor()
-        cur2.execute("""
-            UPDATE transactions
-            SET risk_score = %s, action = %s, created_at = COALESCE(created_at, now())
-            WHERE id = %s;
-        """, (risk, action, r["id"]))
-        conn.commit()
-        cur2.close()
-        updated += 1
+            results = None
+            print(f"[warn] batch scoring failed, scoring rows individually: {e}")
+    if results is None:
+        results = _score_rows(scoring_module, rows, tx_batch)
+
+    updates = [(r["tx_id"], float(risk), action) for r, (risk, action) in zip(rows, results)]
+
+    # update the whole batch in one statement and one commit
+    psycopg2.extras.execute_values(cur, """
+        UPDATE transactions
+        SET risk_score = v.risk::float8, action = v.action, created_at = COALESCE(created_at, now())
+        FROM (VALUES %s) AS v(tx_id, risk, action)
+        WHERE transactions.tx_id = v.tx_id;
+    """, updates, template="(%s, %s, %s)", page_size=len(updates))
+    conn.commit()
+    updated = len(updates)
 
     cur.close()
     print(f"[ok] backfilled {updated} rows (batch={batch})")
-    return updated
+    return updated, rows[-1]["tx_id"]
+
+def backfill_worker(db_url):
+    """Worker process: backfill batches until no unclaimed rows remain."""
+    scoring = import_scoring()
+    try:
+        with pooled_conn(db_url) as conn:
+            # Loop until no more rows to backfill (safe: limited batches), each
+            # batch picking up after the last tx_id of the previous one
+            total_updated = 0
+            last_tx_id = None
+            while True:
+                updated, last_tx_id = backfill(conn, scoring, batch=200, after_tx_id=last_tx_id)
+                total_updated += updated
+                if updated == 0:
+                    break
+            return total_updated
+    finally:
+        close_pool()
 
 def main():
     cfg = load_config(CONF_PATH)
@@ -113,34 +192,39 @@ def main():
         return
 
     print("Using DB URL:", db_url)
-    conn = get_conn(db_url)
+    with pooled_conn(db_url) as conn:
+        try:
+            ensure_columns(conn)
+        except Exception as e:
+            print("ERROR ensuring columns:", e)
+            return
 
-    try:
-        ensure_columns(conn)
-    except Exception as e:
-        print("ERROR ensuring columns:", e)
-        conn.close()
-        return
+        try:
+            scoring = import_scoring()
+        except Exception as e:
+            print("ERROR importing scoring.py — backfill will be skipped. Details:")
+            print(e)
+            print("If scoring.py exists, ensure it is importable and defines extract_features, score_features, assign_action.")
+            return
 
-    try:
-        scoring = import_scoring()
-    except Exception as e:
-        print("ERROR importing scoring.py — backfill will be skipped. Details:")
-        print(e)
-        print("If scoring.py exists, ensure it is importable and defines extract_features, score_features, assign_action.")
-        conn.close()
-        return
+        try:
+            ensure_pending_index(conn)
+        except Exception as e:
+            print("[warn] could not create idx_tx_backfill_pending, continuing without it:", e)
 
-    # Loop until no more rows to backfill (safe: limited batches)
-    total_updated = 0
-    while True:
-        updated = backfill(conn, scoring, batch=200)
-        total_updated += updated
-        if updated == 0:
-            break
+    # Forked workers open their own pools
+    close_pool()
 
-    print(f"Done. Total rows backfilled: {total_updated}")
-    conn.close()
+    # Scoring is CPU-bound: spread batches over worker processes, each with
+    # its own connection, claiming rows with SKIP LOCKED
+    print(f"Backfilling with {BACKFILL_WORKERS} worker(s)...")
+    with mp.Pool(BACKFILL_WORKERS) as pool:
+        totals = pool.map(backfill_worker, [db_url] * BACKFILL_WORKERS)
+
+    print(f"Done. Total rows backfilled: {sum(totals)}")
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        close_pool()
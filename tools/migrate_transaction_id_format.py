@@ -10,6 +10,8 @@ This script:
 Run this after updating the codebase to use the new UPI transaction ID generator.
 """
 
+import csv
+import io
 import psycopg2
 import psycopg2.extras
 import os
@@ -20,7 +22,7 @@ import pathlib
 # Add project root to path
 sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
 
-from app.upi_transaction_id import generate_upi_transaction_id
+from app.upi_transaction_id import generate_upi_transaction_ids
 
 
 def load_db_url():
@@ -53,6 +55,9 @@ def migrate_transaction_ids(db_url):
     """Migrate transaction IDs to 12-digit UPI format."""
     
     conn = get_conn(db_url)
+    # One snapshot per transaction: the ID enumeration (step 2) and the copy
+    # (step 3) share a transaction, so they see exactly the same rows
+    conn.set_session(isolation_level='REPEATABLE READ', readonly=False)
     cur = conn.cursor()
     
     try:
@@ -116,41 +121,51 @@ def migrate_transaction_ids(db_url):
         total_count = cur.fetchone()['count']
         print(f"   Found {total_count} transactions to migrate")
         
-        # Generate mapping of old IDs to new IDs
-        cur.execute("SELECT tx_id FROM transactions ORDER BY created_at ASC")
-        old_ids = [row['tx_id'] for row in cur.fetchall()]
-        
+        # Generate mapping of old IDs to new IDs, streaming the old IDs from a
+        # server-side cursor instead of materializing them with fetchall().
+        # The count above comes from the same REPEATABLE READ snapshot, so
+        # all new IDs (consecutive, hence unique) can be generated up front
+        new_ids = generate_upi_transaction_ids(total_count)
         id_mapping = {}
-        for old_id in old_ids:
-            new_id = generate_upi_transaction_id()
-            # Ensure uniqueness (extremely unlikely but possible if IDs collide)
-            while new_id in id_mapping.values():
-                new_id = generate_upi_transaction_id()
-            id_mapping[old_id] = new_id
+        with conn.cursor(name='old_ids_cur') as scur:
+            scur.itersize = 10000
+            scur.execute("SELECT tx_id FROM transactions ORDER BY created_at ASC")
+            for row, new_id in zip(scur, new_ids):
+                id_mapping[row['tx_id']] = new_id
         
         print(f"✓ Generated {len(id_mapping)} new transaction IDs")
         
-        # Step 3: Copy data with new IDs
+        # Step 3: Copy data with new IDs. The mapping is bulk-loaded into a
+        # temp table with COPY and joined in a single INSERT ... SELECT, in
+        # the same REPEATABLE READ snapshot that enumerated the IDs above
         print("\n3. Copying data to temporary table...")
-        for i, (old_id, new_id) in enumerate(id_mapping.items(), 1):
-            if i % 1000 == 0:
-                print(f"   Migrated {i}/{len(id_mapping)} transactions")
-            
-            cur.execute("""
-                INSERT INTO transactions_new (
-                    tx_id, user_id, device_id, ts, amount, recipient_vpa,
-                    tx_type, channel, risk_score, action, db_status, remarks,
-                    location, receiver_user_id, status_history, amount_deducted_at,
-                    amount_credited_at, created_at, updated_at, old_tx_id
-                )
-                SELECT 
-                    %s, user_id, device_id, ts, amount, recipient_vpa,
-                    tx_type, channel, risk_score, action, db_status, remarks,
-                    location, receiver_user_id, status_history, amount_deducted_at,
-                    amount_credited_at, created_at, updated_at, tx_id
-                FROM transactions
-                WHERE tx_id = %s
-            """, (new_id, old_id))
+        cur.execute("""
+            CREATE TEMP TABLE id_map (
+                old_id VARCHAR(100) PRIMARY KEY,
+                new_id VARCHAR(12) NOT NULL
+            ) ON COMMIT DROP
+        """)
+        buf = io.StringIO()
+        csv.writer(buf).writerows(id_mapping.items())
+        buf.seek(0)
+        cur.copy_expert("COPY id_map (old_id, new_id) FROM STDIN WITH (FORMAT csv)", buf)
+        cur.execute("ANALYZE id_map")
+        
+        cur.execute("""
+            INSERT INTO transactions_new (
+                tx_id, user_id, device_id, ts, amount, recipient_vpa,
+                tx_type, channel, risk_score, action, db_status, remarks,
+                location, receiver_user_id, status_history, amount_deducted_at,
+                amount_credited_at, created_at, updated_at, old_tx_id
+            )
+            SELECT 
+                m.new_id, t.user_id, t.device_id, t.ts, t.amount, t.recipient_vpa,
+                t.tx_type, t.channel, t.risk_score, t.action, t.db_status, t.remarks,
+                t.location, t.receiver_user_id, t.status_history, t.amount_deducted_at,
+                t.amount_credited_at, t.created_at, t.updated_at, t.tx_id
+            FROM transactions t
+            JOIN id_map m ON t.tx_id = m.old_id
+        """)
         
         conn.commit()
         print(f"✓ Copied {len(id_mapping)} transactions")
@@ -158,6 +173,15 @@ def migrate_transaction_ids(db_url):
         # Step 4: Update foreign key references in related tables
         print("\n4. Updating foreign key references...")
         
+        # Drop the tx_id indexes on the referencing tables first: the
+        # UPDATEs below rewrite every tx_id, and maintaining these B-trees
+        # row by row costs far more than one bulk rebuild in step 6
+        cur.execute("""
+            DROP INDEX IF EXISTS idx_fraud_alerts_tx_id,
+                                 idx_transaction_ledger_tx_id,
+                                 idx_admin_logs_tx_id
+        """)
+        
         # Update fraud_alerts table
         cur.execute("SELECT COUNT(*) as count FROM fraud_alerts")
         alert_count = cur.fetchone()['count']
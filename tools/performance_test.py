@@ -10,33 +10,84 @@ It measures:
 """
 
 import asyncio
+import statistics
 import time
-import json
 import aiohttp
 from datetime import datetime
 
 BASE_URL = "http://localhost:8000"
+CONCURRENT_COPIES = 20  # Requests per endpoint per time range
+MAX_IN_FLIGHT = 50      # Cap on simultaneous requests
+WARMUP_ROUNDS = 3       # Discarded rounds before measuring
+MIN_POOL_SIZE = 5       # Expected backend DB pool size (if it reports one)
+POOL_WARMUP_REQUESTS = 10
+
+def make_session():
+    """One keep-alive session for the whole run, so timings exclude TCP setup.
+    
+    The connector allows as many sockets as requests can be in flight, so a
+    request never waits in the client for a free connection (that wait would
+    be counted as server latency).
+    """
+    connector = aiohttp.TCPConnector(
+        limit=MAX_IN_FLIGHT,
+        limit_per_host=MAX_IN_FLIGHT,
+        keepalive_timeout=60,
+    )
+    return aiohttp.ClientSession(connector=connector)
 
 async def test_endpoint(session, endpoint, time_range="24h"):
     """Test a single endpoint and measure response time and payload size"""
     url = f"{BASE_URL}{endpoint}?time_range={time_range}"
     
-    start = time.time()
+    start_ns = time.perf_counter_ns()
     async with session.get(url) as response:
-        data = await response.json()
-        elapsed = time.time() - start
-        payload_size = len(json.dumps(data))
+        # Size of the body as sent; the payload isn't inspected, so skip
+        # decoding and re-encoding it
+        raw = await response.read()
+        elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        payload_size = len(raw)
         
         return {
             "endpoint": endpoint,
             "time_range": time_range,
-            "response_time_ms": round(elapsed * 1000, 2),
+            "response_time_ms": round(elapsed_ms, 2),
             "payload_size_bytes": payload_size,
             "status": response.status
         }
 
-async def test_parallel_requests(time_range="24h"):
-    """Test all dashboard endpoints in parallel and measure total time"""
+async def check_backend_pool(session):
+    """Make sure timings measure queries, not backend DB connection setup
+    
+    If the backend reports its DB pool at /debug/pool, require at least
+    MIN_POOL_SIZE connections. Otherwise fire POOL_WARMUP_REQUESTS concurrent
+    requests (timings discarded) so whatever connection reuse the backend
+    has is warm before measuring.
+    """
+    try:
+        async with session.get(f"{BASE_URL}/debug/pool") as response:
+            stats = await response.json() if response.status == 200 else None
+    except (aiohttp.ClientError, ValueError):
+        stats = None
+    
+    if stats is not None:
+        size = stats.get("size", stats.get("active", 0) + stats.get("idle", 0))
+        if size < MIN_POOL_SIZE:
+            raise RuntimeError(f"Backend DB pool too small ({size} < {MIN_POOL_SIZE}); "
+                               "timings would include connection setup")
+        print(f"✓ Backend DB pool size: {size}")
+        return
+    
+    print(f"⚠ No /debug/pool endpoint; warming up with {POOL_WARMUP_REQUESTS} concurrent requests")
+    await asyncio.gather(*[test_endpoint(session, "/dashboard-data") for _ in range(POOL_WARMUP_REQUESTS)])
+
+async def test_parallel_requests(session, time_range="24h"):
+    """Load all dashboard endpoints concurrently and report latency percentiles
+    
+    Each endpoint is requested CONCURRENT_COPIES times (at most MAX_IN_FLIGHT
+    requests in flight) after WARMUP_ROUNDS discarded rounds, so the numbers
+    reflect warm caches and include tail latency, not a single sample.
+    """
     endpoints = [
         "/dashboard-data",
         "/recent-transactions",
@@ -44,37 +95,64 @@ async def test_parallel_requests(time_range="24h"):
         "/pattern-analytics"
     ]
     
-    async with aiohttp.ClientSession() as session:
-        print(f"\n{'='*70}")
-        print(f"Testing Parallel Requests: {time_range}")
-        print(f"{'='*70}")
-        
-        start = time.time()
-        tasks = [test_endpoint(session, ep, time_range) for ep in endpoints]
-        results = await asyncio.gather(*tasks)
-        total_time = time.time() - start
-        
-        total_payload = 0
-        for result in results:
-            print(f"\n{result['endpoint']}:")
-            print(f"  Response Time: {result['response_time_ms']}ms")
-            print(f"  Payload Size: {result['payload_size_bytes']:,} bytes")
-            print(f"  Status: {result['status']}")
-            total_payload += result['payload_size_bytes']
-        
-        print(f"\n{'-'*70}")
-        print(f"Total Time (Parallel): {round(total_time * 1000, 2)}ms")
-        print(f"Total Payload: {total_payload:,} bytes ({round(total_payload/1024, 2)} KB)")
-        print(f"Average Response Time: {round((total_time/len(endpoints)) * 1000, 2)}ms per endpoint")
-        
-        return {
-            "time_range": time_range,
-            "total_time_ms": round(total_time * 1000, 2),
-            "total_payload_bytes": total_payload,
-            "endpoint_count": len(endpoints)
-        }
+    print(f"\n{'='*70}")
+    print(f"Testing Parallel Requests: {time_range} "
+          f"({CONCURRENT_COPIES} concurrent requests per endpoint)")
+    print(f"{'='*70}")
+    
+    # Warm-up: first requests pay cold server/DB caches; discard them
+    for _ in range(WARMUP_ROUNDS):
+        await asyncio.gather(*[test_endpoint(session, ep, time_range) for ep in endpoints])
+    
+    semaphore = asyncio.Semaphore(MAX_IN_FLIGHT)
+    
+    async def bounded(endpoint):
+        async with semaphore:
+            return await test_endpoint(session, endpoint, time_range)
+    
+    # TaskGroup (Python 3.11+) cancels the remaining requests as soon as one
+    # fails, so a broken endpoint can't skew the totals
+    start_ns = time.perf_counter_ns()
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(bounded(ep)) for ep in endpoints for _ in range(CONCURRENT_COPIES)]
+    results = [t.result() for t in tasks]
+    total_time = (time.perf_counter_ns() - start_ns) / 1e9
+    
+    by_endpoint = {ep: [r for r in results if r['endpoint'] == ep] for ep in endpoints}
+    
+    total_payload = 0
+    p50s, p95s = [], []
+    for endpoint, samples in by_endpoint.items():
+        latencies = [r['response_time_ms'] for r in samples]
+        q = statistics.quantiles(latencies, n=100)
+        p50s.append(q[49])
+        p95s.append(q[94])
+        payload = samples[-1]['payload_size_bytes']
+        errors = sum(1 for r in samples if r['status'] != 200)
+        print(f"\n{endpoint}:")
+        print(f"  p50 / p95 / p99: {q[49]:.2f}ms / {q[94]:.2f}ms / {q[98]:.2f}ms")
+        print(f"  Payload Size: {payload:,} bytes")
+        print(f"  Non-200 responses: {errors}/{len(samples)}")
+        total_payload += payload
+    
+    # A dashboard load waits for its slowest endpoint
+    load_p50 = max(p50s)
+    load_p95 = max(p95s)
+    
+    print(f"\n{'-'*70}")
+    print(f"Wall Time ({len(tasks)} requests): {round(total_time * 1000, 2)}ms")
+    print(f"Dashboard Load p50 / p95: {load_p50:.2f}ms / {load_p95:.2f}ms")
+    print(f"Total Payload: {total_payload:,} bytes ({round(total_payload/1024, 2)} KB)")
+    
+    return {
+        "time_range": time_range,
+        "total_time_ms": round(load_p50, 2),
+        "p95_time_ms": round(load_p95, 2),
+        "total_payload_bytes": total_payload,
+        "endpoint_count": len(endpoints)
+    }
 
-async def test_sequential_requests(time_range="24h"):
+async def test_sequential_requests(session, time_range="24h"):
     """Test all dashboard endpoints sequentially and measure total time"""
     endpoints = [
         "/dashboard-data",
@@ -83,32 +161,31 @@ async def test_sequential_requests(time_range="24h"):
         "/pattern-analytics"
     ]
     
-    async with aiohttp.ClientSession() as session:
-        print(f"\n{'='*70}")
-        print(f"Testing Sequential Requests (Simulated): {time_range}")
-        print(f"{'='*70}")
-        
-        results = []
-        total_time = 0
-        
-        for endpoint in endpoints:
-            result = await test_endpoint(session, endpoint, time_range)
-            results.append(result)
-            total_time += result['response_time_ms']
-            
-        print(f"\n{'-'*70}")
-        print(f"Total Time (Sequential - Simulated): {round(total_time, 2)}ms")
-        print(f"Expected Parallel Time: {round(max([r['response_time_ms'] for r in results]), 2)}ms")
-        
-        for result in results:
-            print(f"\n{result['endpoint']}:")
-            print(f"  Response Time: {result['response_time_ms']}ms")
-        
-        return {
-            "time_range": time_range,
-            "sequential_time_ms": round(total_time, 2),
-            "parallel_time_ms": round(max([r['response_time_ms'] for r in results]), 2)
-        }
+    print(f"\n{'='*70}")
+    print(f"Testing Sequential Requests (Simulated): {time_range}")
+    print(f"{'='*70}")
+    
+    results = []
+    total_time = 0
+    
+    for endpoint in endpoints:
+        result = await test_endpoint(session, endpoint, time_range)
+        results.append(result)
+        total_time += result['response_time_ms']
+        
+    print(f"\n{'-'*70}")
+    print(f"Total Time (Sequential - Simulated): {round(total_time, 2)}ms")
+    print(f"Expected Parallel Time: {round(max([r['response_time_ms'] for r in results]), 2)}ms")
+    
+    for result in results:
+        print(f"\n{result['endpoint']}:")
+        print(f"  Response Time: {result['response_time_ms']}ms")
+    
+    return {
+        "time_range": time_range,
+        "sequential_time_ms": round(total_time, 2),
+        "parallel_time_ms": round(max([r['response_time_ms'] for r in results]), 2)
+    }
 
 async def run_all_tests():
     """Run all performance tests"""
@@ -124,26 +201,30 @@ async def run_all_tests():
         
         all_results = {}
         
-        for time_range in time_ranges:
-            parallel_result = await test_parallel_requests(time_range)
-            all_results[f"parallel_{time_range}"] = parallel_result
+        async with make_session() as session:
+            await check_backend_pool(session)
             
-            # Small delay between tests
-            await asyncio.sleep(0.5)
+            for time_range in time_ranges:
+                parallel_result = await test_parallel_requests(session, time_range)
+                all_results[f"parallel_{time_range}"] = parallel_result
+                
+                # Small delay between tests
+                await asyncio.sleep(0.5)
         
         # Print summary
         print(f"\n\n{'='*70}")
         print("PERFORMANCE SUMMARY")
         print(f"{'='*70}")
         
-        print(f"\n{'Time Range':<12} {'Parallel Time':<18} {'Payload Size':<18} {'Status'}")
+        print(f"\n{'Time Range':<12} {'Load p50':<12} {'Load p95':<12} {'Payload Size':<18} {'Status'}")
         print("-" * 70)
         
         for time_range in time_ranges:
             result = all_results[f"parallel_{time_range}"]
             payload_kb = round(result['total_payload_bytes'] / 1024, 2)
             status = "✓ GOOD" if result['total_time_ms'] < 500 else "✗ SLOW"
-            print(f"{time_range:<12} {result['total_time_ms']:.0f}ms{'':<12} {payload_kb} KB{'':<8} {status}")
+            print(f"{time_range:<12} {result['total_time_ms']:<10.0f}ms {result['p95_time_ms']:<10.0f}ms "
+                  f"{payload_kb} KB{'':<8} {status}")
         
         print("\n" + "="*70)
         print("RECOMMENDATIONS:")
@@ -10,93 +10,98 @@ load_dotenv()
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-DB_URL = os.getenv("DB_URL", "").strip()
+from tools._db import pooled_conn
 
-def test_explainability_column():
-    """Check if explainability column exists."""
-    import psycopg2
-    conn = psycopg2.connect(DB_URL)
-    try:
-        cur = conn.cursor()
+# (schema, table) -> [(column_name, data_type), ...]; the table layout doesn't
+# change while a diagnostic run is going, so look it up once per process
+_COLUMNS_CACHE = {}
+
+def _columns_of(cur, schema="public", table="transactions"):
+    """Column names and types of schema.table, read from pg_attribute.
+    
+    Goes straight to the catalog rather than through the information_schema
+    views, whose joins make them slow to query.
+    """
+    key = (schema, table)
+    if key not in _COLUMNS_CACHE:
         cur.execute("""
-            SELECT column_name, data_type
-            FROM information_schema.columns
-            WHERE table_schema = 'public'
-              AND table_name = 'transactions'
-            ORDER BY ordinal_position;
-        """)
-        columns = cur.fetchall()
-        
-        print("\n=== TRANSACTIONS TABLE COLUMNS ===")
-        for col_name, col_type in columns:
-            print(f"  {col_name:<20} {col_type}")
-        
-        has_expl = any(col[0] == 'explainability' for col in columns)
-        if has_expl:
-            print("\n✓ explainability column EXISTS")
-        else:
-            print("\n✗ explainability column MISSING")
-            print("\nRun migration to add it:")
-            print("  python tools/migrate_add_explainability.py")
-            print("  or")
-            print("  psql $DB_URL -f tools/migrate_add_explainability.sql")
-        
-        cur.close()
-        return has_expl
-    finally:
-        conn.close()
+            SELECT attname AS column_name,
+                   format_type(atttypid, atttypmod) AS data_type
+            FROM pg_attribute
+            WHERE attrelid = to_regclass(%s)
+              AND attnum > 0
+              AND NOT attisdropped
+            ORDER BY attnum;
+        """, (f"{schema}.{table}",))
+        _COLUMNS_CACHE[key] = [(r['column_name'], r['data_type']) for r in cur.fetchall()]
+    return _COLUMNS_CACHE[key]
 
-def test_recent_transaction_explainability():
-    """Check if recent transactions have explainability data."""
-    import psycopg2
-    import psycopg2.extras
+def test_explainability_column(cur):
+    """Check if explainability column exists."""
+    columns = _columns_of(cur)
     
-    conn = psycopg2.connect(DB_URL, cursor_factory=psycopg2.extras.RealDictCursor)
+    print("\n=== TRANSACTIONS TABLE COLUMNS ===")
+    for col_name, col_type in columns:
+        print(f"  {col_name:<20} {col_type}")
+    
+    has_expl = any(col_name == 'explainability' for col_name, _ in columns)
+    if has_expl:
+        print("\n✓ explainability column EXISTS")
+    else:
+        print("\n✗ explainability column MISSING")
+        print("\nRun migration to add it:")
+        print("  python tools/migrate_add_explainability.py")
+        print("  or")
+        print("  psql $DB_URL -f tools/migrate_add_explainability.sql")
+    
+    return has_expl
+
+def test_recent_transaction_explainability(cur):
+    """Check if recent transactions have explainability data."""
+    # Try to get explainability column
     try:
-        cur = conn.cursor()
+        cur.execute("""
+            SELECT tx_id, action, risk_score, explainability
+            FROM public.transactions
+            ORDER BY created_at DESC
+            LIMIT %s;
+        """, (5,))
+        rows = cur.fetchall()
         
-        # Try to get explainability column
-        try:
-            cur.execute("""
-                SELECT tx_id, action, risk_score, explainability
-                FROM public.transactions
-                ORDER BY created_at DESC
-                LIMIT 5;
-            """)
-            rows = cur.fetchall()
-            
-            print("\n=== RECENT TRANSACTIONS (with explainability) ===")
-            for row in rows:
-                print(f"\nTX: {row['tx_id']}")
-                print(f"  Action: {row['action']}")
-                print(f"  Risk: {row.get('risk_score', 'N/A')}")
-                expl = row.get('explainability')
-                if expl:
-                    print(f"  Explainability: {type(expl).__name__}")
-                    if isinstance(expl, dict):
-                        print(f"    - Reasons: {len(expl.get('reasons', []))} items")
-                        print(f"    - Model scores: {list(expl.get('model_scores', {}).keys())}")
-                        if expl.get('reasons'):
-                            print(f"    - First reason: {expl['reasons'][0]}")
-                    else:
-                        print(f"    - Raw: {expl}")
+        lines = ["\n=== RECENT TRANSACTIONS (with explainability) ==="]
+        for row in rows:
+            lines.append(f"\nTX: {row['tx_id']}")
+            lines.append(f"  Action: {row['action']}")
+            lines.append(f"  Risk: {row.get('risk_score', 'N/A')}")
+            expl = row.get('explainability')
+            if expl:
+                lines.append(f"  Explainability: {type(expl).__name__}")
+                if isinstance(expl, dict):
+                    lines.append(f"    - Reasons: {len(expl.get('reasons', []))} items")
+                    lines.append(f"    - Model scores: {list(expl.get('model_scores', {}).keys())}")
+                    if expl.get('reasons'):
+                        lines.append(f"    - First reason: {expl['reasons'][0]}")
                 else:
-                    print("  Explainability: NULL/missing")
-                    
-        except Exception as e:
-            print(f"\n✗ Error querying explainability: {e}")
-            print("\nThe explainability column may not exist yet.")
-        
-        cur.close()
-    finally:
-        conn.close()
+                    lines.append(f"    - Raw: {expl}")
+            else:
+                lines.append("  Explainability: NULL/missing")
+        print("\n".join(lines))
+                
+    except Exception as e:
+        # Leave the shared connection usable for whoever runs next
+        cur.connection.rollback()
+        print(f"\n✗ Error querying explainability: {e}")
+        print("\nThe explainability column may not exist yet.")
 
 def test_scoring_output():
     """Test that scoring produces explainability data."""
     print("\n=== TESTING SCORING OUTPUT ===")
     
     try:
-        from app.scoring import score_transaction
+        from app.scoring import score_transaction, _warm
+        
+        # Load models and run the first-predict setup outside the scored call
+        _warm()
         
         # Sample transaction
         test_tx = {
@@ -142,12 +147,18 @@ if __name__ == "__main__":
     print("EXPLAINABILITY DIAGNOSTIC TOOL")
     print("="*60)
     
-    # Test 1: Check column exists
-    has_column = test_explainability_column()
-    
-    # Test 2: Check recent transactions
-    if has_column:
-        test_recent_transaction_explainability()
+    # One pooled connection and cursor shared by the database checks
+    with pooled_conn() as conn:
+        cur = conn.cursor()
+        
+        # Test 1: Check column exists
+        has_column = test_explainability_column(cur)
+        
+        # Test 2: Check recent transactions
+        if has_column:
+            test_recent_transaction_explainability(cur)
+        
+        cur.close()
     
     # Test 3: Test scoring output
     test_scoring_output()
@@ -1,21 +1,39 @@
 """Test script to verify real-time pattern aggregation."""
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 BASE_URL = "http://localhost:8000"
 
+def _fetch(session, url):
+    """GET url; return the response, or the exception it raised."""
+    try:
+        return session.get(url, timeout=5)
+    except Exception as e:
+        return e
+
 def test_pattern_aggregation():
     print("="*80)
     print("TESTING REAL-TIME PATTERN AGGREGATION")
     print("="*80)
     
-    # Test different time ranges
+    # One keep-alive connection pool for all probes to the same host
+    session = requests.Session()
+    
+    # Test different time ranges, plus the limit parameter; the probes are
+    # independent, so issue them concurrently and report in order
     time_ranges = ["1h", "24h", "7d"]
+    urls = [f"{BASE_URL}/pattern-analytics?time_range={tr}" for tr in time_ranges]
+    urls.append(f"{BASE_URL}/pattern-analytics?limit=100")
+    
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        responses = list(executor.map(lambda url: _fetch(session, url), urls))
     
-    for time_range in time_ranges:
+    for time_range, response in zip(time_ranges, responses):
         print(f"\n📊 Fetching pattern analytics for: {time_range}")
         try:
-            response = requests.get(f"{BASE_URL}/pattern-analytics?time_range={time_range}", timeout=5)
+            if isinstance(response, Exception):
+                raise response
             
             if response.status_code == 200:
                 data = response.json()
@@ -55,7 +73,9 @@ def test_pattern_aggregation():
     # Test with limit parameter
     print(f"\n📊 Fetching pattern analytics with limit=100")
     try:
-        response = requests.get(f"{BASE_URL}/pattern-analytics?limit=100", timeout=5)
+        response = responses[-1]
+        if isinstance(response, Exception):
+            raise response
         
         if response.status_code == 200:
             data = response.json()
@@ -65,6 +85,8 @@ def test_pattern_aggregation():
     except Exception as e:
         print(f"   ✗ Exception: {e}")
     
+    session.close()
+    
     print("\n" + "="*80)
     print("TEST COMPLETE")
     print("="*80)
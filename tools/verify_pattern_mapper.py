@@ -1,24 +1,26 @@
 """Verify pattern mapper integration by checking persisted data."""
-import psycopg2
-import psycopg2.extras
 import os
-from dotenv import load_dotenv
+import sys
 
-load_dotenv()
-DB_URL = os.getenv("DB_URL", "").strip()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-conn = psycopg2.connect(DB_URL, cursor_factory=psycopg2.extras.RealDictCursor)
-cur = conn.cursor()
+from tools._db import pooled_conn
+from tools.ensure_index import ensure_explainability_index
 
-cur.execute("""
-    SELECT tx_id, action, risk_score, explainability
-    FROM public.transactions
-    WHERE explainability IS NOT NULL
-    ORDER BY created_at DESC
-    LIMIT 3
-""")
+# The query below is an index scan on the partial explainability index
+ensure_explainability_index()
 
-rows = cur.fetchall()
+with pooled_conn() as conn:
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT tx_id, action, risk_score, explainability
+        FROM public.transactions
+        WHERE explainability IS NOT NULL
+        ORDER BY created_at DESC
+        LIMIT 3
+    """)
+    rows = cur.fetchall()
+    cur.close()
 
 print("\n" + "="*80)
 print("PATTERN MAPPER INTEGRATION VERIFICATION")
@@ -67,9 +69,6 @@ for i, row in enumerate(rows, 1):
     else:
         print("   ✗ No explainability data")
 
-cur.close()
-conn.close()
-
 print("\n" + "="*80)
 print("VERIFICATION COMPLETE")
 print("="*80)
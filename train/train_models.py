@@ -6,14 +6,15 @@ Enhanced ML Training Pipeline for UPI Fraud Detection
 - Saves multiple model files with metadata
 """
 
-import random
-import uuid
+import hashlib
+import inspect
 import json
 import os
 import sys
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 import numpy as np
 import joblib
+from joblib import Parallel, delayed, parallel_config
 from sklearn.ensemble import IsolationForest, RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import (
@@ -26,8 +27,6 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from app.upi_transaction_id import generate_upi_transaction_id
-
 # Define feature names for this training pipeline
 def get_feature_names():
     """Return ordered list of feature names for model training."""
@@ -46,202 +45,228 @@ def get_feature_names():
         "merchant_risk_score", "is_qr_channel", "is_web_channel"
     ]
 
-# Set random seeds for reproducibility
-random.seed(42)
-np.random.seed(42)
-
 # ----------------------------
 # REALISTIC TRANSACTION GENERATOR
 # ----------------------------
 
-def generate_normal_transaction():
-    """Generate a normal, legitimate transaction."""
-    ts = datetime.now(timezone.utc) - timedelta(seconds=random.randint(0, 86400))
-    
-    # Normal user behavior patterns
-    user_id = random.randint(1, 500)
+def _with_hour(ts, hours):
+    """Epoch seconds `ts` moved to hour `hours` of the same UTC day (datetime.replace(hour=...))."""
+    return ts - (ts % 86400) + hours * 3600 + ts % 3600
+
+
+FRAUD_TYPES = ["high_amount", "velocity", "account_takeover", "suspicious_merchant", "night_activity", "mixed"]
+FRAUD_TYPE_WEIGHTS = [0.25, 0.20, 0.20, 0.15, 0.10, 0.10]
+
+
+def generate_training_columns(n_normal, n_fraud, rng, base_ts=None):
+    """
+    Generate synthetic training transactions as columns (one array per field).
     
-    # Normal amounts follow log-normal distribution
-    amount = round(abs(np.random.lognormal(5.5, 1.2)), 2)
-    amount = min(amount, 5000)  # Cap at 5000 for normal transactions
+    Normal transactions: log-normal amounts capped at 5000, spread over the
+    24h before base_ts with 70% moved into business hours (9-21), P2P/P2M
+    40/60, app/qr/web channels 70/20/10. Rows [0, n_normal) are normal, the
+    rest fraudulent; fraud rows start as normal ones and each FRAUD_TYPES
+    pattern overwrites its fields through a boolean mask.
     
-    # Time patterns - more likely during business hours
-    if random.random() < 0.7:  # 70% during business hours
-        ts = ts.replace(hour=random.randint(9, 21))
+    Returns:
+        dict of arrays: amount, ts (UTC epoch seconds), tx_type, channel,
+        new_device, merchant_digit (recipient VPA starts with a digit)
+    """
+    if base_ts is None:
+        base_ts = datetime.now(timezone.utc)
+    now = int(base_ts.timestamp())
+    n = n_normal + n_fraud
+    
+    # Normal behaviour
+    amount = np.minimum(np.round(np.abs(rng.lognormal(5.5, 1.2, n)), 2), 5000)
+    ts = now - rng.integers(0, 86400, n, endpoint=True)
+    business = rng.random(n) < 0.7  # 70% during business hours
+    ts[business] = _with_hour(ts[business], rng.integers(9, 21, business.sum(), endpoint=True))
+    tx_type = rng.choice(["P2P", "P2M"], n, p=[0.4, 0.6])
+    channel = rng.choice(["app", "qr", "web"], n, p=[0.7, 0.2, 0.1])
+    new_device = np.zeros(n, dtype=bool)
+    merchant_digit = np.zeros(n, dtype=bool)
+    
+    # Fraud patterns
+    fraud_type = np.full(n, -1)
+    fraud_type[n_normal:] = rng.choice(len(FRAUD_TYPES), n_fraud, p=FRAUD_TYPE_WEIGHTS)
+    
+    def uniform_amount(mask, low, high):
+        amount[mask] = np.round(rng.uniform(low, high, mask.sum()), 2)
+    
+    def night_ts(mask, last_hour):
+        fresh = now - rng.integers(0, 86400, mask.sum(), endpoint=True)
+        ts[mask] = _with_hour(fresh, rng.integers(0, last_hour, mask.sum(), endpoint=True))
+    
+    m = fraud_type == 0  # high_amount
+    uniform_amount(m, 8000, 25000)
+    
+    m = fraud_type == 1  # velocity: caught by velocity features at scoring time
+    uniform_amount(m, 500, 3000)
+    
+    m = fraud_type == 2  # account_takeover: new device + new recipient + unusual time
+    new_device[m] = True
+    night_ts(m, 5)
+    uniform_amount(m, 2000, 8000)
+    
+    m = fraud_type == 3  # suspicious_merchant: numeric VPA over QR
+    merchant_digit[m] = True
+    uniform_amount(m, 1000, 5000)
+    channel[m] = "qr"
+    
+    m = fraud_type == 4  # night_activity
+    night_ts(m, 4)
+    uniform_amount(m, 1500, 6000)
+    
+    m = fraud_type == 5  # mixed: high round amount, new device, QR/web
+    amount[m] = np.round(rng.uniform(5000, 15000, m.sum()) / 100) * 100
+    new_device[m] = True
+    channel[m] = rng.choice(["qr", "web"], m.sum())
     
     return {
-        "tx_id": generate_upi_transaction_id(),
-        "user_id": f"user{user_id}",
-        "device_id": f"device_{user_id}_{random.randint(1, 3)}",  # 1-3 devices per user
-        "timestamp": ts.isoformat(),
         "amount": amount,
-        "recipient_vpa": f"merchant{random.randint(1, 300)}@upi",
-        "tx_type": random.choices(["P2P", "P2M"], weights=[0.4, 0.6])[0],
-        "channel": random.choices(["app", "qr", "web"], weights=[0.7, 0.2, 0.1])[0]
+        "ts": ts,
+        "tx_type": tx_type,
+        "channel": channel,
+        "new_device": new_device,
+        "merchant_digit": merchant_digit,
     }
 
 
-def generate_fraud_transaction():
-    """Generate a fraudulent transaction with realistic fraud patterns."""
-    tx = generate_normal_transaction()
-    
-    # Multiple fraud patterns
-    fraud_type = random.choices(
-        ["high_amount", "velocity", "account_takeover", "suspicious_merchant", "night_activity", "mixed"],
-        weights=[0.25, 0.20, 0.20, 0.15, 0.10, 0.10]
-    )[0]
-    
-    if fraud_type == "high_amount":
-        # Unusually high amount
-        tx["amount"] = round(random.uniform(8000, 25000), 2)
-        
-    elif fraud_type == "velocity":
-        # Rapid succession - simulate by same timestamp/user
-        tx["amount"] = round(random.uniform(500, 3000), 2)
-        # This will be caught by velocity features in feature extraction
-        
-    elif fraud_type == "account_takeover":
-        # New device + new recipient + unusual time
-        tx["device_id"] = f"device_new_{uuid.uuid4().hex[:8]}"
-        tx["recipient_vpa"] = f"suspicious{random.randint(1, 50)}@upi"
-        tx["timestamp"] = (datetime.now(timezone.utc) - timedelta(
-            seconds=random.randint(0, 86400))
-        ).replace(hour=random.randint(0, 5)).isoformat()
-        tx["amount"] = round(random.uniform(2000, 8000), 2)
-        
-    elif fraud_type == "suspicious_merchant":
-        # Merchant with suspicious patterns
-        tx["recipient_vpa"] = f"{random.randint(100000, 999999)}@upi"
-        tx["amount"] = round(random.uniform(1000, 5000), 2)
-        tx["channel"] = "qr"
-        
-    elif fraud_type == "night_activity":
-        # Late night/early morning transactions
-        tx["timestamp"] = (datetime.now(timezone.utc) - timedelta(
-            seconds=random.randint(0, 86400))
-        ).replace(hour=random.randint(0, 4)).isoformat()
-        tx["amount"] = round(random.uniform(1500, 6000), 2)
-        tx["recipient_vpa"] = f"merchant{random.randint(500, 700)}@upi"
-        
-    elif fraud_type == "mixed":
-        # Multiple suspicious indicators
-        tx["amount"] = round(random.uniform(5000, 15000), 2)
-        tx["device_id"] = f"device_new_{uuid.uuid4().hex[:8]}"
-        tx["channel"] = random.choice(["qr", "web"])
-        # Round amount (common in fraud)
-        tx["amount"] = round(tx["amount"] / 100) * 100
-    
-    return tx
+DATASET_SEED = 42
+# Generated timestamps are offsets back from this fixed instant (not "now"),
+# so the temporal features - and the dataset cache - don't depend on the run date
+DATASET_BASE_TS = datetime(2026, 1, 15, tzinfo=timezone.utc)
 
 
-def create_training_dataset(n_normal=10000, n_fraud=1000):
+def _dataset_version():
+    """
+    Short hash of everything that shapes the generated dataset: the
+    generator/feature code, the feature list, the fraud mix, seed and base
+    date. Part of the cache key, so editing any of them invalidates the cache.
+    """
+    parts = [
+        inspect.getsource(fn)
+        for fn in (_with_hour, generate_training_columns, features_from_columns, get_feature_names)
+    ]
+    parts.append(repr((FRAUD_TYPES, FRAUD_TYPE_WEIGHTS, DATASET_SEED, DATASET_BASE_TS.isoformat())))
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()[:12]
+
+
+def create_training_dataset(n_normal=10000, n_fraud=1000, rebuild=False):
     """
     Create a realistic training dataset with labels.
     
+    Generation is seeded and anchored at DATASET_BASE_TS, so it is
+    deterministic; the result is cached in
+    models/_train_cache_{n_normal}_{n_fraud}_{version}.npz, where version
+    hashes the generator and feature code (see _dataset_version). Pass
+    rebuild=True (--rebuild on the command line) to regenerate anyway.
+    
     Args:
         n_normal: Number of normal transactions
         n_fraud: Number of fraudulent transactions
+        rebuild: Ignore and overwrite the on-disk cache
     
     Returns:
         X: Feature matrix
         y: Labels (0=normal, 1=fraud)
-        raw_data: Original transactions for analysis
+        raw_data: Generated transaction columns (see generate_training_columns)
     """
-    print(f"Generating {n_normal} normal and {n_fraud} fraudulent transactions...")
-    
-    transactions = []
-    labels = []
+    cache_path = f"models/_train_cache_{n_normal}_{n_fraud}_{_dataset_version()}.npz"
+    if not rebuild and os.path.exists(cache_path):
+        with np.load(cache_path) as data:
+            X, y = data["X"], data["y"]
+            raw_data = {k[len("raw_"):]: data[k] for k in data.files if k.startswith("raw_")}
+        print(f"✓ Loaded cached dataset: {cache_path} ({X.shape[0]} samples)")
+        return X, y, raw_data
     
-    # Generate normal transactions
-    for _ in range(n_normal):
-        tx = generate_normal_transaction()
-        transactions.append(tx)
-        labels.append(0)
+    print(f"Generating {n_normal} normal and {n_fraud} fraudulent transactions...")
+    rng = np.random.default_rng(DATASET_SEED)
     
-    # Generate fraud transactions
-    for _ in range(n_fraud):
-        tx = generate_fraud_transaction()
-        transactions.append(tx)
-        labels.append(1)
+    columns = generate_training_columns(n_normal, n_fraud, rng, DATASET_BASE_TS)
+    y = np.concatenate([np.zeros(n_normal, dtype=np.int64), np.ones(n_fraud, dtype=np.int64)])
     
     print("Extracting features...")
-    X = []
-    valid_indices = []
-    
-    for idx, tx in enumerate(transactions):
-        try:
-            # Use simplified feature extraction
-            feature_vec = extract_features_simple(tx)
-            
-            X.append(feature_vec)
-            valid_indices.append(idx)
-        except Exception as e:
-            print(f"Warning: Failed to extract features for transaction {idx}: {e}")
-            continue
-    
-    X = np.array(X)
-    y = np.array([labels[i] for i in valid_indices])
-    raw_data = [transactions[i] for i in valid_indices]
+    X = features_from_columns(columns, rng)
+    raw_data = columns
     
     print(f"Dataset created: {X.shape[0]} samples, {X.shape[1]} features")
     print(f"Normal: {np.sum(y == 0)}, Fraud: {np.sum(y == 1)} ({np.mean(y)*100:.2f}% fraud rate)")
     
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    np.savez(cache_path, X=X, y=y, **{f"raw_{k}": v for k, v in raw_data.items()})
+    print(f"✓ Cached dataset: {cache_path}")
+    
     return X, y, raw_data
 
 
-def extract_features_simple(tx):
-    """Simplified feature extraction without Redis (for training)."""
-    ts_str = tx["timestamp"]
-    if ts_str.endswith('Z'):
-        ts_str = ts_str[:-1] + '+00:00'
-    ts = datetime.fromisoformat(ts_str)
-    amount = float(tx["amount"])
-    merchant = tx["recipient_vpa"].split("@")[0]
-    
-    features = [
-        amount,  # amount
-        np.log1p(amount),  # log_amount
-        1.0 if (amount % 100 == 0 or amount % 500 == 0) else 0.0,  # is_round_amount
-        float(ts.hour),  # hour_of_day
-        float(ts.month),  # month_of_year
-        float(ts.weekday()),  # day_of_week
-        1.0 if ts.weekday() >= 5 else 0.0,  # is_weekend
-        1.0 if (ts.hour >= 22 or ts.hour <= 5) else 0.0,  # is_night
-        1.0 if (9 <= ts.hour <= 17) else 0.0,  # is_business_hours
-        # Velocity features - set to defaults for training
-        0.0, 0.0, 0.0, 0.0, 0.0,  # tx_count_1h, 6h, 24h, 1min, 5min
-        # Behavioral features
-        0.0,  # is_new_recipient
-        random.uniform(1, 10),  # recipient_tx_count
-        1.0 if "new" in tx["device_id"] else 0.0,  # is_new_device
-        random.uniform(1, 3),  # device_count
-        1.0 if tx["tx_type"] == "P2M" else 0.0,  # is_p2m
-        1.0 if tx["tx_type"] == "P2P" else 0.0,  # is_p2p
-        # Statistical features
-        amount * random.uniform(0.8, 1.2),  # amount_mean (simulated)
-        amount * 0.3,  # amount_std (simulated)
-        amount * 1.5,  # amount_max (simulated)
-        random.uniform(0, 2),  # amount_deviation
-        # Risk indicators
-        0.5 if merchant[0].isdigit() else 0.0,  # merchant_risk_score
-        1.0 if tx["channel"] == "qr" else 0.0,  # is_qr_channel
-        1.0 if tx["channel"] == "web" else 0.0,  # is_web_channel
-    ]
-    return features
+def features_from_columns(cols, rng=None):
+    """
+    Build the training feature matrix from transaction columns.
+    
+    The simulated behavioral/statistical noise columns are drawn from `rng`
+    (a numpy Generator, seeded with 42 if not given) as whole columns.
+    
+    Returns an (N, num_features) float32 matrix with columns in get_feature_names() order.
+    """
+    if rng is None:
+        rng = np.random.default_rng(42)
+    amounts = cols["amount"]
+    n = len(amounts)
+    ts = cols["ts"]  # UTC epoch seconds
+    days = ts // 86400
+    hours = (ts % 86400) // 3600
+    weekdays = (days + 3) % 7  # 1970-01-01 was a Thursday
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64) % 12 + 1
+    tx_types = cols["tx_type"]
+    channels = cols["channel"]
+    
+    recipient_tx_count = rng.uniform(1, 10, n)
+    device_count = rng.uniform(1, 3, n)
+    mean_mult = rng.uniform(0.8, 1.2, n)
+    amount_deviation = rng.uniform(0, 2, n)
+    
+    # float32 is the native dtype of the sklearn tree learners and XGBoost's
+    # histogram builder, so the matrix is consumed without a converting copy
+    X = np.empty((n, len(get_feature_names())), dtype=np.float32)
+    X[:, 0] = amounts  # amount
+    X[:, 1] = np.log1p(amounts)  # log_amount
+    X[:, 2] = (amounts % 100 == 0) | (amounts % 500 == 0)  # is_round_amount
+    X[:, 3] = hours  # hour_of_day
+    X[:, 4] = months  # month_of_year
+    X[:, 5] = weekdays  # day_of_week
+    X[:, 6] = weekdays >= 5  # is_weekend
+    X[:, 7] = (hours >= 22) | (hours <= 5)  # is_night
+    X[:, 8] = (hours >= 9) & (hours <= 17)  # is_business_hours
+    X[:, 9:15] = 0.0  # velocity counts and is_new_recipient: no history in training
+    X[:, 15] = recipient_tx_count  # recipient_tx_count
+    X[:, 16] = cols["new_device"]  # is_new_device
+    X[:, 17] = device_count  # device_count
+    X[:, 18] = tx_types == "P2M"  # is_p2m
+    X[:, 19] = tx_types == "P2P"  # is_p2p
+    X[:, 20] = amounts * mean_mult  # amount_mean (simulated)
+    X[:, 21] = amounts * 0.3  # amount_std (simulated)
+    X[:, 22] = amounts * 1.5  # amount_max (simulated)
+    X[:, 23] = amount_deviation  # amount_deviation
+    X[:, 24] = np.where(cols["merchant_digit"], 0.5, 0.0)  # merchant_risk_score
+    X[:, 25] = channels == "qr"  # is_qr_channel
+    X[:, 26] = channels == "web"  # is_web_channel
+    return X
 
 
 # ----------------------------
 # MODEL TRAINING
 # ----------------------------
 
-def train_isolation_forest(X_train, contamination=0.1):
+def train_isolation_forest(X_train, contamination=0.1, n_jobs=-1):
     """Train Isolation Forest for unsupervised anomaly detection."""
     print("\n--- Training Isolation Forest ---")
     model = IsolationForest(
         n_estimators=200,
         contamination=contamination,
         random_state=42,
-        n_jobs=-1,
+        n_jobs=n_jobs,
         max_samples='auto'
     )
     model.fit(X_train)
@@ -249,7 +274,7 @@ def train_isolation_forest(X_train, contamination=0.1):
     return model
 
 
-def train_random_forest(X_train, y_train):
+def train_random_forest(X_train, y_train, n_jobs=-1):
     """Train Random Forest classifier."""
     print("\n--- Training Random Forest ---")
     model = RandomForestClassifier(
@@ -257,8 +282,9 @@ def train_random_forest(X_train, y_train):
         max_depth=15,
         min_samples_split=10,
         min_samples_leaf=4,
+        max_samples=0.5,  # Each tree bootstraps half the rows: ~2x faster fit
         random_state=42,
-        n_jobs=-1,
+        n_jobs=n_jobs,
         class_weight='balanced'  # Handle imbalanced data
     )
     model.fit(X_train, y_train)
@@ -266,14 +292,21 @@ def train_random_forest(X_train, y_train):
     return model
 
 
-def train_xgboost(X_train, y_train):
+def train_xgboost(X_train, y_train, n_jobs=-1):
     """Train XGBoost classifier."""
     print("\n--- Training XGBoost ---")
     
     # Calculate scale_pos_weight for imbalanced data
     scale_pos_weight = np.sum(y_train == 0) / np.sum(y_train == 1)
     
+    # Histogram tree method; build the histograms on the GPU when this
+    # xgboost was compiled with CUDA (it falls back to CPU if none is visible)
+    device = "cuda" if xgb.build_info().get("USE_CUDA") else "cpu"
+    
     model = xgb.XGBClassifier(
+        tree_method='hist',
+        device=device,
+        max_bin=128,
         n_estimators=200,
         max_depth=6,
         learning_rate=0.05,
@@ -281,11 +314,13 @@ def train_xgboost(X_train, y_train):
         colsample_bytree=0.8,
         scale_pos_weight=scale_pos_weight,
         random_state=42,
-        n_jobs=-1,
+        n_jobs=n_jobs,
         eval_metric='auc'
     )
     model.fit(X_train, y_train)
-    print("XGBoost trained successfully")
+    # The API scores one transaction at a time on CPU; save it CPU-bound
+    model.set_params(device="cpu")
+    print(f"XGBoost trained successfully (device: {device})")
     return model
 
 
@@ -363,7 +398,16 @@ def evaluate_model(model, X_test, y_test, model_name, is_supervised=True):
 # MAIN TRAINING PIPELINE
 # ----------------------------
 
-def main():
+def _json_default(obj):
+    """json.dumps fallback for numpy scalars and arrays."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def main(rebuild=False):
     """Main training pipeline."""
     print("="*60)
     print("UPI FRAUD DETECTION - ML TRAINING PIPELINE")
@@ -372,7 +416,8 @@ def main():
     # 1. Generate dataset
     X, y, raw_data = create_training_dataset(
         n_normal=10000,
-        n_fraud=1000
+        n_fraud=1000,
+        rebuild=rebuild
     )
     
     # 2. Train/test split
@@ -384,19 +429,20 @@ def main():
     print(f"Training set: {X_train.shape[0]} samples")
     print(f"Test set: {X_test.shape[0]} samples")
     
-    # 3. Train models
-    results = {}
+    # 3. Train models - the three fits run concurrently, each on its share of
+    # the cores; inner_max_num_threads caps OpenMP/BLAS threads per worker so
+    # sklearn and XGBoost don't oversubscribe the CPU
+    jobs_per_model = max(1, (os.cpu_count() or 1) // 3)
+    with parallel_config(backend="loky", inner_max_num_threads=jobs_per_model):
+        iforest, rf, xgb_model = Parallel(n_jobs=3)([
+            delayed(train_isolation_forest)(X_train, contamination=0.1, n_jobs=jobs_per_model),
+            delayed(train_random_forest)(X_train, y_train, n_jobs=jobs_per_model),
+            delayed(train_xgboost)(X_train, y_train, n_jobs=jobs_per_model),
+        ])
     
-    # Isolation Forest
-    iforest = train_isolation_forest(X_train, contamination=0.1)
+    results = {}
     results['iforest'] = evaluate_model(iforest, X_test, y_test, "Isolation Forest", is_supervised=False)
-    
-    # Random Forest
-    rf = train_random_forest(X_train, y_train)
     results['random_forest'] = evaluate_model(rf, X_test, y_test, "Random Forest", is_supervised=True)
-    
-    # XGBoost
-    xgb_model = train_xgboost(X_train, y_train)
     results['xgboost'] = evaluate_model(xgb_model, X_test, y_test, "XGBoost", is_supervised=True)
     
     # 4. Save models
@@ -404,6 +450,9 @@ def main():
     print("SAVING MODELS")
     print("="*60)
     
+    # Left uncompressed on purpose: app.scoring loads these with
+    # mmap_mode="r" (MODEL_MMAP_MODE), which only works on uncompressed
+    # files - the tree arrays are mapped from the page cache, not decoded
     joblib.dump(iforest, "models/iforest.joblib")
     print("✓ Saved: models/iforest.joblib")
     
@@ -421,15 +470,11 @@ def main():
         from app.drift_detector import store_baseline
 
         feature_names_list = get_feature_names()
+        # Per-feature value lists from the full training set, one column at a time
         feature_distributions: dict[str, list[float]] = {
-            name: [] for name in feature_names_list
+            name: X_train[:, i].tolist() for i, name in enumerate(feature_names_list)
         }
 
-        # Collect per-feature value lists from the full training set
-        for row in X_train:
-            for i, name in enumerate(feature_names_list):
-                feature_distributions[name].append(float(row[i]))
-
         store_baseline(feature_distributions)
         print(f"✓ Stored drift baselines for {len(feature_names_list)} features "
               f"({X_train.shape[0]} samples)")
@@ -440,16 +485,18 @@ def main():
     # 6. Save metadata
     metadata = {
         "training_date": datetime.now().isoformat(),
-        "training_samples": int(X_train.shape[0]),
-        "test_samples": int(X_test.shape[0]),
-        "num_features": int(X.shape[1]),
+        "training_samples": X_train.shape[0],
+        "test_samples": X_test.shape[0],
+        "num_features": X.shape[1],
         "feature_names": get_feature_names(),
-        "fraud_rate": float(np.mean(y)),
+        "fraud_rate": np.mean(y),
         "model_results": results
     }
     
+    # Encode in one dumps() call and write once; numpy values go through
+    # _json_default instead of being converted by hand
     with open("models/metadata.json", "w") as f:
-        json.dump(metadata, f, indent=2)
+        f.write(json.dumps(metadata, indent=2, default=_json_default))
     print("✓ Saved: models/metadata.json")
     
     # 7. Print summary
@@ -466,4 +513,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    main(rebuild="--rebuild" in sys.argv[1:])